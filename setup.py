@@ -27,10 +27,16 @@ setup(
     install_requires=[
         "imutils  == 0.5.4",
         "opencv-python == 4.8.0.76",
-        "scikit-image == 0.18.2",
-        "tensorflow == 2.8.0",
-        "py-sudoku == 1.0.2",
     ],
+    extras_require={
+        "skimage": ["scikit-image == 0.18.2"],
+        "tensorflow": ["tensorflow == 2.8.0"],
+    },
+    entry_points={
+        "console_scripts": [
+            "sudoku-ocr = sudoku_ocr.cli:main",
+        ],
+    },
     license="MIT",
     classifiers=[
         "Programming Language :: Python :: 3",
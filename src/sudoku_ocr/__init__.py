@@ -1 +1,23 @@
-"""sudoku-ocr."""
+"""sudoku-ocr.
+
+Public classes are imported on first access, so ``import sudoku_ocr`` does
+not load OpenCV until it is actually needed.
+"""
+
+from importlib import import_module
+from typing import Any
+
+_LAZY_ATTRIBUTES = {
+    "Board": "sudoku_ocr.board",
+    "Image": "sudoku_ocr.image",
+    "ImageProcessing": "sudoku_ocr.image_processing",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    """Import public class on first access."""
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,7 @@
+"""Run command line interface with ``python -m sudoku_ocr``."""
+
+import sys
+
+from sudoku_ocr.cli import main
+
+sys.exit(main())
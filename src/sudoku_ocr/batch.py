@@ -0,0 +1,160 @@
+"""Batch processing of many images."""
+
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from os import cpu_count
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from cv2 import setNumThreads
+from numpy import ndarray
+
+from sudoku_ocr.image_processing import ImageProcessing
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+
+T = TypeVar("T")
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+@dataclass
+class BatchResult:
+    """Result of processing single image.
+
+    `zone` holds board corners in the image resized before thresholding,
+    multiplied by `scale` they are corners in the source image.
+    """
+
+    path: Path
+    zone: Optional[ndarray] = None
+    data: Optional[ndarray] = None
+    error: Optional[str] = None
+    scale: float = 1.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether image has been processed successfully."""
+        return self.error is None
+
+
+def find_images(directory: Path) -> Iterator[Path]:
+    """Find image files in directory, sorted by name.
+
+    :param directory: directory to search in
+    """
+    for path in sorted(Path(directory).iterdir()):
+        if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES:
+            yield path
+
+
+def process_image(path: Path, width: int = 600) -> BatchResult:
+    """Find sudoku in image and adjust perspective to it.
+
+    Failures are returned as result with error message instead of raised.
+
+    :param path: path to image
+    :param width: width image is resized to before thresholding
+    """
+    try:
+        image = ImageProcessing()
+        image.load_image(path, grayscale=True)
+        scale = image.data.shape[1] / width
+        image.resize(width)
+        image.thresholding()
+        zone = image.find_grid()
+        image.adjust_perspective_to_specific_zone(zone)
+    except Exception as error:
+        logging.debug(f"Processing of {path} failed: {error}")
+        return BatchResult(path=path, error=str(error))
+    return BatchResult(path=path, zone=zone.reshape(4, 2), data=image.data, scale=scale)
+
+
+def process_images(
+    paths: Iterable[Path],
+    workers: int = None,
+    chunk_size: int = 1,
+    cv_threads: int = 1,
+    width: int = 600,
+) -> Iterator[BatchResult]:
+    """Process images in a pool of worker processes.
+
+    Paths are consumed lazily, so `paths` can be an endless stream; at most
+    two chunks per worker are in flight at once. Results are yielded in
+    completion order, not in order of `paths`.
+
+    :param paths: paths to images
+    :param workers: number of worker processes, defaults to number of CPUs
+    :param chunk_size: number of images sent to worker at once
+    :param cv_threads: number of OpenCV threads in each worker
+    :param width: width image is resized to before thresholding
+    """
+    paths = iter(paths)
+    chunks = iter(lambda: list(islice(paths, chunk_size)), [])
+    yield from map_chunks(
+        _process_chunk,
+        ((chunk, width) for chunk in chunks),
+        workers or cpu_count() or 1,
+        cv_threads,
+    )
+
+
+def map_chunks(
+    function: Callable[..., List[T]],
+    arguments: Iterable[Tuple[Any, ...]],
+    workers: int,
+    cv_threads: int = 1,
+    ordered: bool = False,
+) -> Iterator[T]:
+    """Call function for every chunk in a pool of worker processes.
+
+    Arguments are consumed lazily and at most two chunks per worker are in
+    flight at once, so memory stays bounded for endless streams.
+
+    :param function: picklable function returning list of results of chunk
+    :param arguments: arguments of function for every chunk
+    :param workers: number of worker processes
+    :param cv_threads: number of OpenCV threads in each worker
+    :param ordered: whether to yield results in order of chunks instead of
+        completion order
+    """
+    arguments = iter(arguments)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(cv_threads,)
+    ) as executor:
+        pending: Deque["Future[List[T]]"] = deque()
+        while True:
+            for chunk in islice(arguments, 2 * workers - len(pending)):
+                pending.append(executor.submit(function, *chunk))
+            if not pending:
+                return
+            if ordered:
+                yield from pending.popleft().result()
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending = deque(future for future in pending if future not in done)
+            for future in done:
+                yield from future.result()
+
+
+def init_worker(cv_threads: int) -> None:
+    """Limit OpenCV threads to avoid oversubscription of worker processes."""
+    setNumThreads(cv_threads)
+
+
+def _process_chunk(paths: List[Path], width: int) -> List[BatchResult]:
+    """Process chunk of images in worker."""
+    return [process_image(path, width) for path in paths]
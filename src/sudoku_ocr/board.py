@@ -0,0 +1,293 @@
+"""Sudoku board."""
+
+import logging
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from numpy import array, ndarray, ones, zeros
+
+from sudoku_ocr.cache import CachedResult, ResultCache, cache_key, image_key
+from sudoku_ocr.canonical import SolutionCache
+from sudoku_ocr.solver import (
+    BUDGET_EXCEEDED,
+    GRID_SIZE,
+    INVALID,
+    MULTIPLE,
+    SOLVED,
+    repair,
+    solve,
+)
+
+if TYPE_CHECKING:
+    from sudoku_ocr.image import Buffer
+    from sudoku_ocr.image_processing import (
+        ImageProcessing,
+        ThresholdCascade,
+        ThresholdParameters,
+        WorkBuffers,
+    )
+    from sudoku_ocr.recognition import DigitRecognizer
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+class Board:
+    """Sudoku board read from image or set directly.
+
+    With `cache`, results of every stage are stored under a hash of the
+    decoded image and pipeline parameters, and stages of an image seen
+    before are skipped.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResultCache] = None,
+        classifier: str = "knn",
+        threshold: int = 5,
+        proxy_width: int = 600,
+        board_size: int = 450,
+        threshold_parameters: Optional["ThresholdParameters"] = None,
+        solution_cache: Optional[SolutionCache] = None,
+        buffers: Optional["WorkBuffers"] = None,
+        recognizer: Optional["DigitRecognizer"] = None,
+        threshold_cascade: Optional["ThresholdCascade"] = None,
+    ) -> None:
+        """Initialize Board class.
+
+        :param cache: cache of pipeline results
+        :param classifier: name of classifier backend, see `recognition.CLASSIFIERS`
+        :param threshold: `ImageProcessing.is_empty` threshold
+        :param proxy_width: `ImageProcessing.locate_grid` proxy width
+        :param board_size: `ImageProcessing.locate_grid` board size
+        :param threshold_parameters: `ImageProcessing.thresholding` parameters
+        :param solution_cache: cache of solutions of equivalent boards
+        :param buffers: arrays reused by image processing stages; image of
+            the board is valid only until next board of the same size is
+            prepared with them
+        :param recognizer: recognizer reused across boards instead of one
+            created from `classifier` and `threshold` for every board
+        :param threshold_cascade: thresholding parameter sets tried until
+            plausible grid is located, replaces `threshold_parameters`
+        """
+        self._board_value: ndarray = zeros((GRID_SIZE, GRID_SIZE), dtype=int)
+        self._solved_board: ndarray = zeros((GRID_SIZE, GRID_SIZE), dtype=int)
+        self._confidences: ndarray = ones((GRID_SIZE, GRID_SIZE))
+        self._probabilities: Optional[ndarray] = None
+        self._image: Optional["ImageProcessing"] = None
+        self._cache = cache
+        self._cache_key: Optional[str] = None
+        self._cached = CachedResult()
+        self._classifier = classifier
+        self._threshold = threshold
+        self._proxy_width = proxy_width
+        self._board_size = board_size
+        self._threshold_parameters = threshold_parameters
+        self._solution_cache = solution_cache
+        self._buffers = buffers
+        self._recognizer = recognizer
+        self._threshold_cascade = threshold_cascade
+        self.zone: Optional[ndarray] = None
+        self.status: Optional[str] = None
+        self.corrections: List[Tuple[int, int, int, int]] = []
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Pipeline parameters results depend on."""
+        from sudoku_ocr.image_processing import ThresholdParameters
+
+        parameters: Dict[str, Any] = {
+            "proxy_width": self._proxy_width,
+            "board_size": self._board_size,
+        }
+        if self._recognizer is not None:
+            parameters["recognizer"] = self._recognizer.parameters
+        else:
+            parameters["classifier"] = self._classifier
+            parameters["threshold"] = self._threshold
+        if self._threshold_cascade is not None:
+            parameters["cascade"] = [
+                asdict(candidate) for candidate in self._threshold_cascade.candidates
+            ]
+            return parameters
+        return {
+            **parameters,
+            **asdict(self._threshold_parameters or ThresholdParameters()),
+        }
+
+    def prepare_img(
+        self,
+        source: Union[Path, str, "Buffer"],
+        reduction: int = 1,
+        grayscale: bool = False,
+    ) -> None:
+        """Load image and adjust perspective to the board.
+
+        Perspective is not adjusted when digits of the image are cached.
+
+        :param source: path to image, or encoded or decoded image in memory,
+            see `Image.load_buffer`
+        :param reduction: factor image is downscaled by when decoded
+        :param grayscale: whether to decode image to single channel
+        """
+        from sudoku_ocr.image_processing import ImageProcessing
+
+        image = ImageProcessing(self._buffers)
+        if isinstance(source, (Path, str)):
+            image.load_image(Path(source), reduction, grayscale)
+        else:
+            image.load_buffer(source, reduction, grayscale)
+        self._image = image
+        self._cached = CachedResult()
+        if self._cache is not None:
+            self._cache_key = cache_key(image_key(image.data), self.parameters)
+            self._cached = self._cache.get(self._cache_key) or CachedResult()
+        if self._cached.grid is not None:
+            self.zone = array(self._cached.zone)
+            return
+        self.zone = image.locate_grid(
+            self._proxy_width,
+            self._board_size,
+            self._threshold_parameters,
+            self._threshold_cascade,
+        )
+        self._cached.zone = self.zone.tolist()
+
+    def ocr_sudoku(self) -> None:
+        """Recognize digits of prepared image."""
+        from sudoku_ocr.recognition import DigitRecognizer, get_digits
+
+        if self._image is None:
+            raise ValueError("image has not been prepared")
+        self.corrections = []
+        if self._cached.grid is not None:
+            self._board_value = array(self._cached.grid)
+            self._confidences = array(self._cached.confidences)
+            probabilities = self._cached.probabilities
+            self._probabilities = (
+                None if probabilities is None else array(probabilities)
+            )
+            return
+        recognizer = self._recognizer or DigitRecognizer(
+            self._classifier, threshold=self._threshold
+        )
+        self._probabilities = recognizer.recognize_probabilities(self._image)
+        self._board_value, self._confidences = get_digits(self._probabilities)
+        self._cached.grid = self._board_value.tolist()
+        self._cached.confidences = self._confidences.tolist()
+        self._cached.probabilities = self._probabilities.tolist()
+        self._store()
+
+    def solve(
+        self,
+        max_nodes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        repair_givens: bool = False,
+    ) -> None:
+        """Solve board_value.
+
+        `solved_board` is filled with 0 when board is invalid or search budget
+        has been exceeded. Outcome is stored in `status`.
+
+        With `repair_givens`, invalid board is repaired with `solver.repair`
+        using confidences and probabilities of recognized digits. Corrected
+        cells are stored in `corrections` and applied to `board_value`.
+        Corrections of previous call are reverted before solving again, unless
+        `board_value` has been changed since.
+
+        :param max_nodes: maximal number of search nodes
+        :param timeout: maximal search time in seconds
+        :param repair_givens: whether to correct misrecognized givens
+        """
+        recognized = self._get_recognized()
+        if recognized is not None:
+            self._board_value = recognized
+            if self._is_solution_cached(repair_givens):
+                self._load_solution()
+                return
+        solver = solve if self._solution_cache is None else self._solution_cache.solve
+        solution = solver(self._board_value, max_nodes, timeout)
+        self.status, grid = solution.status, solution.grid
+        self.corrections = []
+        if repair_givens and self.status == INVALID:
+            repaired = repair(
+                self._board_value,
+                self._confidences,
+                timeout=timeout,
+                probabilities=self._probabilities,
+            )
+            self.status, grid = repaired.status, repaired.grid
+            self._board_value, self.corrections = repaired.board, repaired.corrections
+        if (
+            self.status != BUDGET_EXCEEDED
+            and recognized is not None
+            and not self._cached.corrections
+        ):
+            self._cached.status = self.status
+            self._cached.solution = grid.tolist()
+            self._cached.corrections = [list(item) for item in self.corrections]
+            self._cached.repaired = repair_givens
+            self._store()
+        if self.status in (SOLVED, MULTIPLE):
+            self._solved_board = grid
+        else:
+            self._solved_board = zeros((GRID_SIZE, GRID_SIZE), dtype=int)
+        logging.debug(f"Board solved with status {self.status}.")
+
+    def _get_recognized(self) -> Optional[ndarray]:
+        """Get recognized board unless board_value has been changed since.
+
+        Corrections of previous repair are not considered a change.
+        """
+        if self._cached.grid is None:
+            return None
+        recognized = array(self._cached.grid)
+        corrected = recognized.copy()
+        for row, col, _, digit in self.corrections:
+            corrected[row, col] = digit
+        return recognized if (self._board_value == corrected).all() else None
+
+    def _is_solution_cached(self, repair_givens: bool) -> bool:
+        """Check if solution of recognized board is cached."""
+        cached = self._cached
+        return cached.solution is not None and cached.repaired == repair_givens
+
+    def _load_solution(self) -> None:
+        """Load cached solution and apply its corrections to recognized board."""
+        cached = self._cached
+        self.status = cached.status
+        self.corrections = [tuple(item) for item in cached.corrections]  # type: ignore
+        for row, col, _, digit in self.corrections:
+            self._board_value[row, col] = digit
+        if self.status in (SOLVED, MULTIPLE):
+            self._solved_board = array(cached.solution)
+        else:
+            self._solved_board = zeros((GRID_SIZE, GRID_SIZE), dtype=int)
+
+    def _store(self) -> None:
+        """Store results of image in cache."""
+        if self._cache is not None and self._cache_key is not None:
+            self._cache.put(self._cache_key, self._cached)
+
+    @property
+    def board_value(self) -> ndarray:
+        """Digits of the board, 0 for empty cells."""
+        return self._board_value
+
+    @board_value.setter
+    def board_value(self, board_value: ndarray) -> None:
+        self._board_value = array(board_value, dtype=int)
+        self.corrections = []
+        self._confidences = ones((GRID_SIZE, GRID_SIZE))
+        self._probabilities = None
+        self._cached = CachedResult()
+
+    @property
+    def confidences(self) -> ndarray:
+        """Confidences of recognized digits, 1 for digits set directly."""
+        return self._confidences
+
+    @property
+    def solved_board(self) -> ndarray:
+        """Solved board_value, filled with 0 when board_value is invalid."""
+        return self._solved_board
@@ -0,0 +1,144 @@
+"""Border clearing engines.
+
+Both engines follow scikit-image `clear_border` semantics: components are
+8-connected regions of equal non-zero value and every component touching
+the border is set to 0. The OpenCV engine gives bit-identical results
+without importing scikit-image, which is an optional dependency.
+"""
+
+from cv2 import (
+    CV_32S,
+    FLOODFILL_FIXED_RANGE,
+    FLOODFILL_MASK_ONLY,
+    connectedComponents,
+    floodFill,
+)
+from numpy import (
+    concatenate,
+    flatnonzero,
+    ndarray,
+    nonzero,
+    pad,
+    unique,
+    zeros,
+)
+
+ENGINES = ("opencv", "skimage")
+
+CONNECTIVITY = 8
+NEIGHBOURS = [(row, col) for row in (-1, 0, 1) for col in (-1, 0, 1) if row or col]
+
+
+def get_borders(shape: tuple) -> ndarray:
+    """Get mask of outermost pixels of an image.
+
+    :param shape: image shape
+    """
+    borders = zeros(shape, dtype=bool)
+    borders[[0, -1]] = True
+    borders[:, [0, -1]] = True
+    return borders
+
+
+def clear_border(
+    image: ndarray, borders: ndarray = None, engine: str = "opencv"
+) -> ndarray:
+    """Clear components connected to image border.
+
+    :param image: 2D image
+    :param borders: mask of pixels considered as border, defaults to
+        outermost pixels of image
+    :param engine: one of `ENGINES`
+    :return: copy of image with border components cleared
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine {engine} not in {ENGINES}")
+    if borders is None:
+        borders = get_borders(image.shape)
+    out = image.copy()
+    if engine == "skimage":
+        _clear_border_skimage(out, borders)
+    elif _is_binary(out):
+        _clear_border_binary(out, borders)
+    else:
+        _clear_border_flood_fill(out, borders)
+    return out
+
+
+def _is_binary(image: ndarray) -> bool:
+    """Check if image has at most one non-zero value."""
+    foreground = image[image != 0]
+    return not foreground.size or foreground.min() == foreground.max()
+
+
+def _clear_border_skimage(image: ndarray, borders: ndarray) -> None:
+    """Clear border components with scikit-image labeling."""
+    from skimage.measure import label
+
+    labels, number = label(image, background=0, return_num=True)
+    _clear_labels(image, labels, number, borders)
+
+
+def _clear_border_binary(image: ndarray, borders: ndarray) -> None:
+    """Clear border components of binary image with single OpenCV labeling."""
+    number, labels = connectedComponents(
+        (image != 0).view("uint8"), connectivity=CONNECTIVITY, ltype=CV_32S
+    )
+    _clear_labels(image, labels, number - 1, borders)
+
+
+def _clear_border_flood_fill(image: ndarray, borders: ndarray) -> None:
+    """Clear border components of grayscale image by flood filling from border.
+
+    Fixed range flood fill with zero difference spreads over pixels equal to
+    the seed value only, which reproduces equal value labeling. To keep the
+    number of flood fills low:
+
+    * border pixels equal to their left or upper border neighbour belong to
+      the same component as that neighbour and are not used as seeds,
+    * seeds without any equal neighbour are single pixel components and are
+      cleared directly,
+    * cost of a flood fill grows with image size, so image is filled in
+      bands separated by blank rows, which no component can cross.
+    """
+    redundant = zeros(image.shape, dtype=bool)
+    redundant[:, 1:] = borders[:, :-1] & (image[:, 1:] == image[:, :-1])
+    redundant[1:] |= borders[:-1] & (image[1:] == image[:-1])
+    rows, cols = nonzero(borders & (image != 0) & ~redundant)
+    values = image[rows, cols]
+    padded = pad(image, 1)
+    connected = zeros(values.shape, dtype=bool)
+    for row_offset, col_offset in NEIGHBOURS:
+        connected |= padded[rows + 1 + row_offset, cols + 1 + col_offset] == values
+    image[rows[~connected], cols[~connected]] = 0
+    rows, cols = rows[connected], cols[connected]
+
+    flags = CONNECTIVITY | FLOODFILL_FIXED_RANGE | FLOODFILL_MASK_ONLY | (1 << 8)
+    for start, stop in _get_bands(image):
+        bounds = rows.searchsorted((start, stop))
+        first, last = int(bounds[0]), int(bounds[1])
+        if first == last:
+            continue
+        band = image[start:stop]
+        mask = zeros((stop - start + 2, band.shape[1] + 2), dtype="uint8")
+        for row, col in zip(rows[first:last] - start, cols[first:last]):
+            if not mask[row + 1, col + 1]:
+                floodFill(band, mask, (int(col), int(row)), 0, 0, 0, flags)
+        band[mask[1:-1, 1:-1] != 0] = 0
+
+
+def _get_bands(image: ndarray) -> list:
+    """Get (start, stop) row ranges of image separated by blank rows."""
+    blank = concatenate(([True], ~image.any(axis=1), [True]))
+    edges = flatnonzero(blank[1:] != blank[:-1])
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _clear_labels(
+    image: ndarray, labels: ndarray, number: int, borders: ndarray
+) -> None:
+    """Set pixels of labels present in borders to 0."""
+    label_mask = zeros(number + 1, dtype=bool)
+    label_mask[unique(labels[borders])] = True
+    label_mask[0] = False
+    image[label_mask[labels]] = 0
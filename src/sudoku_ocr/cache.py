@@ -0,0 +1,210 @@
+"""Content addressed cache of pipeline results.
+
+Results are keyed by a hash of the decoded image together with pipeline
+parameters, so the same picture processed with the same settings is
+recognized and solved only once. Recent entries are kept in memory with
+least recently used eviction; an optional SQLite file keeps entries
+across processes and restarts up to a size cap.
+"""
+
+import json
+import logging
+import sqlite3
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Any, Dict, List, Optional
+
+from numpy import ascontiguousarray, ndarray
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+DIGEST_SIZE = 16
+METRIC_PREFIX = "sudoku_ocr_cache"
+
+
+def image_key(data: ndarray) -> str:
+    """Hash decoded image data, its shape and type."""
+    digest = blake2b(digest_size=DIGEST_SIZE)
+    digest.update(f"{data.shape}{data.dtype}".encode())
+    digest.update(memoryview(ascontiguousarray(data)).cast("B"))
+    return digest.hexdigest()
+
+
+def file_key(path: Path) -> str:
+    """Hash path, size and modification time of file without reading it."""
+    stat = Path(path).stat()
+    content = f"{Path(path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    return blake2b(content.encode(), digest_size=DIGEST_SIZE).hexdigest()
+
+
+def cache_key(source_key: str, parameters: Dict[str, Any]) -> str:
+    """Combine image or file key with pipeline parameters.
+
+    :param source_key: `image_key` or `file_key`
+    :param parameters: json serializable pipeline parameters
+    """
+    content = source_key + json.dumps(parameters, sort_keys=True)
+    return blake2b(content.encode(), digest_size=DIGEST_SIZE).hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """Results of pipeline stages stored for single image.
+
+    Stages which have not run yet are None.
+    """
+
+    zone: Optional[List[List[float]]] = None
+    grid: Optional[List[List[int]]] = None
+    confidences: Optional[List[List[float]]] = None
+    probabilities: Optional[List[List[List[float]]]] = None
+    solution: Optional[List[List[int]]] = None
+    status: Optional[str] = None
+    corrections: List[List[int]] = field(default_factory=list)
+    repaired: bool = False
+
+    def to_json(self) -> str:
+        """Serialize result."""
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, content: str) -> "CachedResult":
+        """Deserialize result."""
+        return cls(**json.loads(content))
+
+
+class ResultCache:
+    """LRU cache of pipeline results with optional SQLite tier.
+
+    Counters of memory hits, disk hits, misses and evictions are available
+    with `counters` and `to_prometheus`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        path: Optional[Path] = None,
+        max_disk_bytes: Optional[int] = None,
+    ) -> None:
+        """Initialize ResultCache class.
+
+        :param max_entries: maximal number of entries kept in memory
+        :param path: SQLite file of on disk tier, memory only when not given
+        :param max_disk_bytes: maximal total size of entries on disk
+        """
+        self._max_entries = max_entries
+        self._max_disk_bytes = max_disk_bytes
+        self._entries: "OrderedDict[str, CachedResult]" = OrderedDict()
+        self._lock = Lock()
+        self._counters = dict.fromkeys(
+            ("memory_hits", "disk_hits", "misses", "evictions", "disk_evictions"), 0
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._connection = sqlite3.connect(str(path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT, size INTEGER, accessed REAL)"
+            )
+            self._connection.commit()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Get result of key, None when it is not cached."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._entries[key]
+            result = self._get_from_disk(key)
+            if result is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._put_in_memory(key, result)
+            return result
+
+    def put(self, key: str, result: CachedResult) -> None:
+        """Store result of key, replacing previous one."""
+        with self._lock:
+            self._put_in_memory(key, result)
+            self._put_on_disk(key, result)
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM results")
+                self._connection.commit()
+
+    def close(self) -> None:
+        """Close on disk tier."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def to_prometheus(self) -> str:
+        """Export counters in Prometheus text exposition format."""
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# HELP {metric} Number of cache {name.replace('_', ' ')}.")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def __len__(self) -> int:
+        """Get number of entries in memory."""
+        return len(self._entries)
+
+    def _put_in_memory(self, key: str, result: CachedResult) -> None:
+        """Store result in memory evicting least recently used entries."""
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _get_from_disk(self, key: str) -> Optional[CachedResult]:
+        """Load result from disk tier."""
+        if self._connection is None:
+            return None
+        row = self._connection.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._connection.execute(
+            "UPDATE results SET accessed = ? WHERE key = ?", (time(), key)
+        )
+        self._connection.commit()
+        return CachedResult.from_json(row[0])
+
+    def _put_on_disk(self, key: str, result: CachedResult) -> None:
+        """Store result on disk tier evicting least recently used entries."""
+        if self._connection is None:
+            return
+        value = result.to_json()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (key, value, len(value), time()),
+        )
+        if self._max_disk_bytes is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM "
+                "(SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS total "
+                "FROM results) WHERE total > ?)",
+                (self._max_disk_bytes,),
+            )
+            self._counters["disk_evictions"] += cursor.rowcount
+        self._connection.commit()
@@ -0,0 +1,174 @@
+"""Canonical form of sudoku boards.
+
+Relabeling digits, permuting bands, stacks, rows within bands and columns
+within stacks, and transposing a board give an equivalent puzzle, whose
+solution is transformed in the same way. `canonicalize` orders rows and
+columns by their pattern of givens and relabels digits in order of first
+appearance, so equivalent boards usually share a canonical form. Rows or
+columns with identical patterns of givens are kept in original order,
+which may give different forms of equivalent boards, but never the same
+form of different ones.
+
+`SolutionCache` solves every canonical form once and maps cached
+solutions back to boards it is asked for.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from numpy import arange, array, ndarray, zeros
+
+from sudoku_ocr.solver import BUDGET_EXCEEDED, GRID_SIZE, Solution, solve
+
+BAND_SIZE = 3
+REFINEMENTS = 2
+ROW_WEIGHTS = 1 << arange(GRID_SIZE)[::-1]
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+@dataclass
+class Transform:
+    """Transform of board to its canonical form.
+
+    Canonical board is ``digits[board.T if transposed else board][rows][:, cols]``.
+    """
+
+    transposed: bool
+    rows: ndarray
+    cols: ndarray
+    digits: ndarray
+
+    def apply(self, board: ndarray) -> ndarray:
+        """Transform board to canonical form."""
+        board = board.T if self.transposed else board
+        return self.digits[board[self.rows][:, self.cols]]
+
+    def invert(self, canonical: ndarray) -> ndarray:
+        """Transform canonical board back."""
+        inverse = zeros(GRID_SIZE + 1, dtype=int)
+        inverse[self.digits] = arange(GRID_SIZE + 1)
+        board = zeros((GRID_SIZE, GRID_SIZE), dtype=int)
+        board[self.rows[:, None], self.cols] = inverse[canonical]
+        return board.T if self.transposed else board
+
+
+def canonicalize(board: ndarray) -> Tuple[ndarray, Transform]:
+    """Get canonical form of board and transform leading to it.
+
+    :param board: 9x9 digits, 0 for empty cells
+    :return: canonical board and transform
+    :raises ValueError: when board is not 9x9 or its values are not digits
+    """
+    board = array(board, dtype=int)
+    if board.shape != (GRID_SIZE, GRID_SIZE):
+        raise ValueError(f"board shape {board.shape} is not (9, 9)")
+    if board.min() < 0 or board.max() > GRID_SIZE:
+        raise ValueError("board values are not in range 0-9")
+    givens = board > 0
+    # transposition swaps counts of givens in rows and columns, orientation
+    # with larger counts is canonical and both are compared only on tie
+    row_counts = sorted(givens.sum(axis=1).tolist())
+    col_counts = sorted(givens.sum(axis=0).tolist())
+    if row_counts != col_counts:
+        return (
+            _canonicalize(board.T, True)
+            if col_counts > row_counts
+            else _canonicalize(board, False)
+        )
+    candidates = [_canonicalize(board, False), _canonicalize(board.T, True)]
+    return min(candidates, key=lambda candidate: candidate[0].tobytes())
+
+
+def _canonicalize(board: ndarray, transposed: bool) -> Tuple[ndarray, Transform]:
+    """Canonicalize board without transposing it."""
+    givens = board > 0
+    rows = cols = arange(GRID_SIZE)
+    for _ in range(REFINEMENTS):
+        rows = _get_order(givens[:, cols])
+        cols = _get_order(givens[rows].T)
+    ordered = board[rows][:, cols]
+    digits = zeros(GRID_SIZE + 1, dtype=int)
+    appearing = ordered[ordered > 0]
+    first = sorted(set(appearing.tolist()), key=appearing.tolist().index)
+    digits[first] = arange(1, len(first) + 1)
+    unused = [digit for digit in range(1, GRID_SIZE + 1) if digit not in first]
+    digits[unused] = arange(len(first) + 1, GRID_SIZE + 1)
+    return digits[ordered], Transform(transposed, rows, cols, digits)
+
+
+def _get_order(givens: ndarray) -> ndarray:
+    """Order rows by pattern of givens, keeping rows of a band together.
+
+    Rows within band and bands are sorted descending by number of givens
+    and then by givens read as binary number.
+    """
+    keys = list(zip(givens.sum(axis=1).tolist(), (givens @ ROW_WEIGHTS).tolist()))
+    bands = [
+        sorted(range(start, start + BAND_SIZE), key=keys.__getitem__, reverse=True)
+        for start in range(0, GRID_SIZE, BAND_SIZE)
+    ]
+    bands.sort(key=lambda band: sorted(keys[row] for row in band), reverse=True)
+    return array(bands).ravel()
+
+
+class SolutionCache:
+    """Bounded LRU cache of solutions of canonical boards."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        """Initialize SolutionCache class.
+
+        :param max_entries: maximal number of cached canonical boards
+        """
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Solution]" = OrderedDict()
+        self._lock = Lock()
+        self._counters = dict.fromkeys(("hits", "misses", "evictions"), 0)
+
+    def solve(
+        self,
+        board: ndarray,
+        max_nodes: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Solution:
+        """Solve board, searching only when its canonical form is not cached.
+
+        :param board: 9x9 digits, 0 for empty cells
+        :param max_nodes: maximal number of search nodes
+        :param timeout: maximal search time in seconds
+        :return: solution of the board
+        """
+        canonical, transform = canonicalize(board)
+        key = canonical.tobytes()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+        if cached is None:
+            cached = solve(canonical, max_nodes, timeout)
+            with self._lock:
+                self._counters["misses"] += 1
+                if cached.status != BUDGET_EXCEEDED:
+                    self._put(key, cached)
+        return Solution(cached.status, transform.invert(cached.grid), cached.nodes)
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    def __len__(self) -> int:
+        """Get number of cached canonical boards."""
+        return len(self._entries)
+
+    def _put(self, key: bytes, solution: Solution) -> None:
+        """Store solution evicting least recently used entries."""
+        self._entries[key] = solution
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
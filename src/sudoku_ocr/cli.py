@@ -0,0 +1,344 @@
+"""Command line interface.
+
+Heavy modules (OpenCV, scikit-image) are imported by subcommands only, so
+``sudoku-ocr --help`` stays fast.
+"""
+
+import json
+import logging
+import sys
+from argparse import ArgumentParser, Namespace
+from glob import glob
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List
+
+from sudoku_ocr.logging import setup_logging, setup_parser
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+    from sudoku_ocr.batch import BatchResult
+    from sudoku_ocr.synthetic import Sample
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+def setup_cli_parser() -> ArgumentParser:
+    """Setups command line parser."""
+    parser = ArgumentParser(prog="sudoku-ocr", description="Ocr sudoku images.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    detect_parser = subparsers.add_parser(
+        "detect", help="find sudoku grid in images and adjust perspective to it"
+    )
+    setup_parser(detect_parser)
+    detect_parser.add_argument(
+        "inputs", nargs="+", help="image files, glob patterns or directories"
+    )
+    detect_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes, defaults to number of CPUs",
+    )
+    detect_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1,
+        help="number of images sent to worker at once",
+    )
+    detect_parser.add_argument(
+        "--format",
+        choices=["jsonl", "npz", "cells"],
+        default="jsonl",
+        dest="output_format",
+        help="output format, npz also stores adjusted boards, cells appends "
+        "board cells to dataset directory",
+    )
+    detect_parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="output file, jsonl is written to stdout when not given",
+    )
+    detect_parser.set_defaults(handler=detect)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="serve HTTP endpoint locating, recognizing and solving boards"
+    )
+    setup_parser(serve_parser)
+    serve_parser.add_argument(
+        "--host", default="127.0.0.1", help="address to listen on"
+    )
+    serve_parser.add_argument(
+        "--port", type=int, default=8080, help="port to listen on"
+    )
+    serve_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of workers, defaults to number of CPUs",
+    )
+    serve_parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=None,
+        help="maximal number of accepted requests, further ones get 503, "
+        "defaults to twice the number of workers",
+    )
+    serve_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="time limit of single request in seconds",
+    )
+    serve_parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="use worker processes instead of threads",
+    )
+    serve_parser.set_defaults(handler=serve)
+
+    generate_parser = subparsers.add_parser(
+        "generate", help="generate synthetic board images with ground truth"
+    )
+    setup_parser(generate_parser)
+    generate_parser.add_argument("count", type=int, help="number of images")
+    generate_parser.add_argument(
+        "-o", "--output", type=Path, required=True, help="output directory"
+    )
+    generate_parser.add_argument(
+        "--seed", type=int, default=None, help="seed of random generators"
+    )
+    generate_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of worker processes, defaults to number of CPUs",
+    )
+    generate_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=64,
+        help="number of images generated by worker at once",
+    )
+    generate_parser.add_argument(
+        "--image-format",
+        choices=["jpg", "png"],
+        default="jpg",
+        help="format of written images",
+    )
+    generate_parser.add_argument(
+        "--grayscale", action="store_true", help="generate single channel images"
+    )
+    generate_parser.set_defaults(handler=generate)
+    return parser
+
+
+def expand_inputs(inputs: List[str]) -> Iterator[Path]:
+    """Expand files, glob patterns and directories into image paths.
+
+    :param inputs: command line inputs
+    """
+    from sudoku_ocr.batch import find_images
+
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            yield from find_images(path)
+        elif any(char in item for char in "*?["):
+            yield from (Path(match) for match in sorted(glob(item, recursive=True)))
+        else:
+            yield path
+
+
+def detect(args: Namespace) -> int:
+    """Run detection for all inputs and write results.
+
+    :param args: parsed command line arguments
+    :return: exit code, 1 if any image failed
+    """
+    from sudoku_ocr.batch import process_images
+
+    if args.output_format in ("npz", "cells") and args.output is None:
+        raise SystemExit(f"--output is required for {args.output_format} format")
+    results = process_images(
+        expand_inputs(args.inputs), workers=args.jobs, chunk_size=args.chunk_size
+    )
+    if args.output_format == "npz":
+        failed = write_npz(results, args.output)
+    elif args.output_format == "cells":
+        failed = write_cells(results, args.output)
+    else:
+        failed = write_jsonl(results, args.output)
+    logging.info(f"Processed images with {failed} failures.")
+    return 1 if failed else 0
+
+
+def serve(args: Namespace) -> int:
+    """Serve HTTP endpoint until interrupted.
+
+    :param args: parsed command line arguments
+    :return: exit code
+    """
+    import asyncio
+
+    from sudoku_ocr.service import OcrService
+    from sudoku_ocr.service import serve as start_server
+
+    async def run() -> None:
+        async with OcrService(
+            args.jobs, args.max_pending, args.timeout, args.processes
+        ) as service:
+            server = await start_server(service, args.host, args.port)
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logging.info("Server stopped.")
+    return 0
+
+
+def generate(args: Namespace) -> int:
+    """Generate synthetic images and write them with their ground truth.
+
+    :param args: parsed command line arguments
+    :return: exit code
+    """
+    from sudoku_ocr.synthetic import GeneratorOptions, generate_samples
+
+    samples = generate_samples(
+        args.count,
+        GeneratorOptions(grayscale=args.grayscale),
+        args.seed,
+        workers=args.jobs,
+        chunk_size=args.chunk_size,
+    )
+    write_samples(samples, args.output, args.image_format)
+    logging.info(f"Generated {args.count} images in {args.output}.")
+    return 0
+
+
+def write_samples(
+    samples: Iterable["Sample"], output: Path, image_format: str = "jpg"
+) -> None:
+    """Write images of samples and ``index.jsonl`` with their ground truth.
+
+    Index holds one record per image with its path, givens, solution and
+    board corners.
+
+    :param samples: synthetic samples
+    :param output: output directory, created when it does not exist
+    :param image_format: extension of written images
+    """
+    from cv2 import imwrite
+
+    output.mkdir(parents=True, exist_ok=True)
+    with open(output / "index.jsonl", "w") as index:
+        for number, sample in enumerate(samples):
+            path = output / f"{number:06d}.{image_format}"
+            imwrite(str(path), sample.image)
+            record = {
+                "path": path.name,
+                "board": sample.board.tolist(),
+                "solution": sample.solution.tolist(),
+                "zone": sample.zone.tolist(),
+            }
+            index.write(json.dumps(record) + "\n")
+
+
+def to_record(result: "BatchResult") -> dict:
+    """Convert batch result to json serializable record."""
+    return {
+        "path": str(result.path),
+        "ok": result.ok,
+        "zone": None if result.zone is None else result.zone.tolist(),
+        "shape": None if result.data is None else list(result.data.shape),
+        "error": result.error,
+    }
+
+
+def write_jsonl(results: Iterable["BatchResult"], output: Path = None) -> int:
+    """Write one json record per result as soon as it is available.
+
+    :param results: batch results
+    :param output: output file, stdout when not given
+    :return: number of failed results
+    """
+    failed = 0
+    stream = open(output, "w") if output else sys.stdout
+    try:
+        for result in results:
+            failed += not result.ok
+            stream.write(json.dumps(to_record(result)) + "\n")
+            stream.flush()
+    finally:
+        if output:
+            stream.close()
+    return failed
+
+
+def write_npz(results: Iterable["BatchResult"], output: Path) -> int:
+    """Write results to compressed npz archive.
+
+    Archive holds json encoded ``index`` with one record per result and
+    ``board_{i}`` array with adjusted board for each successful record ``i``.
+
+    :param results: batch results
+    :param output: output file
+    :return: number of failed results
+    """
+    from numpy import savez_compressed
+
+    records: List[dict] = []
+    boards: Dict[str, "ndarray"] = {}
+    for result in results:
+        if result.ok:
+            assert result.data is not None
+            boards[f"board_{len(records)}"] = result.data
+        records.append(to_record(result))
+    savez_compressed(output, index=json.dumps(records), **boards)
+    return sum(not record["ok"] for record in records)
+
+
+def write_cells(results: Iterable["BatchResult"], output: Path) -> int:
+    """Append cells of successfully processed boards to `dataset.CellDataset`.
+
+    Boards are appended as soon as they are available, so output never has
+    to fit in memory. Failed results are only counted.
+
+    :param results: batch results
+    :param output: dataset directory, created when it does not exist
+    :return: number of failed results
+    """
+    from sudoku_ocr.dataset import CellDataset
+    from sudoku_ocr.image_processing import ImageProcessing
+
+    dataset = CellDataset(output)
+    failed = 0
+    for result in results:
+        if not result.ok:
+            failed += 1
+            continue
+        assert result.data is not None and result.zone is not None
+        board = ImageProcessing()
+        board.data = result.data
+        dataset.add_board(board, str(result.path), result.zone * result.scale)
+    return failed
+
+
+def main(argv: List[str] = None) -> int:
+    """Run command line interface.
+
+    :param argv: command line arguments, defaults to sys.argv
+    """
+    parser = setup_cli_parser()
+    args = parser.parse_args(argv)
+    setup_logging(args.logging_level)
+    return args.handler(args)
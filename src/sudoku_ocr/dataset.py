@@ -0,0 +1,244 @@
+"""Dataset of board cells for offline reprocessing and evaluation.
+
+Dataset is a directory holding ``cells.npy`` with uint8 tensor of
+thresholded cells of shape (N, 81, height, width) and ``index.jsonl`` with
+one `Record` per board. Cells are memory mapped, so recognizers and
+occupancy can run on the dataset without decoding or warping any image and
+without loading it into memory.
+
+Boards are appended incrementally: cells are written at the end of the
+file and only the fixed size ``.npy`` header is rewritten with new number
+of boards. Header is updated last, so boards of interrupted append are
+ignored.
+"""
+
+import json
+import logging
+from ast import literal_eval
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from numpy import ascontiguousarray, dtype, memmap, ndarray, uint8, where, zeros
+from numpy.lib.format import MAGIC_PREFIX
+
+from sudoku_ocr.image_processing import (
+    ImageProcessing,
+    ThresholdParameters,
+    get_occupancy,
+)
+
+GRID_SIZE = 9
+CELLS_FILE = "cells.npy"
+INDEX_FILE = "index.jsonl"
+HEADER_SIZE = 128
+BINARY_THRESHOLD = 128
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+@dataclass
+class Record:
+    """Index entry of single board.
+
+    `zone` holds 4x2 board corners in source image, `occupancy` 9x9 mask of
+    occupied cells and `labels` optional 9x9 digits, 0 for empty cells.
+    """
+
+    path: str
+    zone: List[List[float]]
+    occupancy: List[List[bool]]
+    labels: Optional[List[List[int]]] = None
+
+
+class CellDataset:
+    """Memory mapped cells of boards with their index."""
+
+    def __init__(self, directory: Path, cell_shape: Tuple[int, int] = (28, 28)) -> None:
+        """Open dataset, creating empty one when directory does not hold any.
+
+        :param directory: dataset directory
+        :param cell_shape: (height, width) of cells of new dataset, shape of
+            existing dataset is read from its header
+        """
+        self._directory = Path(directory)
+        self._cells_path = self._directory / CELLS_FILE
+        self._index_path = self._directory / INDEX_FILE
+        if self._cells_path.exists():
+            shape = _read_header(self._cells_path)
+            self._length, self._cell_shape = shape[0], tuple(shape[2:])
+            self._drop_interrupted()
+        else:
+            self._directory.mkdir(parents=True, exist_ok=True)
+            self._length, self._cell_shape = 0, tuple(cell_shape)
+            with open(self._cells_path, "wb") as file:
+                _write_header(file, self.shape)
+            self._index_path.touch()
+        self._records: Optional[List[Record]] = None
+        self._cells: Optional[ndarray] = None
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Shape of cells tensor."""
+        return (self._length, GRID_SIZE * GRID_SIZE) + self._cell_shape
+
+    @property
+    def cells(self) -> ndarray:
+        """Read only memory map of (N, 81, height, width) cells."""
+        if not self._length:
+            return zeros(self.shape, dtype=uint8)
+        if self._cells is None:
+            self._cells = memmap(
+                self._cells_path,
+                dtype=uint8,
+                mode="r",
+                offset=HEADER_SIZE,
+                shape=self.shape,
+            )
+        return self._cells
+
+    @property
+    def records(self) -> List[Record]:
+        """Index entries of boards."""
+        if self._records is None:
+            with open(self._index_path) as file:
+                self._records = [Record(**json.loads(line)) for line in file]
+        return self._records
+
+    def __len__(self) -> int:
+        """Get number of boards."""
+        return self._length
+
+    def append(self, cells: ndarray, records: Iterable[Record]) -> None:
+        """Append boards to the end of the dataset.
+
+        :param cells: (n, 81, height, width) or (n, 9, 9, height, width)
+            uint8 cells
+        :param records: index entry of every board
+        """
+        records = list(records)
+        cells = ascontiguousarray(cells, dtype=uint8).reshape(
+            (len(records),) + self.shape[1:]
+        )
+        offset = HEADER_SIZE + self._length * cells[0].nbytes
+        with open(self._cells_path, "r+b") as file:
+            file.seek(offset)
+            file.write(cells.data)
+            file.truncate()
+            with open(self._index_path, "a") as index:
+                for record in records:
+                    index.write(json.dumps(asdict(record)) + "\n")
+            file.flush()
+            self._length += len(records)
+            file.seek(0)
+            _write_header(file, self.shape)
+        self._cells = None
+        if self._records is not None:
+            self._records.extend(records)
+        logging.debug(f"Appended {len(records)} boards to {self._directory}.")
+
+    def add_board(
+        self,
+        board: ImageProcessing,
+        path: str = "",
+        zone: Optional[ndarray] = None,
+        labels: Optional[ndarray] = None,
+        threshold: int = 5,
+    ) -> None:
+        """Append warped and thresholded board.
+
+        Cells resampled to the cell shape of the dataset are thresholded
+        again, so stored cells stay binary and `occupancy` of the record,
+        computed from them, matches `get_occupancy` of `cells`.
+
+        :param board: warped and thresholded board
+        :param path: path of source image
+        :param zone: 4x2 board corners in source image
+        :param labels: 9x9 digits of the board, 0 for empty cells
+        :param threshold: `image_processing.get_occupancy` threshold
+        """
+        cells = board.get_cells(self._cell_shape)
+        if cells.shape[2:] != board.get_cells().shape[2:]:
+            cells = where(cells >= BINARY_THRESHOLD, 255, 0).astype(uint8)
+        record = Record(
+            path=str(path),
+            zone=[] if zone is None else zone.reshape(4, 2).tolist(),
+            occupancy=get_occupancy(cells, threshold).tolist(),
+            labels=None if labels is None else [list(map(int, row)) for row in labels],
+        )
+        self.append(cells[None], [record])
+
+    def add_image(
+        self,
+        path: Path,
+        labels: Optional[ndarray] = None,
+        proxy_width: int = 600,
+        board_size: int = 450,
+        parameters: Optional[ThresholdParameters] = None,
+    ) -> None:
+        """Locate board in image and append it.
+
+        :param path: path of image
+        :param labels: 9x9 digits of the board, 0 for empty cells
+        :param proxy_width: `ImageProcessing.locate_grid` proxy width
+        :param board_size: `ImageProcessing.locate_grid` board size
+        :param parameters: thresholding parameters
+        """
+        image = ImageProcessing()
+        image.load_image(Path(path), grayscale=True)
+        zone = image.locate_grid(proxy_width, board_size, parameters)
+        self.add_board(image, str(path), zone, labels)
+
+    def get_board(self, index: int) -> ImageProcessing:
+        """Assemble board of cells, e.g. for `recognition.DigitRecognizer`.
+
+        :param index: index of board
+        """
+        cell_height, cell_width = self._cell_shape
+        board = ImageProcessing()
+        board.data = (
+            self.cells[index]
+            .reshape(GRID_SIZE, GRID_SIZE, cell_height, cell_width)
+            .swapaxes(1, 2)
+            .reshape(GRID_SIZE * cell_height, GRID_SIZE * cell_width)
+        )
+        return board
+
+    def boards(self) -> Iterator[ImageProcessing]:
+        """Assemble boards one by one."""
+        for index in range(self._length):
+            yield self.get_board(index)
+
+    def _drop_interrupted(self) -> None:
+        """Drop index entries of boards of interrupted append."""
+        with open(self._index_path) as file:
+            lines = file.readlines()
+        if len(lines) > self._length:
+            logging.warning(f"Dropping {len(lines) - self._length} incomplete boards.")
+            with open(self._index_path, "w") as file:
+                file.writelines(islice(lines, self._length))
+
+
+def _write_header(file, shape: Tuple[int, ...]) -> None:  # type: ignore
+    """Write .npy header of uint8 array padded to `HEADER_SIZE` bytes."""
+    header = repr(
+        {"descr": dtype(uint8).str, "fortran_order": False, "shape": tuple(shape)}
+    )
+    length = HEADER_SIZE - len(MAGIC_PREFIX) - 4
+    content = header.ljust(length - 1) + "\n"
+    if len(content) != length:
+        raise ValueError(f"shape {shape} does not fit into .npy header")
+    file.write(MAGIC_PREFIX + bytes([1, 0]) + length.to_bytes(2, "little"))
+    file.write(content.encode("latin1"))
+
+
+def _read_header(path: Path) -> Tuple[int, ...]:
+    """Read shape from .npy header written by `_write_header`."""
+    with open(path, "rb") as file:
+        prefix = file.read(len(MAGIC_PREFIX) + 4)
+        if not prefix.startswith(MAGIC_PREFIX):
+            raise ValueError(f"{path} is not .npy file")
+        length = int.from_bytes(prefix[-2:], "little")
+        header = literal_eval(file.read(length).decode("latin1"))
+    return tuple(header["shape"])
@@ -0,0 +1,17 @@
+"""Exceptions."""
+
+
+class SudokuOcrError(Exception):
+    """Base class of sudoku-ocr exceptions."""
+
+
+class GridNotFoundError(SudokuOcrError):
+    """Sudoku grid has not been found in image."""
+
+
+class ImageDecodeError(SudokuOcrError):
+    """Image could not be decoded from memory."""
+
+
+class ServiceOverloadedError(SudokuOcrError):
+    """Service is already processing maximal number of requests."""
@@ -3,12 +3,46 @@
 import logging
 from os.path import isfile
 from pathlib import Path
-
-from cv2 import imread, imshow, imwrite, waitKey
+from typing import Union
+
+from cv2 import (
+    COLOR_BGR2GRAY,
+    IMREAD_COLOR,
+    IMREAD_GRAYSCALE,
+    IMREAD_REDUCED_COLOR_2,
+    IMREAD_REDUCED_COLOR_4,
+    IMREAD_REDUCED_COLOR_8,
+    IMREAD_REDUCED_GRAYSCALE_2,
+    IMREAD_REDUCED_GRAYSCALE_4,
+    IMREAD_REDUCED_GRAYSCALE_8,
+    INTER_AREA,
+    cvtColor,
+    imdecode,
+    imread,
+    imshow,
+    imwrite,
+)
+from cv2 import resize as cv_resize
+from cv2 import waitKey
 from imutils import resize
-from numpy import ndarray
+from numpy import frombuffer, ndarray, uint8
+
+from sudoku_ocr.exceptions import ImageDecodeError
 
 WAIT_TIME = 2000
+# imread flags by reduction factor and grayscale
+READ_FLAGS = {
+    (1, False): IMREAD_COLOR,
+    (2, False): IMREAD_REDUCED_COLOR_2,
+    (4, False): IMREAD_REDUCED_COLOR_4,
+    (8, False): IMREAD_REDUCED_COLOR_8,
+    (1, True): IMREAD_GRAYSCALE,
+    (2, True): IMREAD_REDUCED_GRAYSCALE_2,
+    (4, True): IMREAD_REDUCED_GRAYSCALE_4,
+    (8, True): IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+Buffer = Union[bytes, bytearray, memoryview, ndarray]
 
 logging = logging.getLogger(__name__)  # type: ignore
 
@@ -21,15 +55,38 @@ class Image:
         self._data: ndarray = None
         self._path: Path = Path()
 
-    def load_image(self, path: Path) -> None:
-        """Load image from file."""
+    def load_image(
+        self, path: Path, reduction: int = 1, grayscale: bool = False
+    ) -> None:
+        """Load image from file.
+
+        :param path: path to image
+        :param reduction: factor image is downscaled by, see `load_buffer`
+        :param grayscale: whether to decode image to single channel
+        """
+        flags = get_read_flags(reduction, grayscale)
         if not isfile(path):
             raise FileNotFoundError(f"file {path} not found")
         else:
-            self._data = imread(str(path))
+            self._data = imread(str(path), flags)
             self._path = path
             logging.debug("Image loaded successful.")
 
+    def load_buffer(
+        self, buffer: Buffer, reduction: int = 1, grayscale: bool = False
+    ) -> None:
+        """Load image from memory without touching the filesystem.
+
+        :param buffer: encoded image as bytes, bytearray, memoryview or 1D
+            uint8 array, or already decoded image as 2D or 3D array
+        :param reduction: factor image is downscaled by, one of 1, 2, 4 and 8;
+            JPEG images are decoded directly at reduced size
+        :param grayscale: whether to decode image to single channel
+        """
+        self._data = decode_image(buffer, reduction, grayscale)
+        self._path = Path()
+        logging.debug("Image decoded successful.")
+
     def save(self, path: Path) -> None:
         """Save image to file."""
         imwrite(path, self.data)
@@ -53,10 +110,14 @@ class Image:
         """Get cropped image."""
         return self.data[y_start:y_end, x_start:x_end]
 
-    def show(self) -> None:
-        """Show visual representation of image on screen."""
+    def show(self, wait_time: int = WAIT_TIME) -> None:
+        """Show visual representation of image on screen.
+
+        :param wait_time: milliseconds to wait for key press, 0 waits forever
+            and 1 only refreshes window, e.g. between video frames
+        """
         imshow("x", self.data)
-        waitKey(WAIT_TIME)
+        waitKey(wait_time)
 
     @property
     def data(self) -> ndarray:
@@ -71,3 +132,41 @@ class Image:
     def path(self) -> Path:
         """Image path property."""
         return self._path
+
+
+def decode_image(
+    buffer: Buffer, reduction: int = 1, grayscale: bool = False
+) -> ndarray:
+    """Decode image from memory.
+
+    Encoded buffers are wrapped without copying and decoded by OpenCV.
+
+    :param buffer: encoded image as bytes, bytearray, memoryview or 1D uint8
+        array, or already decoded image as 2D or 3D array
+    :param reduction: factor image is downscaled by, one of 1, 2, 4 and 8
+    :param grayscale: whether to decode image to single channel
+    """
+    flags = get_read_flags(reduction, grayscale)
+    if isinstance(buffer, ndarray) and buffer.ndim > 1:
+        data = buffer
+        if grayscale and data.ndim == 3:
+            data = cvtColor(data, COLOR_BGR2GRAY)
+        if reduction > 1:
+            height, width = data.shape[:2]
+            size = (-(-width // reduction), -(-height // reduction))
+            data = cv_resize(data, size, interpolation=INTER_AREA)
+        return data
+    encoded = frombuffer(buffer, dtype=uint8)
+    if not encoded.size:
+        raise ImageDecodeError("Image buffer is empty.")
+    data = imdecode(encoded, flags)
+    if data is None:
+        raise ImageDecodeError("Image could not be decoded.")
+    return data
+
+
+def get_read_flags(reduction: int = 1, grayscale: bool = False) -> int:
+    """Get OpenCV imread flags of reduction factor and color mode."""
+    if (reduction, grayscale) not in READ_FLAGS:
+        raise ValueError(f"reduction must be one of 1, 2, 4 and 8, got {reduction}")
+    return READ_FLAGS[reduction, grayscale]
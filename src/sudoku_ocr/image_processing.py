@@ -1,19 +1,29 @@
 """Image processing."""
 
+import json
 import logging
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from heapq import nlargest
+from operator import itemgetter
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from cv2 import (
     ADAPTIVE_THRESH_GAUSSIAN_C,
+    CC_STAT_HEIGHT,
+    CC_STAT_WIDTH,
     CHAIN_APPROX_SIMPLE,
     COLOR_BGR2GRAY,
     COLOR_GRAY2BGR,
+    INTER_AREA,
     RETR_EXTERNAL,
-    THRESH_BINARY,
+    THRESH_BINARY_INV,
     GaussianBlur,
     adaptiveThreshold,
     approxPolyDP,
     arcLength,
-    bitwise_not,
+    connectedComponentsWithStats,
     contourArea,
     countNonZero,
     cvtColor,
@@ -21,41 +31,224 @@ from cv2 import (
     findContours,
     imshow,
     inRange,
+    isContourConvex,
+    resize,
     waitKey,
 )
 from imutils import grab_contours
-from imutils.perspective import four_point_transform
-from numpy import ndarray
-from skimage.segmentation import clear_border
+from numpy import (
+    count_nonzero,
+    empty,
+    maximum,
+    median,
+    minimum,
+    ndarray,
+    uint8,
+    zeros,
+)
+from numpy.lib.stride_tricks import as_strided
 
+from sudoku_ocr.border import clear_border, get_borders
+from sudoku_ocr.exceptions import GridNotFoundError
 from sudoku_ocr.image import WAIT_TIME, Image
+from sudoku_ocr.instrumentation import instrumented
+from sudoku_ocr.perspective import four_point_transform, warp_to_size
+
+GRID_SIZE = 9
 
 logging = logging.getLogger(__name__)  # type: ignore
 
 
+@dataclass(frozen=True)
+class ThresholdParameters:
+    """Parameters of `ImageProcessing.thresholding`."""
+
+    blur_kernel: int = 7
+    blur_sigma: float = 3
+    block_size: int = 11
+    offset: float = 2
+
+
+# default cascade: tuned default, then sets for low contrast, uneven
+# lighting or glare and noise
+DEFAULT_CASCADE = (
+    ThresholdParameters(),
+    ThresholdParameters(blur_kernel=3, blur_sigma=1, block_size=11, offset=1),
+    ThresholdParameters(blur_kernel=7, blur_sigma=3, block_size=31, offset=1),
+    ThresholdParameters(blur_kernel=5, blur_sigma=2, block_size=41, offset=2),
+    ThresholdParameters(blur_kernel=5, blur_sigma=1, block_size=21, offset=5),
+)
+
+
+class ThresholdCascade:
+    """Thresholding parameter sets ordered by their success rate.
+
+    Success rate is estimated as ``(successes + 1) / (attempts + 2)``, so
+    sets which located plausible grid move forward, failing sets fall
+    behind sets not tried yet, and ties keep the original order. Used by
+    `ImageProcessing.locate_grid`.
+    """
+
+    def __init__(
+        self, candidates: Sequence[ThresholdParameters] = DEFAULT_CASCADE
+    ) -> None:
+        """Initialize ThresholdCascade class.
+
+        :param candidates: parameter sets in initial order
+        """
+        self._candidates = list(candidates)
+        self._attempts = [0] * len(self._candidates)
+        self._successes = [0] * len(self._candidates)
+        self._lock = Lock()
+
+    @property
+    def candidates(self) -> List[ThresholdParameters]:
+        """Parameter sets in initial order."""
+        return list(self._candidates)
+
+    @property
+    def order(self) -> List[ThresholdParameters]:
+        """Parameter sets ordered by success rate, best first."""
+        with self._lock:
+            rates = [
+                (successes + 1) / (attempts + 2)
+                for successes, attempts in zip(self._successes, self._attempts)
+            ]
+        indices = sorted(range(len(rates)), key=lambda index: -rates[index])
+        return [self._candidates[index] for index in indices]
+
+    def record(self, parameters: ThresholdParameters, success: bool) -> None:
+        """Record outcome of parameter set.
+
+        :param parameters: one of `candidates`
+        :param success: whether plausible grid has been located
+        """
+        index = self._candidates.index(parameters)
+        with self._lock:
+            self._attempts[index] += 1
+            self._successes[index] += success
+
+    @property
+    def statistics(self) -> List[Dict[str, Any]]:
+        """Attempts and successes of every parameter set in initial order."""
+        with self._lock:
+            return [
+                {
+                    "parameters": asdict(candidate),
+                    "attempts": attempts,
+                    "successes": successes,
+                }
+                for candidate, attempts, successes in zip(
+                    self._candidates, self._attempts, self._successes
+                )
+            ]
+
+    def to_json(self) -> str:
+        """Serialize parameter sets with their statistics."""
+        return json.dumps(self.statistics)
+
+    @classmethod
+    def from_json(cls, content: str) -> "ThresholdCascade":
+        """Deserialize parameter sets with their statistics."""
+        statistics = json.loads(content)
+        cascade = cls(
+            [ThresholdParameters(**item["parameters"]) for item in statistics]
+        )
+        cascade._attempts = [item["attempts"] for item in statistics]
+        cascade._successes = [item["successes"] for item in statistics]
+        return cascade
+
+
+class WorkBuffers:
+    """Arrays reused by pipeline stages across images.
+
+    Stage writes its result into array left by previous image of the same
+    size instead of allocating new one. Data of image processed with
+    buffers is therefore valid only until the next image of the same size
+    is processed with them.
+    """
+
+    def __init__(self, max_arrays: int = 16) -> None:
+        """Initialize WorkBuffers class.
+
+        :param max_arrays: maximal number of kept arrays, least recently used
+            are released first
+        """
+        self._max_arrays = max_arrays
+        self._arrays: "OrderedDict[Tuple[str, Tuple[int, ...]], ndarray]" = (
+            OrderedDict()
+        )
+
+    def get(self, name: str, shape: Tuple[int, ...]) -> ndarray:
+        """Get uint8 array of stage, allocating it on first use.
+
+        :param name: name of stage result
+        :param shape: shape of stage result
+        """
+        key = (name, tuple(shape))
+        if key in self._arrays:
+            self._arrays.move_to_end(key)
+            return self._arrays[key]
+        array = self._arrays[key] = empty(shape, dtype=uint8)
+        while len(self._arrays) > self._max_arrays:
+            self._arrays.popitem(last=False)
+        return array
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of kept arrays."""
+        return sum(array.nbytes for array in self._arrays.values())
+
+
 class ImageProcessing(Image):
     """ImageProcessing class."""
 
-    def __init__(self) -> None:
-        """Initialize ImageProcessing class."""
+    def __init__(self, buffers: Optional[WorkBuffers] = None) -> None:
+        """Initialize ImageProcessing class.
+
+        :param buffers: arrays to reuse for results of stages, new arrays are
+            allocated for every image when not given
+        """
         super().__init__()
+        self._buffers = buffers
 
-    def thresholding(self) -> None:
-        """Apply thresholding on image."""
-        grayscale = cvtColor(self.data, COLOR_BGR2GRAY)
-        blurred = GaussianBlur(grayscale, (7, 7), 3)
-        thresh = adaptiveThreshold(
+    def _get_buffer(self, name: str, shape: Tuple[int, ...]) -> Optional[ndarray]:
+        """Get work buffer of stage, None when buffers are not used."""
+        return None if self._buffers is None else self._buffers.get(name, shape)
+
+    @instrumented("thresholding")
+    def thresholding(self, parameters: ThresholdParameters = None) -> None:
+        """Apply thresholding on image.
+
+        Inverted threshold is computed directly with `THRESH_BINARY_INV`.
+
+        :param parameters: blur and adaptive threshold parameters
+        """
+        parameters = parameters or ThresholdParameters()
+        grayscale = self.data
+        shape = grayscale.shape[:2]
+        if grayscale.ndim == 3:
+            grayscale = cvtColor(
+                grayscale, COLOR_BGR2GRAY, dst=self._get_buffer("grayscale", shape)
+            )
+        blurred = GaussianBlur(
+            grayscale,
+            (parameters.blur_kernel, parameters.blur_kernel),
+            parameters.blur_sigma,
+            dst=self._get_buffer("blurred", shape),
+        )
+        self.data = adaptiveThreshold(
             blurred,
             255,
             ADAPTIVE_THRESH_GAUSSIAN_C,
-            THRESH_BINARY,
-            11,
-            2,
+            THRESH_BINARY_INV,
+            parameters.block_size,
+            parameters.offset,
+            dst=self._get_buffer("thresholded", shape),
         )
-        inverse = bitwise_not(thresh)
-        self.data = inverse
         logging.debug("Thresholding successful.")
 
+    @instrumented("get_contours")
     def get_contours(self) -> ndarray:
         """Get contours present in image."""
         contours = findContours(
@@ -68,6 +261,7 @@ class ImageProcessing(Image):
         return sorted(contours, key=contourArea, reverse=True)
 
     @staticmethod
+    @instrumented("get_largest_rectangle_contours")
     def get_largest_rectangle_contours(contours: ndarray) -> ndarray:
         """Look for largest rectangle contours."""
         for cnt in contours:
@@ -79,18 +273,218 @@ class ImageProcessing(Image):
             if len(approx) == 4:
                 logging.debug(f"Largest rectangle contours are:\n {approx}")
                 return approx
-        raise Exception("Largest rectangle have not been found.")
+        raise GridNotFoundError("Largest rectangle have not been found.")
+
+    @instrumented("get_grid_candidates")
+    def get_grid_candidates(
+        self,
+        top_k: int = 5,
+        min_area_ratio: float = 0.05,
+        max_aspect_ratio: float = 2.0,
+    ) -> list:
+        """Get contours which could be sudoku grid, largest first.
+
+        Unlike `get_contours`, not every contour is traced and sorted. Blobs
+        are prefiltered with bounding boxes of all connected components at
+        once: those with box smaller than `min_area_ratio` of the image or
+        more elongated than `max_aspect_ratio` are dropped before contours
+        are searched. Only `top_k` largest of remaining contours are kept.
+
+        :param top_k: maximal number of candidates
+        :param min_area_ratio: minimal contour area relative to image area
+        :param max_aspect_ratio: maximal ratio of bounding box sides
+        """
+        height, width = self.data.shape[:2]
+        min_area = min_area_ratio * height * width
+        number, labels, stats, _ = connectedComponentsWithStats(
+            self.data, connectivity=8
+        )
+        box_widths, box_heights = stats[1:, CC_STAT_WIDTH], stats[1:, CC_STAT_HEIGHT]
+        keep = zeros(number, dtype=uint8)
+        keep[1:][
+            (box_widths * box_heights >= min_area)
+            & (
+                maximum(box_widths, box_heights)
+                <= max_aspect_ratio * minimum(box_widths, box_heights)
+            )
+        ] = 255
+        contours = grab_contours(
+            findContours(keep[labels], RETR_EXTERNAL, CHAIN_APPROX_SIMPLE)
+        )
+        candidates = [(contourArea(contour), contour) for contour in contours]
+        candidates = nlargest(
+            top_k,
+            (candidate for candidate in candidates if candidate[0] >= min_area),
+            key=itemgetter(0),
+        )
+        logging.debug(f"Found {len(candidates)} of {number - 1} blobs.")
+        return [contour for _, contour in candidates]
+
+    @instrumented("find_grid")
+    def find_grid(
+        self,
+        top_k: int = 5,
+        min_area_ratio: float = 0.05,
+        max_aspect_ratio: float = 2.0,
+    ) -> ndarray:
+        """Find sudoku grid in thresholded image.
+
+        Fast counterpart of `get_contours` followed by
+        `get_largest_rectangle_contours`. Search stops at the first of
+        `get_grid_candidates` which is convex quadrilateral.
+
+        :return: 4x1x2 array of grid corners
+        """
+        for contour in self.get_grid_candidates(
+            top_k, min_area_ratio, max_aspect_ratio
+        ):
+            approx = approxPolyDP(contour, 0.02 * arcLength(contour, True), True)
+            if len(approx) == 4 and isContourConvex(approx):
+                logging.debug(f"Grid contours are:\n {approx}")
+                return approx
+        raise GridNotFoundError("Grid has not been found.")
 
+    @instrumented("adjust_perspective_to_specific_zone")
     def adjust_perspective_to_specific_zone(self, zone: ndarray) -> None:
         """Adjust perspective to specific zone."""
         self.data = four_point_transform(self.data, zone.reshape(4, 2))
         logging.debug(f"Perspective adjusted to zone:\n {zone}")
 
-    def improve_data_quality(self) -> None:
-        """Improve image data quality for better ocr."""
-        self.data = clear_border(self.data)
+    @instrumented("locate_grid")
+    def locate_grid(
+        self,
+        proxy_width: int = 600,
+        board_size: int = 450,
+        parameters: ThresholdParameters = None,
+        cascade: Optional["ThresholdCascade"] = None,
+    ) -> ndarray:
+        """Find board on downscaled proxy and adjust perspective at full resolution.
+
+        Thresholding and contour search run on a copy resized to
+        `proxy_width`, the scale their parameters are tuned for. Found
+        corners are scaled back and the original data is warped once,
+        directly to `board_size` x `board_size`, and then thresholded.
+        Resulting cells are uniform and keep as much detail as the original
+        image has.
+
+        With `cascade`, its parameter sets are tried in order on the same
+        grayscale proxy until one gives a quadrilateral whose warped board
+        has plausible grid lines, see `has_grid_lines`. The first found
+        quadrilateral is used when no set gives plausible grid. Outcome of
+        every tried set is recorded in the cascade.
+
+        :param proxy_width: width of image used to find the board
+        :param board_size: size of adjusted board in pixels
+        :param parameters: thresholding parameters, ignored with `cascade`
+        :param cascade: thresholding parameter sets to try
+        :return: 4x2 array of board corners in original image coordinates
+        """
+        height, width = self.data.shape[:2]
+        proxy_size = (proxy_width, int(height * (proxy_width / width)))
+        proxy = resize(
+            self.data,
+            proxy_size,
+            dst=self._get_buffer("proxy", proxy_size[::-1] + self.data.shape[2:]),
+            interpolation=INTER_AREA,
+        )
+        if cascade is None:
+            zone = self._find_zone(proxy, parameters) * width / proxy_width
+            self._warp(zone, board_size, parameters)
+            return zone
+        if proxy.ndim == 3:
+            proxy = cvtColor(
+                proxy,
+                COLOR_BGR2GRAY,
+                dst=self._get_buffer("proxy_grayscale", proxy.shape[:2]),
+            )
+        source, fallback = self.data, None
+        for candidate in cascade.order:
+            try:
+                zone = self._find_zone(proxy, candidate) * width / proxy_width
+            except GridNotFoundError:
+                cascade.record(candidate, False)
+                continue
+            self.data = source
+            self._warp(zone, board_size, candidate)
+            if has_grid_lines(self.data):
+                cascade.record(candidate, True)
+                logging.debug(f"Grid located with {candidate}.")
+                return zone
+            cascade.record(candidate, False)
+            if fallback is None:
+                fallback = zone, self.data.copy()
+        if fallback is None:
+            self.data = source
+            raise GridNotFoundError("Grid has not been found with any parameters.")
+        zone, self.data = fallback
+        logging.debug("Grid lines are not plausible with any parameters.")
+        return zone
+
+    def _find_zone(
+        self, proxy: ndarray, parameters: Optional[ThresholdParameters]
+    ) -> ndarray:
+        """Find 4x2 grid corners in proxy."""
+        image = ImageProcessing(self._buffers)
+        image.data = proxy
+        image.thresholding(parameters)
+        return image.find_grid().reshape(4, 2)
+
+    def _warp(
+        self,
+        zone: ndarray,
+        board_size: int,
+        parameters: Optional[ThresholdParameters],
+    ) -> None:
+        """Warp zone of data to board and threshold it."""
+        self.data = warp_to_size(
+            self.data,
+            zone,
+            (board_size, board_size),
+            dst=self._get_buffer(
+                "warped", (board_size, board_size) + self.data.shape[2:]
+            ),
+        )
+        self.thresholding(parameters)
+        logging.debug(f"Grid located at:\n {zone}")
+
+    @instrumented("improve_data_quality")
+    def improve_data_quality(self, engine: str = "opencv") -> None:
+        """Improve image data quality for better ocr.
+
+        :param engine: border clearing engine, one of `border.ENGINES`;
+            "skimage" requires scikit-image to be installed
+        """
+        self.data = clear_border(self.data, engine=engine)
         logging.debug("Data quality have been improved.")
 
+    @instrumented("improve_cells_quality")
+    def improve_cells_quality(self, engine: str = "opencv") -> None:
+        """Improve data quality of every board cell for better ocr.
+
+        Bulk counterpart of `improve_data_quality` called on every cell
+        returned by `get_cells`. Cells are stacked with blank separator rows
+        and labeled once, then components touching any cell border are
+        cleared in place, giving the same result as per cell `clear_border`.
+
+        :param engine: border clearing engine, one of `border.ENGINES`
+        """
+        cells = self.get_cells()
+        cell_height, cell_width = cells.shape[2:]
+        stacked = zeros(
+            (GRID_SIZE, GRID_SIZE, cell_height + 1, cell_width), dtype=cells.dtype
+        )
+        stacked[:, :, :cell_height] = cells
+        borders = zeros(stacked.shape, dtype=bool)
+        borders[:, :, :cell_height] = get_borders((cell_height, cell_width))
+        cleared = clear_border(
+            stacked.reshape(-1, cell_width),
+            borders.reshape(-1, cell_width),
+            engine=engine,
+        )
+        cells[...] = cleared.reshape(stacked.shape)[:, :, :cell_height]
+        logging.debug("Data quality of cells have been improved.")
+
+    @instrumented("is_empty")
     def is_empty(self, threshold: int = 5) -> bool:
         """Determine if data does not contain any information."""
         mask = inRange(self.data, 254, 255)
@@ -105,9 +499,114 @@ class ImageProcessing(Image):
             logging.debug(f"Empty: FALSE with {percent_white}% white pixels.")
             return False
 
-    def show_with_contours(self, contours: ndarray) -> None:
-        """Show image with contours marked."""
-        image_with_contours = cvtColor(self.data, COLOR_GRAY2BGR)
+    def get_cells(self, cell_shape: tuple = None) -> ndarray:
+        """Get board data split into cells.
+
+        Board is exposed as (9, 9, cell_height, cell_width) strided view, so
+        cell ``(row, col)`` is ``cells[row, col]`` and no data is copied.
+        Writing into the view modifies the board in place. Remaining pixels
+        when board size is not divisible by 9 are left out.
+
+        :param cell_shape: optional (height, width) to resample every cell to;
+            whole board is resampled once and view of the result is returned
+        :return: cells view
+        """
+        data = self.data
+        if cell_shape:
+            cell_height, cell_width = cell_shape
+            data = resize(
+                data,
+                (cell_width * GRID_SIZE, cell_height * GRID_SIZE),
+                interpolation=INTER_AREA,
+            )
+        height, width = data.shape[:2]
+        row_stride, col_stride = data.strides[:2]
+        cell_height, cell_width = height // GRID_SIZE, width // GRID_SIZE
+        return as_strided(
+            data,
+            shape=(GRID_SIZE, GRID_SIZE, cell_height, cell_width),
+            strides=(
+                cell_height * row_stride,
+                cell_width * col_stride,
+                row_stride,
+                col_stride,
+            ),
+        )
+
+    def get_cell(self, row: int, col: int) -> "ImageProcessing":
+        """Get single board cell sharing data with the board."""
+        cell = ImageProcessing()
+        cell.data = self.get_cells()[row, col]
+        return cell
+
+    @instrumented("get_occupancy_mask")
+    def get_occupancy_mask(self, threshold: int = 5) -> ndarray:
+        """Determine which cells of the board contain any information.
+
+        Batch counterpart of `is_empty` evaluated on every cell of the warped
+        board at once. Cell ``(row, col)`` is the same region which would be
+        obtained with `get_cropped` using ``height // 9`` by ``width // 9``
+        cells, so the result matches per cell `is_empty(threshold)` exactly.
+
+        :param threshold: percent of white pixels below which cell is empty
+        :return: 9x9 boolean array, True for occupied cells
+        """
+        occupancy = get_occupancy(self.get_cells(), threshold)
+        logging.debug(f"Found {count_nonzero(occupancy)} occupied cells.")
+        return occupancy
+
+    def show_with_contours(self, contours: ndarray, wait_time: int = WAIT_TIME) -> None:
+        """Show image with contours marked.
+
+        :param wait_time: milliseconds to wait for key press, see `Image.show`
+        """
+        image_with_contours = (
+            self.data.copy()
+            if self.data.ndim == 3
+            else cvtColor(self.data, COLOR_GRAY2BGR)
+        )
         drawContours(image_with_contours, [contours], -1, (0, 255, 0), 5)
         imshow("Contours", image_with_contours)
-        waitKey(WAIT_TIME)
+        waitKey(wait_time)
+
+
+def get_occupancy(cells: ndarray, threshold: int = 5) -> ndarray:
+    """Determine which of thresholded cells contain any information.
+
+    :param cells: (..., height, width) cells, e.g. `ImageProcessing.get_cells`
+        or memory mapped `dataset.CellDataset.cells`
+    :param threshold: percent of white pixels below which cell is empty
+    :return: boolean array of leading cells shape, True for occupied cells
+    """
+    cell_height, cell_width = cells.shape[-2:]
+    count_white = count_nonzero(cells >= 254, axis=(-2, -1))
+    percent_white = count_white * 100 / (cell_height * cell_width)
+    return ~(percent_white < threshold)
+
+
+def has_grid_lines(
+    board: ndarray, min_contrast: float = 0.25, min_lines: int = 12
+) -> bool:
+    """Check if thresholded board has lines of 9x9 grid.
+
+    Strength of each of 8 inner lines in both directions is the largest
+    fraction of white pixels in rows or columns close to its expected
+    position. Line is present when its strength exceeds median fraction
+    of the board by `min_contrast`.
+
+    :param board: warped and thresholded board
+    :param min_contrast: minimal difference of line strength and median
+    :param min_lines: minimal number of present lines out of 16
+    """
+    white = board >= 128
+    lines = 0
+    for axis in (0, 1):
+        profile = white.mean(axis=axis)
+        cell_size = len(profile) / GRID_SIZE
+        margin = max(1, int(0.1 * cell_size))
+        background = median(profile)
+        for line in range(1, GRID_SIZE):
+            center = int(line * cell_size)
+            window = profile[slice(max(0, center - margin), center + margin + 1)]
+            lines += window.max() >= background + min_contrast
+    return lines >= min_lines
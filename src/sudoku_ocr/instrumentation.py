@@ -0,0 +1,216 @@
+"""Instrumentation of pipeline stages.
+
+Methods decorated with `instrumented` report a `StageRecord` to every
+registered recorder. When no recorder is registered the only cost is
+a single list check per call.
+
+Usage::
+
+    with recording() as statistics:
+        image.thresholding()
+        ...
+    statistics.write(Path("/var/lib/node_exporter/sudoku_ocr.prom"))
+"""
+
+import json
+import os
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import perf_counter, process_time
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+RESERVOIR_SIZE = 10000
+METRIC_PREFIX = "sudoku_ocr_stage"
+
+
+@dataclass
+class StageRecord:
+    """Measurements of single stage call."""
+
+    stage: str
+    wall_time: float
+    cpu_time: float
+    input_shape: Optional[Tuple[int, ...]]
+    output_nbytes: int
+
+
+Recorder = Callable[[StageRecord], None]
+
+_recorders: List[Recorder] = []
+
+
+def add_recorder(recorder: Recorder) -> None:
+    """Register callback called with every `StageRecord`."""
+    _recorders.append(recorder)
+
+
+def remove_recorder(recorder: Recorder) -> None:
+    """Unregister callback."""
+    _recorders.remove(recorder)
+
+
+def instrumented(stage: str) -> Callable:
+    """Decorate pipeline stage to report its measurements.
+
+    Input shape is the shape of ``data`` of the object method is called on.
+    Output size is the size of returned arrays or, for methods returning
+    nothing, of ``data`` after the call.
+
+    :param stage: name of the stage
+    """
+
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _recorders:
+                return function(*args, **kwargs)
+            data = getattr(args[0], "data", None) if args else None
+            start_wall, start_cpu = perf_counter(), process_time()
+            result = function(*args, **kwargs)
+            record = StageRecord(
+                stage=stage,
+                wall_time=perf_counter() - start_wall,
+                cpu_time=process_time() - start_cpu,
+                input_shape=getattr(data, "shape", None),
+                output_nbytes=_nbytes(
+                    getattr(args[0], "data", None) if result is None else result
+                ),
+            )
+            for recorder in _recorders:
+                recorder(record)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _nbytes(output: Any) -> int:
+    """Get size of arrays in output."""
+    if isinstance(output, (list, tuple)):
+        return sum(_nbytes(item) for item in output)
+    return getattr(output, "nbytes", 0)
+
+
+class StageStatistics:
+    """Aggregated measurements of pipeline stages.
+
+    Quantiles are computed over last `reservoir_size` calls of each stage,
+    counts and sums over all calls.
+    """
+
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE) -> None:
+        """Initialize StageStatistics class."""
+        self._reservoir_size = reservoir_size
+        self._lock = Lock()
+        self._count: Dict[str, int] = {}
+        self._sums: Dict[str, Dict[str, float]] = {}
+        self._samples: Dict[str, Dict[str, Deque[float]]] = {}
+
+    def record(self, record: StageRecord) -> None:
+        """Add single stage measurements, usable as recorder."""
+        values = {
+            "wall_seconds": record.wall_time,
+            "cpu_seconds": record.cpu_time,
+            "output_bytes": float(record.output_nbytes),
+        }
+        with self._lock:
+            if record.stage not in self._count:
+                self._count[record.stage] = 0
+                self._sums[record.stage] = dict.fromkeys(values, 0.0)
+                self._samples[record.stage] = {
+                    name: deque(maxlen=self._reservoir_size) for name in values
+                }
+            self._count[record.stage] += 1
+            for name, value in values.items():
+                self._sums[record.stage][name] += value
+                self._samples[record.stage][name].append(value)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Get count, sum and quantiles of every metric of every stage."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": self._count[stage],
+                    **{
+                        name: {
+                            "sum": self._sums[stage][name],
+                            **_quantiles(samples),
+                        }
+                        for name, samples in self._samples[stage].items()
+                    },
+                }
+                for stage in self._count
+            }
+
+    def to_json(self) -> str:
+        """Export summary as json."""
+        return json.dumps(self.summary(), indent=2, sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Export summary in Prometheus text exposition format."""
+        summary = self.summary()
+        names = sorted(
+            {name for stage in summary.values() for name in stage} - {"count"}
+        )
+        lines = []
+        for name in names:
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(
+                f"# HELP {metric} {name.replace('_', ' ')} of pipeline stages."
+            )
+            lines.append(f"# TYPE {metric} summary")
+            for stage, metrics in sorted(summary.items()):
+                for quantile in QUANTILES:
+                    value = metrics[name][f"p{round(quantile * 100)}"]
+                    lines.append(
+                        f'{metric}{{stage="{stage}",quantile="{quantile}"}} {value}'
+                    )
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {metrics[name]["sum"]}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {metrics["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Atomically write summary to file.
+
+        Format is json for ``.json`` suffix and Prometheus text otherwise,
+        e.g. ``.prom`` files read by node exporter textfile collector.
+
+        :param path: output file
+        """
+        path = Path(path)
+        content = self.to_json() if path.suffix == ".json" else self.to_prometheus()
+        with NamedTemporaryFile("w", dir=path.parent, delete=False) as stream:
+            stream.write(content)
+        os.replace(stream.name, path)
+
+
+def _quantiles(samples: Deque[float]) -> Dict[str, float]:
+    """Get nearest rank quantiles of samples."""
+    ordered = sorted(samples)
+    return {
+        f"p{round(quantile * 100)}": ordered[
+            min(int(quantile * len(ordered)), len(ordered) - 1)
+        ]
+        for quantile in QUANTILES
+    }
+
+
+@contextmanager
+def recording(reservoir_size: int = RESERVOIR_SIZE) -> Iterator[StageStatistics]:
+    """Collect statistics of stages called inside of context.
+
+    :param reservoir_size: number of last calls of each stage quantiles are computed over
+    """
+    statistics = StageStatistics(reservoir_size)
+    add_recorder(statistics.record)
+    try:
+        yield statistics
+    finally:
+        remove_recorder(statistics.record)
@@ -0,0 +1,63 @@
+"""Perspective transform.
+
+Same as `imutils.perspective`, but without its scipy dependency.
+"""
+
+from cv2 import getPerspectiveTransform, warpPerspective
+from numpy import argsort, array, float32, ndarray, sqrt
+from numpy.linalg import norm
+
+
+def order_points(points: ndarray) -> ndarray:
+    """Order points as top-left, top-right, bottom-right, bottom-left.
+
+    :param points: 4x2 array of (x, y) points
+    """
+    x_sorted = points[argsort(points[:, 0]), :]
+    left_most = x_sorted[:2, :]
+    right_most = x_sorted[2:, :]
+    top_left, bottom_left = left_most[argsort(left_most[:, 1]), :]
+    # point furthest from top-left is bottom-right one
+    distance = norm(right_most - top_left, axis=1)
+    bottom_right, top_right = right_most[argsort(distance)[::-1], :]
+    return array([top_left, top_right, bottom_right, bottom_left], dtype=float32)
+
+
+def four_point_transform(image: ndarray, points: ndarray) -> ndarray:
+    """Get top-down view of quadrilateral zone of image.
+
+    Size of result is given by the longest edges of the zone.
+
+    :param image: image to transform
+    :param points: 4x2 array of zone corners
+    """
+    rect = order_points(points)
+    top_left, top_right, bottom_right, bottom_left = rect
+    width = max(
+        int(sqrt(((bottom_right - bottom_left) ** 2).sum())),
+        int(sqrt(((top_right - top_left) ** 2).sum())),
+    )
+    height = max(
+        int(sqrt(((top_right - bottom_right) ** 2).sum())),
+        int(sqrt(((top_left - bottom_left) ** 2).sum())),
+    )
+    return warp_to_size(image, rect, (width, height))
+
+
+def warp_to_size(
+    image: ndarray, points: ndarray, size: tuple, dst: ndarray = None
+) -> ndarray:
+    """Get top-down view of quadrilateral zone of image with fixed size.
+
+    :param image: image to transform
+    :param points: 4x2 array of zone corners
+    :param size: (width, height) of result
+    :param dst: optional array to write result into
+    """
+    width, height = size
+    destination = array(
+        [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]],
+        dtype=float32,
+    )
+    matrix = getPerspectiveTransform(order_points(points), destination)
+    return warpPerspective(image, matrix, (width, height), dst=dst)
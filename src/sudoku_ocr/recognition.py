@@ -0,0 +1,446 @@
+"""Digit recognition.
+
+`DigitRecognizer` stacks all occupied cells of the board into a single
+batch and classifies them with one classifier call. Classifier backends are
+selectable by name from `CLASSIFIERS`:
+
+* "knn" - nearest neighbours over normalized cell pixels in NumPy, needs
+  no model file and no TensorFlow,
+* "opencv" - model exported to ONNX run with OpenCV DNN module,
+* "keras" - saved Keras model, requires TensorFlow to be installed.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Protocol, Tuple, Union
+
+from cv2 import (
+    CC_STAT_AREA,
+    CC_STAT_HEIGHT,
+    CC_STAT_LEFT,
+    CC_STAT_TOP,
+    CC_STAT_WIDTH,
+    FONT_HERSHEY_COMPLEX,
+    FONT_HERSHEY_COMPLEX_SMALL,
+    FONT_HERSHEY_DUPLEX,
+    FONT_HERSHEY_PLAIN,
+    FONT_HERSHEY_SIMPLEX,
+    FONT_HERSHEY_TRIPLEX,
+    FONT_ITALIC,
+    INTER_AREA,
+    HOGDescriptor,
+    connectedComponentsWithStats,
+    putText,
+    resize,
+)
+from numpy import (
+    add,
+    append,
+    arange,
+    argpartition,
+    array,
+    flatnonzero,
+    float32,
+    lexsort,
+    linalg,
+    load,
+    ndarray,
+    savez,
+    stack,
+    uint8,
+    where,
+    zeros,
+)
+
+from sudoku_ocr.image_processing import GRID_SIZE, ImageProcessing
+
+CELL_SHAPE = (28, 28)
+DIGIT_SIZE = 20
+# HOG window, block, block stride, cell and number of orientation bins
+HOG_PARAMETERS = ((28, 28), (8, 8), (4, 4), (4, 4), 9)
+LINE_MARGIN = 0.2
+LINE_FRACTION = 0.6
+CENTER_TOLERANCE = 0.25
+MAX_DIGIT_SIZE = 0.9
+FONTS = (
+    FONT_HERSHEY_SIMPLEX,
+    FONT_HERSHEY_PLAIN,
+    FONT_HERSHEY_DUPLEX,
+    FONT_HERSHEY_COMPLEX,
+    FONT_HERSHEY_TRIPLEX,
+    FONT_HERSHEY_COMPLEX_SMALL,
+    FONT_HERSHEY_SIMPLEX | FONT_ITALIC,
+)
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+class Classifier(Protocol):
+    """Digit classifier.
+
+    Classifiers may also expose `parameters`, json serializable
+    configuration their predictions depend on, which is part of cache keys.
+    """
+
+    def predict(self, batch: ndarray) -> ndarray:
+        """Classify batch of cells.
+
+        :param batch: (n, height, width) float32 cells scaled to [0, 1],
+            digit is white on black
+        :return: (n, 10) probabilities of digits 0-9 or (n, 9) of digits 1-9
+        """
+
+
+class KerasClassifier:
+    """Classifier backed by saved Keras model.
+
+    TensorFlow is imported and model loaded on first prediction. Whole batch
+    is passed through the model at once, which runs on CPU when no GPU is
+    available.
+    """
+
+    def __init__(self, model_path: Path) -> None:
+        """Initialize KerasClassifier class."""
+        self._model_path = model_path
+        self._model: Any = None
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Configuration predictions depend on."""
+        return {"model_path": str(self._model_path)}
+
+    def predict(self, batch: ndarray) -> ndarray:
+        """Classify batch of cells with single forward pass."""
+        if self._model is None:
+            from tensorflow import keras
+
+            self._model = keras.models.load_model(self._model_path)
+        return self._model(batch[..., None], training=False).numpy()
+
+
+class OpenCVClassifier:
+    """Classifier backed by ONNX model run with OpenCV DNN module.
+
+    Model takes (n, 1, height, width) float32 input and returns
+    probabilities. It is loaded on first prediction.
+    """
+
+    def __init__(self, model_path: Path) -> None:
+        """Initialize OpenCVClassifier class."""
+        self._model_path = model_path
+        self._net: Any = None
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Configuration predictions depend on."""
+        return {"model_path": str(self._model_path)}
+
+    def predict(self, batch: ndarray) -> ndarray:
+        """Classify batch of cells with single forward pass."""
+        if self._net is None:
+            from cv2.dnn import readNet
+
+            self._net = readNet(str(self._model_path))
+        self._net.setInput(batch[:, None])
+        return self._net.forward()
+
+
+class KNearestClassifier:
+    """Nearest neighbours classifier over HOG descriptors of normalized cells.
+
+    Every cell is reduced to its largest component, scaled to fit
+    `DIGIT_SIZE` and centered, then its HOG descriptor is compared by cosine
+    similarity with all samples at once. Probability of a digit is its share of similarity of
+    `k` nearest samples. Without `model_path` samples are digits rendered
+    with OpenCV Hershey fonts.
+    """
+
+    def __init__(self, model_path: Path = None, k: int = 3) -> None:
+        """Initialize KNearestClassifier class.
+
+        :param model_path: npz file written by `save`
+        :param k: number of nearest samples
+        """
+        self._model_path = model_path
+        self._k = k
+        if model_path is None:
+            self.fit(*render_digits())
+        else:
+            with load(model_path) as model:
+                self._samples, self._digits = model["samples"], model["digits"]
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Configuration predictions depend on.
+
+        Samples fitted in memory are not covered.
+        """
+        model_path = None if self._model_path is None else str(self._model_path)
+        return {"model_path": model_path, "k": self._k}
+
+    def fit(self, batch: ndarray, digits: ndarray) -> None:
+        """Replace samples with labeled cells.
+
+        :param batch: (n, height, width) cells scaled to [0, 1]
+        :param digits: (n,) digits 1-9 of the cells
+        """
+        self._samples = self._embed(batch)
+        self._digits = array(digits)
+
+    def save(self, model_path: Path) -> None:
+        """Save samples to npz file."""
+        savez(model_path, samples=self._samples, digits=self._digits)
+
+    def predict(self, batch: ndarray) -> ndarray:
+        """Classify batch of cells.
+
+        :return: (n, 9) probabilities of digits 1-9
+        """
+        similarity = self._embed(batch) @ self._samples.T
+        k = min(self._k, similarity.shape[1])
+        nearest = argpartition(-similarity, k - 1, axis=1)[:, :k]
+        weights = similarity[arange(len(batch))[:, None], nearest].clip(min=1e-6)
+        probabilities = zeros((len(batch), 9), dtype=float32)
+        add.at(
+            probabilities,
+            (arange(len(batch))[:, None], self._digits[nearest] - 1),
+            weights,
+        )
+        return probabilities
+
+    @staticmethod
+    def _embed(batch: ndarray) -> ndarray:
+        """Get unit length HOG descriptors of normalized cells."""
+        descriptor = HOGDescriptor(*HOG_PARAMETERS)
+        vectors = array(
+            [
+                descriptor.compute((cell * 255).astype(uint8))
+                for cell in normalize_cells(batch)
+            ],
+            dtype=float32,
+        ).reshape(len(batch), -1)
+        norms = linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / where(norms, norms, 1)
+
+
+def isolate_digits(cells: ndarray, min_height: float = 0.4) -> ndarray:
+    """Keep only digit in every thresholded cell, in place.
+
+    Rows and columns close to cell borders which are mostly white are grid
+    lines and are cleared first, so digits touching them are separated.
+    Digit is the largest component centered in the cell which is at least
+    `min_height` of cell height tall and does not span the whole cell.
+    Everything else, e.g. grid line fragments, is cleared. Unlike border
+    clearing, digits crossing cell borders of imprecisely warped boards are
+    kept. Cells are stacked with blank separators and labeled at once.
+
+    :param cells: (9, 9, height, width) cells, e.g. `ImageProcessing.get_cells`
+    :param min_height: minimal height of digit relative to cell height
+    :return: 9x9 boolean array, True for cells with digit
+    """
+    rows, cols, height, width = cells.shape
+    margin = round(height * LINE_MARGIN), round(width * LINE_MARGIN)
+    white = cells >= 128
+    line_rows = white.mean(axis=3) >= LINE_FRACTION
+    line_cols = white.mean(axis=2) >= LINE_FRACTION
+    line_rows[:, :, slice(margin[0], height - margin[0])] = False
+    line_cols[:, :, slice(margin[1], width - margin[1])] = False
+    white &= ~(line_rows[..., None] | line_cols[..., None, :])
+
+    stacked = zeros((rows, height + 1, cols, width + 1), dtype=uint8)
+    stacked[:, :height, :, :width] = white.transpose(0, 2, 1, 3)
+    _, labels, stats, centroids = connectedComponentsWithStats(
+        stacked.reshape(rows * (height + 1), cols * (width + 1)), connectivity=8
+    )
+    stats, centroids = stats[1:], centroids[1:, ::-1]
+    cell_rows = stats[:, CC_STAT_TOP] // (height + 1)
+    cell_cols = stats[:, CC_STAT_LEFT] // (width + 1)
+    shape = array([height, width])
+    sizes = stats[:, [CC_STAT_HEIGHT, CC_STAT_WIDTH]] / shape
+    corners = stack((cell_rows, cell_cols), axis=1) * (shape + 1)
+    offsets = abs((centroids - corners) / shape - 0.5)
+    plausible = flatnonzero(
+        (sizes[:, 0] >= min_height)
+        & (sizes < MAX_DIGIT_SIZE).all(axis=1)
+        & (offsets < CENTER_TOLERANCE).all(axis=1)
+    )
+    # largest plausible component of every cell is the last one of the cell
+    order = plausible[
+        lexsort(
+            (stats[plausible, CC_STAT_AREA], cell_cols[plausible], cell_rows[plausible])
+        )
+    ]
+    cell_index = cell_rows[order] * cols + cell_cols[order]
+    last = cell_index != append(cell_index[1:], -1)
+    digits = order[last]
+    occupancy = zeros((rows, cols), dtype=bool)
+    occupancy[cell_rows[digits], cell_cols[digits]] = True
+    kept = zeros(len(stats) + 1, dtype=bool)
+    kept[digits + 1] = True
+    digit_pixels = kept[labels].reshape(rows, height + 1, cols, width + 1)
+    cells[...] = where(
+        digit_pixels[:, :height, :, :width].transpose(0, 2, 1, 3), 255, 0
+    )
+    return occupancy
+
+
+def normalize_cells(batch: ndarray, digit_size: int = DIGIT_SIZE) -> ndarray:
+    """Center largest component of every cell scaled to fit `digit_size`.
+
+    Noise left besides digits is dropped, so position and size of digits
+    within cells do not matter.
+
+    :param batch: (n, height, width) cells scaled to [0, 1]
+    :param digit_size: size of longer side of scaled digit
+    :return: (n, 28, 28) float32 cells
+    """
+    out = zeros((len(batch),) + CELL_SHAPE, dtype=float32)
+    for cell, normalized in zip(batch, out):
+        number, labels, stats, _ = connectedComponentsWithStats(
+            (cell > 0.1).view(uint8), connectivity=8
+        )
+        if number < 2:
+            continue
+        largest = 1 + stats[1:, CC_STAT_AREA].argmax()
+        left, top, width, height = stats[largest, :CC_STAT_AREA]
+        box = slice(top, top + height), slice(left, left + width)
+        digit = where(labels[box] == largest, cell[box], 0).astype(float32)
+        scale = digit_size / max(height, width)
+        width, height = max(1, round(width * scale)), max(1, round(height * scale))
+        top, left = (CELL_SHAPE[0] - height) // 2, (CELL_SHAPE[1] - width) // 2
+        box = slice(top, top + height), slice(left, left + width)
+        normalized[box] = resize(digit, (width, height), interpolation=INTER_AREA)
+    return out
+
+
+def render_digits() -> Tuple[ndarray, ndarray]:
+    """Render digits 1-9 with OpenCV Hershey fonts in several thicknesses.
+
+    :return: (n, 60, 60) float32 cells scaled to [0, 1] and (n,) digits
+    """
+    cells, digits = [], []
+    for font in FONTS:
+        for thickness in (1, 2, 3, 4):
+            for digit in range(1, 10):
+                cell = zeros((60, 60), dtype=uint8)
+                putText(cell, str(digit), (10, 50), font, 1.5, 255, thickness)
+                cells.append(cell)
+                digits.append(digit)
+    return stack(cells).astype(float32) / 255, array(digits)
+
+
+CLASSIFIERS = {
+    "knn": KNearestClassifier,
+    "opencv": OpenCVClassifier,
+    "keras": KerasClassifier,
+}
+
+
+def get_classifier(name: str, **kwargs: Any) -> Classifier:
+    """Create classifier backend by name.
+
+    :param name: one of `CLASSIFIERS`
+    :param kwargs: arguments of the backend, e.g. ``model_path``
+    """
+    if name not in CLASSIFIERS:
+        raise ValueError(f"classifier {name} not in {tuple(CLASSIFIERS)}")
+    return CLASSIFIERS[name](**kwargs)
+
+
+class DigitRecognizer:
+    """Recognize digits of all occupied board cells at once."""
+
+    def __init__(
+        self,
+        classifier: Union[Classifier, str] = "knn",
+        cell_shape: Tuple[int, int] = CELL_SHAPE,
+        threshold: int = 5,
+        min_height: float = 0.4,
+    ) -> None:
+        """Initialize DigitRecognizer class.
+
+        :param classifier: classifier of cells or name of backend in
+            `CLASSIFIERS` created without arguments
+        :param cell_shape: (height, width) cells are resampled to
+        :param threshold: `ImageProcessing.is_empty` threshold of isolated
+            digits
+        :param min_height: `isolate_digits` minimal height of digits
+        """
+        if isinstance(classifier, str):
+            classifier = get_classifier(classifier)
+        self._classifier = classifier
+        self._cell_shape = cell_shape
+        self._threshold = threshold
+        self._min_height = min_height
+
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Configuration recognized digits depend on.
+
+        Classifier is identified by its type and its `parameters`, when it
+        has them.
+        """
+        return {
+            "classifier": type(self._classifier).__name__,
+            **getattr(self._classifier, "parameters", {}),
+            "cell_shape": list(self._cell_shape),
+            "threshold": self._threshold,
+            "min_height": self._min_height,
+        }
+
+    def get_batch(self, board: ImageProcessing) -> Tuple[ndarray, ndarray]:
+        """Get normalized batch of occupied cells.
+
+        Digits are isolated on a copy of the board, so the board itself is
+        not modified.
+
+        :param board: warped and thresholded board
+        :return: (n, height, width) batch and 9x9 occupancy mask
+        """
+        cleared = ImageProcessing()
+        cleared.data = board.data.copy()
+        occupancy = isolate_digits(cleared.get_cells(), self._min_height)
+        occupancy &= cleared.get_occupancy_mask(self._threshold)
+        cells = cleared.get_cells(self._cell_shape)
+        batch = cells[occupancy].astype(float32)
+        batch /= 255
+        return batch, occupancy
+
+    def recognize(self, board: ImageProcessing) -> Tuple[ndarray, ndarray]:
+        """Recognize digits of the board.
+
+        :param board: warped and thresholded board
+        :return: 9x9 grid of digits, 0 for empty cells, and 9x9 confidences,
+            1 for empty cells
+        """
+        return get_digits(self.recognize_probabilities(board))
+
+    def recognize_probabilities(self, board: ImageProcessing) -> ndarray:
+        """Get probabilities of digits of the board.
+
+        :param board: warped and thresholded board
+        :return: 9x9x9 probabilities of digits 1-9, zeros for empty cells
+        """
+        batch, occupancy = self.get_batch(board)
+        probabilities = zeros((GRID_SIZE, GRID_SIZE, GRID_SIZE), dtype=float32)
+        if len(batch):
+            predicted = self._classifier.predict(batch)
+            if predicted.shape[1] == 10:
+                predicted = predicted[:, 1:]
+            probabilities[occupancy] = predicted / predicted.sum(axis=1, keepdims=True)
+        logging.debug(f"Recognized {len(batch)} digits.")
+        return probabilities
+
+
+def get_digits(probabilities: ndarray) -> Tuple[ndarray, ndarray]:
+    """Get most probable digits of cells and their confidences.
+
+    :param probabilities: 9x9x9 probabilities of digits 1-9, zeros for empty
+        cells, see `DigitRecognizer.recognize_probabilities`
+    :return: 9x9 grid of digits, 0 for empty cells, and 9x9 confidences,
+        1 for empty cells
+    """
+    occupancy = probabilities.any(axis=2)
+    grid = where(occupancy, probabilities.argmax(axis=2) + 1, 0)
+    confidences = where(occupancy, probabilities.max(axis=2), 1).astype(float32)
+    return grid, confidences
@@ -0,0 +1,404 @@
+"""Asynchronous service around the OCR pipeline.
+
+`OcrService.process` runs decoding, grid location, recognition and solving
+of an uploaded image in a pool of worker threads or processes, so the
+event loop is never blocked. At most `max_pending` requests are accepted
+at once, running or waiting for a worker; further requests are rejected
+with `ServiceOverloadedError` instead of queued, so memory stays bounded
+under bursts. Request slot is released only when its worker finishes, so
+requests which timed out or were cancelled still count until then.
+
+`serve` exposes the service over minimal HTTP::
+
+    POST /solve     image in body, JSON result
+    GET /health     liveness
+    GET /metrics    counters in Prometheus text exposition format
+"""
+
+import asyncio
+import json
+import logging
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from os import cpu_count
+from typing import Any, Dict, List, Optional, Tuple
+
+from sudoku_ocr.exceptions import (
+    GridNotFoundError,
+    ImageDecodeError,
+    ServiceOverloadedError,
+)
+
+METRIC_PREFIX = "sudoku_ocr_service"
+MAX_BODY_BYTES = 32 * 1024 * 1024
+MAX_HEADER_LINES = 100
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+Response = Tuple[int, bytes, Dict[str, str]]
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+class _HttpError(Exception):
+    """Request cannot be processed, response has status of the error."""
+
+    def __init__(self, status: int, message: str) -> None:
+        """Initialize _HttpError class."""
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class PipelineOptions:
+    """Options of pipeline run by workers."""
+
+    classifier: str = "knn"
+    threshold: int = 5
+    reduction: int = 1
+    grayscale: bool = True
+    max_nodes: Optional[int] = 100000
+    timeout: Optional[float] = None
+    repair_givens: bool = True
+
+
+@dataclass
+class ServiceResult:
+    """Result of processed image."""
+
+    zone: List[List[float]]
+    board: List[List[int]]
+    solution: List[List[int]]
+    status: Optional[str]
+    corrections: List[Tuple[int, int, int, int]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert result to json serializable dict."""
+        return asdict(self)
+
+
+@lru_cache(maxsize=None)
+def _get_recognizer(classifier: str, threshold: int) -> Any:
+    """Get recognizer shared by requests of worker."""
+    from sudoku_ocr.recognition import DigitRecognizer
+
+    return DigitRecognizer(classifier, threshold=threshold)
+
+
+def process_image_bytes(content: bytes, options: PipelineOptions) -> ServiceResult:
+    """Locate, recognize and solve board of encoded image.
+
+    :param content: encoded image
+    :param options: pipeline options
+    """
+    from sudoku_ocr.board import Board
+
+    board = Board(
+        classifier=options.classifier,
+        threshold=options.threshold,
+        recognizer=_get_recognizer(options.classifier, options.threshold),
+    )
+    board.prepare_img(content, options.reduction, options.grayscale)
+    board.ocr_sudoku()
+    board.solve(options.max_nodes, options.timeout, options.repair_givens)
+    return ServiceResult(
+        zone=board.zone.tolist(),  # type: ignore
+        board=board.board_value.tolist(),
+        solution=board.solved_board.tolist(),
+        status=board.status,
+        corrections=board.corrections,
+    )
+
+
+class OcrService:
+    """Pipeline offloaded to worker pool with bounded number of requests."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: float = 10.0,
+        processes: bool = False,
+        options: Optional[PipelineOptions] = None,
+    ) -> None:
+        """Initialize OcrService class.
+
+        :param workers: number of worker threads or processes, defaults to
+            number of CPUs
+        :param max_pending: maximal number of running and waiting requests,
+            defaults to twice the number of workers
+        :param timeout: default time limit of single request in seconds
+        :param processes: whether to use worker processes instead of threads
+        :param options: pipeline options, solver timeout defaults to `timeout`
+        """
+        self._workers = workers or cpu_count() or 1
+        self._max_pending = max_pending or 2 * self._workers
+        self._timeout = timeout
+        self._options = options or PipelineOptions(timeout=timeout)
+        self._processes = processes
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._counters = dict.fromkeys(
+            ("requests", "completed", "failures", "rejections", "timeouts"), 0
+        )
+
+    async def process(
+        self, image_bytes: bytes, timeout: Optional[float] = None
+    ) -> ServiceResult:
+        """Process encoded image in worker pool.
+
+        Work which has not started yet is cancelled when request times out
+        or is cancelled.
+
+        :param image_bytes: encoded image
+        :param timeout: time limit in seconds, defaults to service timeout
+        :raises ServiceOverloadedError: when `max_pending` requests are
+            already being processed
+        :raises asyncio.TimeoutError: when time limit is exceeded
+        """
+        self._counters["requests"] += 1
+        if self._pending >= self._max_pending:
+            self._counters["rejections"] += 1
+            raise ServiceOverloadedError(
+                f"{self._pending} requests are already being processed."
+            )
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(
+            process_image_bytes, image_bytes, self._options
+        )
+        self._pending += 1
+
+        def release(_: "Future[ServiceResult]") -> None:
+            try:
+                loop.call_soon_threadsafe(self._release)
+            except RuntimeError:
+                logging.debug("Event loop has been closed before work finished.")
+
+        future.add_done_callback(release)
+        try:
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout or self._timeout
+            )
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise
+        except Exception:
+            self._counters["failures"] += 1
+            raise
+        self._counters["completed"] += 1
+        return result
+
+    @property
+    def pending(self) -> int:
+        """Number of running and waiting requests."""
+        return self._pending
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        """Request, completion, failure, rejection and timeout counters."""
+        return dict(self._counters)
+
+    def to_prometheus(self) -> str:
+        """Export counters and pending requests in Prometheus text format."""
+        lines = []
+        for name, value in sorted(self._counters.items()):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# HELP {metric} Number of {name}.")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        metric = f"{METRIC_PREFIX}_pending"
+        lines.append(f"# HELP {metric} Number of running and waiting requests.")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {self._pending}")
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        """Shut down worker pool, cancelling waiting work."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def __aenter__(self) -> "OcrService":
+        """Start using service."""
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        """Shut down worker pool."""
+        self.close()
+
+    def _get_executor(self) -> Executor:
+        """Get worker pool, starting it on first request.
+
+        OpenCV is limited to single thread in both worker processes and
+        threads, parallelism comes from the pool itself.
+        """
+        if self._executor is None:
+            from sudoku_ocr.batch import init_worker
+
+            if self._processes:
+                self._executor = ProcessPoolExecutor(
+                    self._workers, initializer=init_worker, initargs=(1,)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    self._workers,
+                    thread_name_prefix="sudoku-ocr",
+                    initializer=init_worker,
+                    initargs=(1,),
+                )
+        return self._executor
+
+    def _release(self) -> None:
+        """Release slot of finished request."""
+        self._pending -= 1
+
+
+async def handle_connection(
+    service: OcrService,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    max_body_bytes: int = MAX_BODY_BYTES,
+) -> None:
+    """Handle single HTTP/1.1 request and close connection.
+
+    :param service: service processing images
+    :param reader: connection reader
+    :param writer: connection writer
+    :param max_body_bytes: maximal size of uploaded image
+    """
+    try:
+        status, body, headers = await _respond(service, reader, max_body_bytes)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+        return
+    content_type = headers.pop("Content-Type", "application/json")
+    head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Content-Type: {content_type}"]
+    head += [f"{name}: {value}" for name, value in headers.items()]
+    head += [f"Content-Length: {len(body)}", "Connection: close", "", ""]
+    writer.write("\r\n".join(head).encode("latin1") + body)
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _respond(
+    service: OcrService, reader: asyncio.StreamReader, max_body_bytes: int
+) -> Response:
+    """Read request and get status, body and headers of response."""
+    try:
+        method, path, headers = await _read_head(reader)
+        if method == "POST" and path == "/solve":
+            content = await _read_body(reader, headers, max_body_bytes)
+            return await _solve(service, content)
+        return _route(service, method, path)
+    except _HttpError as error:
+        return _error(error.status, str(error))
+
+
+def _route(service: OcrService, method: str, path: str) -> Response:
+    """Get response of request without body."""
+    if method == "GET" and path == "/health":
+        return 200, b'{"status": "ok"}', {}
+    if method == "GET" and path == "/metrics":
+        metrics = service.to_prometheus().encode()
+        return 200, metrics, {"Content-Type": "text/plain; version=0.0.4"}
+    raise _HttpError(404, f"{method} {path} not found")
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+    """Read method, path without query and headers with lowercase names."""
+    try:
+        request_line = (await reader.readline()).decode("latin1").split()
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = (await reader.readline()).decode("latin1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise _HttpError(400, "request line or header is too long") from None
+    if len(request_line) != 3:
+        raise _HttpError(400, "malformed request line")
+    return request_line[0], request_line[1].split("?")[0], headers
+
+
+async def _read_body(
+    reader: asyncio.StreamReader, headers: Dict[str, str], max_body_bytes: int
+) -> bytes:
+    """Read body of length given by valid Content-Length header."""
+    try:
+        length = int(headers.get("content-length", ""))
+    except ValueError:
+        raise _HttpError(400, "Content-Length is required") from None
+    if length < 0:
+        raise _HttpError(400, "Content-Length is negative")
+    if length > max_body_bytes:
+        raise _HttpError(413, f"image is larger than {max_body_bytes} bytes")
+    return await reader.readexactly(length)
+
+
+async def _solve(service: OcrService, content: bytes) -> Response:
+    """Process image and map errors to response status."""
+    try:
+        result = await service.process(content)
+    except ServiceOverloadedError as error:
+        status, body, _ = _error(503, str(error))
+        return status, body, {"Retry-After": "1"}
+    except asyncio.TimeoutError:
+        return _error(504, "processing timed out")
+    except (GridNotFoundError, ImageDecodeError) as error:
+        return _error(422, str(error))
+    except Exception as error:
+        logging.exception("Processing failed.")
+        return _error(500, str(error))
+    return 200, json.dumps(result.to_dict()).encode(), {}
+
+
+def _error(status: int, message: str) -> Response:
+    """Get error response."""
+    return status, json.dumps({"error": message}).encode(), {}
+
+
+async def serve(
+    service: OcrService,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    max_body_bytes: int = MAX_BODY_BYTES,
+) -> asyncio.Server:
+    """Start HTTP server of service.
+
+    :param service: service processing images
+    :param host: address to listen on
+    :param port: port to listen on, 0 picks free one
+    :param max_body_bytes: maximal size of uploaded image
+    :return: started server
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(
+            service, reader, writer, max_body_bytes
+        ),
+        host,
+        port,
+    )
+    logging.info(
+        f"Serving on {', '.join(str(s.getsockname()) for s in server.sockets)}"
+    )
+    return server
@@ -0,0 +1,475 @@
+"""Sudoku solver.
+
+Candidates of every cell are kept as 9 bit masks, bit ``d - 1`` set when
+digit ``d`` is still possible. Naked and hidden singles are propagated over
+all rows, columns and boxes until nothing changes, then the cell with
+minimum remaining values is branched on. Search continues after the first
+solution just long enough to tell whether it is unique.
+
+`solve_many` runs the same propagation for many boards at once as NumPy
+operations and searches only boards which remain ambiguous. `repair` uses
+it to try alternative digits of least confident givens of boards which
+are unsolvable because of recognition errors.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from heapq import nsmallest
+from itertools import combinations, islice, product
+from time import perf_counter
+from typing import Iterator, List, Optional, Tuple
+
+from numpy import (
+    arange,
+    array,
+    bitwise_or,
+    full,
+    log2,
+    ndarray,
+    nonzero,
+    ones,
+    stack,
+    uint16,
+    where,
+    zeros,
+)
+
+GRID_SIZE = 9
+ALL_DIGITS = (1 << GRID_SIZE) - 1
+
+SOLVED = "solved"
+INVALID = "invalid"
+MULTIPLE = "multiple"
+BUDGET_EXCEEDED = "budget_exceeded"
+
+UNITS = (
+    [[row * GRID_SIZE + col for col in range(GRID_SIZE)] for row in range(GRID_SIZE)]
+    + [[row * GRID_SIZE + col for row in range(GRID_SIZE)] for col in range(GRID_SIZE)]
+    + [
+        [
+            (box_row + row) * GRID_SIZE + box_col + col
+            for row in range(3)
+            for col in range(3)
+        ]
+        for box_row in range(0, GRID_SIZE, 3)
+        for box_col in range(0, GRID_SIZE, 3)
+    ]
+)
+DIGITS = {1 << digit: digit + 1 for digit in range(GRID_SIZE)}
+
+UNIT_CELLS = array(UNITS)
+CELL_UNITS = array(
+    [[index for index, unit in enumerate(UNITS) if cell in unit] for cell in range(81)]
+)
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+@dataclass
+class Solution:
+    """Result of solving single board.
+
+    `grid` holds the solution when status is `SOLVED`, one of the solutions
+    when it is `MULTIPLE` and zeros otherwise.
+    """
+
+    status: str
+    grid: ndarray
+    nodes: int = 0
+
+    @property
+    def solved(self) -> bool:
+        """Whether board has exactly one solution."""
+        return self.status == SOLVED
+
+
+@dataclass
+class Repair:
+    """Result of repairing single board.
+
+    `board` holds the board with `corrections` applied, each correction
+    being ``(row, col, recognized digit, corrected digit)`` and digit 0
+    meaning that the given has been removed.
+    """
+
+    status: str
+    grid: ndarray
+    board: ndarray
+    corrections: List[Tuple[int, int, int, int]]
+    attempts: int = 0
+
+
+class _BudgetExceeded(Exception):
+    """Search budget has been exhausted."""
+
+
+class _Contradiction(Exception):
+    """Candidates of some cell or unit have run out."""
+
+
+def solve(
+    board: ndarray, max_nodes: Optional[int] = None, timeout: Optional[float] = None
+) -> Solution:
+    """Solve sudoku board.
+
+    :param board: 9x9 digits, 0 for empty cells
+    :param max_nodes: maximal number of search nodes
+    :param timeout: maximal search time in seconds
+    :return: solution with status `SOLVED`, `INVALID`, `MULTIPLE` or
+        `BUDGET_EXCEEDED`
+    """
+    board = array(board)
+    if board.shape != (GRID_SIZE, GRID_SIZE):
+        raise ValueError(f"board shape {board.shape} is not (9, 9)")
+    if board.min() < 0 or board.max() > GRID_SIZE:
+        raise ValueError("board values are not in range 0-9")
+    candidates = [
+        1 << (value - 1) if value else ALL_DIGITS for value in board.ravel().tolist()
+    ]
+    deadline = None if timeout is None else perf_counter() + timeout
+    solutions: List[List[int]] = []
+    nodes = 0
+    stack = [candidates]
+    try:
+        while stack and len(solutions) < 2:
+            nodes += 1
+            _check_budget(nodes, max_nodes, deadline)
+            candidates = stack.pop()
+            if not propagate(candidates):
+                continue
+            cell = _get_branching_cell(candidates)
+            if cell is None:
+                solutions.append(candidates)
+            else:
+                stack.extend(_branch(candidates, cell))
+    except _BudgetExceeded:
+        logging.debug(f"Search budget exceeded after {nodes} nodes.")
+        return Solution(BUDGET_EXCEEDED, zeros(board.shape, dtype=int), nodes)
+    logging.debug(f"Found {len(solutions)} solutions in {nodes} nodes.")
+    if not solutions:
+        return Solution(INVALID, zeros(board.shape, dtype=int), nodes)
+    grid = array([DIGITS[mask] for mask in solutions[0]]).reshape(board.shape)
+    return Solution(SOLVED if len(solutions) == 1 else MULTIPLE, grid, nodes)
+
+
+def _check_budget(
+    nodes: int, max_nodes: Optional[int], deadline: Optional[float]
+) -> None:
+    """Raise `_BudgetExceeded` when node or time budget is exhausted."""
+    if max_nodes is not None and nodes > max_nodes:
+        raise _BudgetExceeded
+    if deadline is not None and perf_counter() > deadline:
+        raise _BudgetExceeded
+
+
+def _branch(candidates: List[int], cell: int) -> Iterator[List[int]]:
+    """Generate copies of candidates with every candidate of cell fixed."""
+    mask = candidates[cell]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        branch = candidates.copy()
+        branch[cell] = bit
+        yield branch
+
+
+def propagate(candidates: List[int]) -> bool:
+    """Propagate naked and hidden singles in place.
+
+    :param candidates: 81 candidate masks
+    :return: False when contradiction has been found
+    """
+    changed = True
+    try:
+        while changed:
+            changed = False
+            for unit in UNITS:
+                fixed, hidden, reducible = _scan_unit(candidates, unit)
+                if reducible:
+                    changed |= _fill_singles(candidates, unit, fixed, hidden)
+    except _Contradiction:
+        return False
+    return True
+
+
+def _scan_unit(candidates: List[int], unit: List[int]) -> Tuple[int, int, int]:
+    """Get digits fixed in unit and digits possible in single cell only.
+
+    :return: fixed digits, hidden singles and those of them which are still
+        candidates of unsolved cells
+    :raises _Contradiction: when digit is fixed twice, cell has no candidate
+        or digit has no cell
+    """
+    fixed = once = twice = unsolved = 0
+    for cell in unit:
+        mask = candidates[cell]
+        if mask & (mask - 1):
+            unsolved |= mask
+        elif mask & fixed or not mask:
+            raise _Contradiction
+        else:
+            fixed |= mask
+        twice |= once & mask
+        once |= mask
+    if once != ALL_DIGITS:
+        raise _Contradiction
+    hidden = once & ~twice & ~fixed
+    return fixed, hidden, unsolved & (fixed | hidden)
+
+
+def _fill_singles(
+    candidates: List[int], unit: List[int], fixed: int, hidden: int
+) -> bool:
+    """Reduce unsolved cells of unit to hidden single or unfixed digits.
+
+    :return: whether any cell has changed
+    :raises _Contradiction: when cell is the only one of two hidden singles
+    """
+    changed = False
+    for cell in unit:
+        mask = candidates[cell]
+        if mask & (mask - 1):
+            reduced = mask & hidden or mask & ~fixed
+            if reduced & hidden and reduced & (reduced - 1):
+                raise _Contradiction
+            if reduced != mask:
+                candidates[cell] = reduced
+                changed = True
+    return changed
+
+
+def _get_branching_cell(candidates: List[int]) -> Optional[int]:
+    """Get unsolved cell with fewest candidates, None when all are solved."""
+    best, best_count = None, GRID_SIZE + 1
+    for cell, mask in enumerate(candidates):
+        if mask & (mask - 1):
+            count = mask.bit_count()
+            if count < best_count:
+                best, best_count = cell, count
+                if count == 2:
+                    break
+    return best
+
+
+def solve_many(
+    boards: ndarray,
+    max_nodes: Optional[int] = None,
+    timeout: Optional[float] = None,
+    workers: int = 1,
+) -> Tuple[ndarray, ndarray]:
+    """Solve many sudoku boards at once.
+
+    Naked and hidden singles are propagated for all boards together with
+    candidate masks held in a single (n, 81) array. Boards which are
+    neither solved nor found invalid by propagation are passed to `solve`,
+    which runs in a pool of worker processes when `workers` is above 1.
+
+    :param boards: (n, 9, 9) digits, 0 for empty cells
+    :param max_nodes: maximal number of search nodes of single board
+    :param timeout: maximal search time of single board in seconds
+    :param workers: number of worker processes searching ambiguous boards
+    :return: (n, 9, 9) solutions, zeros unless solved or multiple, and (n,)
+        statuses, see `Solution`
+    """
+    boards = array(boards)
+    if boards.ndim != 3 or boards.shape[1:] != (GRID_SIZE, GRID_SIZE):
+        raise ValueError(f"boards shape {boards.shape} is not (n, 9, 9)")
+    if boards.size and (boards.min() < 0 or boards.max() > GRID_SIZE):
+        raise ValueError("board values are not in range 0-9")
+    flat = boards.reshape(len(boards), GRID_SIZE * GRID_SIZE)
+    candidates = where(flat > 0, 1 << (flat - 1).clip(min=0), ALL_DIGITS).astype(uint16)
+    valid = propagate_many(candidates)
+    solved = valid & (candidates & (candidates - 1) == 0).all(axis=1)
+    statuses = full(len(boards), INVALID, dtype=object)
+    statuses[solved] = SOLVED
+    grids = zeros(flat.shape, dtype=int)
+    grids[solved] = _to_digits(candidates[solved])
+    ambiguous = nonzero(valid & ~solved)[0]
+    logging.debug(
+        f"Propagation solved {solved.sum()} and rejected {(~valid).sum()} "
+        f"of {len(boards)} boards, {len(ambiguous)} left for search."
+    )
+    givens = _to_digits(candidates[ambiguous]).reshape(-1, GRID_SIZE, GRID_SIZE)
+    search = partial(solve, max_nodes=max_nodes, timeout=timeout)
+    if workers > 1 and len(ambiguous) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solutions = list(executor.map(search, givens, chunksize=16))
+    else:
+        solutions = [search(board) for board in givens]
+    for index, solution in zip(ambiguous, solutions):
+        statuses[index] = solution.status
+        grids[index] = solution.grid.ravel()
+    return grids.reshape(boards.shape), statuses.astype(str)
+
+
+def propagate_many(candidates: ndarray) -> ndarray:
+    """Propagate naked and hidden singles of many boards in place.
+
+    :param candidates: (n, 81) uint16 candidate masks
+    :return: (n,) False for boards where contradiction has been found
+    """
+    valid = ones(len(candidates), dtype=bool)
+    active = arange(len(candidates))
+    while len(active):
+        current = candidates[active]
+        units = current[:, UNIT_CELLS]
+        single = units & (units - 1) == 0
+        singles = where(single, units, 0)
+        fixed = bitwise_or.reduce(singles, axis=2)
+        once = zeros(fixed.shape, dtype=uint16)
+        twice = zeros(fixed.shape, dtype=uint16)
+        for cell in range(GRID_SIZE):
+            twice |= once & units[:, :, cell]
+            once |= units[:, :, cell]
+        hidden = once & ~twice & ~fixed
+        conflict = (
+            (single & (units == 0)).any(axis=(1, 2))
+            | (singles.sum(axis=2, dtype=int) != fixed).any(axis=1)
+            | (once != ALL_DIGITS).any(axis=1)
+        )
+        peers_fixed = bitwise_or.reduce(fixed[:, CELL_UNITS], axis=2)
+        cell_hidden = bitwise_or.reduce(hidden[:, CELL_UNITS], axis=2) & current
+        unsolved = current & (current - 1) != 0
+        conflict |= (unsolved & (cell_hidden & (cell_hidden - 1) != 0)).any(axis=1)
+        reduced = where(
+            unsolved,
+            where(cell_hidden != 0, cell_hidden, current & ~peers_fixed),
+            current,
+        )
+        changed = (reduced != current).any(axis=1) & ~conflict
+        valid[active[conflict]] = False
+        candidates[active[changed]] = reduced[changed]
+        active = active[changed]
+    return valid
+
+
+def _to_digits(candidates: ndarray) -> ndarray:
+    """Get digits of solved cells, 0 for cells with several candidates."""
+    single = candidates & (candidates - 1) == 0
+    return where(single, log2(candidates.clip(min=1)).astype(int) + 1, 0)
+
+
+def repair(
+    board: ndarray,
+    confidences: ndarray,
+    max_changes: int = 2,
+    max_suspects: int = 6,
+    max_attempts: int = 256,
+    max_nodes: int = 1000,
+    timeout: Optional[float] = None,
+    chunk_size: int = 64,
+    probabilities: Optional[ndarray] = None,
+) -> Repair:
+    """Solve board correcting misrecognized givens.
+
+    When board is invalid, givens conflicting with another given in any
+    row, column or box are suspected, or all givens when there is no such
+    conflict. Up to `max_changes` of `max_suspects` least confident
+    suspects are replaced with every other digit or removed, fewer changes
+    and less confident cells first. With `probabilities`, the
+    `max_attempts` most likely attempts are tried instead, ordered by the
+    product of probability ratios of corrected and recognized digits, and
+    removed givens have probability 0. Attempts are solved with
+    `solve_many` in chunks and search stops at the first one with unique
+    solution, which is the most likely one of the tried attempts.
+    At most `max_attempts` boards of at most `max_nodes` search nodes each
+    are tried and no new chunk is started after `timeout`, which bounds the
+    worst case latency.
+
+    :param board: 9x9 recognized digits, 0 for empty cells
+    :param confidences: 9x9 confidences of recognized digits
+    :param max_changes: maximal number of corrected givens
+    :param max_suspects: number of least confident suspects considered
+    :param max_attempts: maximal number of tried boards
+    :param max_nodes: maximal number of search nodes of the board and of
+        single attempt
+    :param timeout: time in seconds after which no more attempts are tried
+    :param chunk_size: number of attempts solved at once
+    :param probabilities: 9x9x9 probabilities of digits 1-9 of every cell,
+        see `DigitRecognizer.recognize_probabilities`
+    :return: repair with status of solving the corrected board, or of the
+        original board when no correction helped
+    """
+    board = array(board)
+    deadline = None if timeout is None else perf_counter() + timeout
+    solution = solve(board, max_nodes=max_nodes, timeout=timeout)
+    if solution.status != INVALID:
+        return Repair(solution.status, solution.grid, board, [])
+    suspects = _get_suspects(board, array(confidences))[:max_suspects]
+    attempts: Iterator[Tuple[ndarray, List[Tuple[int, int, int, int]]]]
+    attempts = _get_attempts(board, suspects, max_changes)
+    if probabilities is None:
+        attempts = islice(attempts, max_attempts)
+    else:
+        likelihood = partial(_get_likelihood, probabilities=array(probabilities))
+        ranked = nsmallest(
+            max_attempts, attempts, key=lambda item: -likelihood(item[1])
+        )
+        attempts = iter(ranked)
+    tried = 0
+    while True:
+        chunk = list(islice(attempts, chunk_size))
+        if not chunk or deadline is not None and perf_counter() > deadline:
+            break
+        grids, statuses = solve_many(
+            stack([attempt for attempt, _ in chunk]), max_nodes=max_nodes
+        )
+        solved = nonzero(statuses == SOLVED)[0]
+        if len(solved):
+            attempt, corrections = chunk[solved[0]]
+            tried += int(solved[0]) + 1
+            logging.debug(f"Board repaired with {corrections} in {tried} attempts.")
+            return Repair(SOLVED, grids[solved[0]], attempt, corrections, tried)
+        tried += len(chunk)
+    logging.debug(f"Board has not been repaired in {tried} attempts.")
+    return Repair(INVALID, solution.grid, board, [], tried)
+
+
+def _get_suspects(board: ndarray, confidences: ndarray) -> List[Tuple[int, int]]:
+    """Get givens conflicting with other givens, least confident first."""
+    flat = board.ravel()
+    units = flat[UNIT_CELLS]
+    counts = zeros((len(UNITS), GRID_SIZE + 1), dtype=int)
+    for cell in range(GRID_SIZE):
+        counts[arange(len(UNITS)), units[:, cell]] += 1
+    duplicated = (units > 0) & (counts[arange(len(UNITS))[:, None], units] > 1)
+    conflicting = zeros(flat.shape, dtype=bool)
+    conflicting[UNIT_CELLS[duplicated]] = True
+    if not conflicting.any():
+        conflicting = flat > 0
+    cells = sorted(nonzero(conflicting)[0], key=lambda cell: confidences.flat[cell])
+    return [divmod(int(cell), GRID_SIZE) for cell in cells]
+
+
+def _get_likelihood(
+    corrections: List[Tuple[int, int, int, int]], probabilities: ndarray
+) -> float:
+    """Get probability of corrected digits relative to recognized ones."""
+    likelihood = 1.0
+    for row, col, recognized, digit in corrections:
+        cell = probabilities[row, col]
+        if not digit or not cell[recognized - 1]:
+            return 0.0
+        likelihood *= cell[digit - 1] / cell[recognized - 1]
+    return likelihood
+
+
+def _get_attempts(
+    board: ndarray, suspects: List[Tuple[int, int]], max_changes: int
+) -> Iterator[Tuple[ndarray, List[Tuple[int, int, int, int]]]]:
+    """Generate boards with up to `max_changes` suspects changed."""
+    for changes in range(1, max_changes + 1):
+        for cells in combinations(suspects, changes):
+            alternatives = [
+                [digit for digit in range(GRID_SIZE + 1) if digit != board[cell]]
+                for cell in cells
+            ]
+            for digits in product(*alternatives):
+                attempt = board.copy()
+                corrections = []
+                for (row, col), digit in zip(cells, digits):
+                    corrections.append((row, col, int(board[row, col]), digit))
+                    attempt[row, col] = digit
+                yield attempt, corrections
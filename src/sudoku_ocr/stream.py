@@ -0,0 +1,202 @@
+"""Processing of video and camera frame streams.
+
+Full grid detection runs on keyframes only. Between keyframes the four
+board corners are tracked with pyramidal Lucas-Kanade optical flow, and
+digits are recognized again only when the warped board has changed.
+"""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from cv2 import (
+    COLOR_BGR2GRAY,
+    INTER_AREA,
+    TERM_CRITERIA_COUNT,
+    TERM_CRITERIA_EPS,
+    VideoCapture,
+    absdiff,
+    calcOpticalFlowPyrLK,
+    contourArea,
+    cvtColor,
+    isContourConvex,
+    resize,
+)
+from numpy import count_nonzero, float32, ndarray
+
+from sudoku_ocr.exceptions import GridNotFoundError
+from sudoku_ocr.image_processing import (
+    ImageProcessing,
+    ThresholdParameters,
+    WorkBuffers,
+)
+from sudoku_ocr.perspective import order_points, warp_to_size
+from sudoku_ocr.recognition import DigitRecognizer
+
+CHANGE_SHAPE = (64, 64)
+FLOW_CRITERIA = (TERM_CRITERIA_EPS | TERM_CRITERIA_COUNT, 20, 0.03)
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+@dataclass
+class FrameResult:
+    """Result of processing single frame.
+
+    `zone` is None when board has not been found. `grid` and `confidences`
+    are the last recognized ones, `recognized` tells whether recognition
+    ran on this frame.
+    """
+
+    index: int
+    zone: Optional[ndarray] = None
+    grid: Optional[ndarray] = None
+    confidences: Optional[ndarray] = None
+    keyframe: bool = False
+    recognized: bool = False
+
+
+class GridTracker:
+    """Locate and recognize board in consecutive frames."""
+
+    def __init__(
+        self,
+        recognizer: Optional[DigitRecognizer] = None,
+        keyframe_interval: int = 30,
+        change_threshold: float = 0.02,
+        max_area_change: float = 0.2,
+        proxy_width: int = 600,
+        board_size: int = 450,
+        parameters: Optional[ThresholdParameters] = None,
+    ) -> None:
+        """Initialize GridTracker class.
+
+        :param recognizer: digit recognizer, digits are not recognized when
+            not given
+        :param keyframe_interval: number of frames between full detections
+        :param change_threshold: fraction of changed pixels of downscaled
+            warped board above which digits are recognized again
+        :param max_area_change: maximal relative change of tracked board area
+            between frames, larger change triggers full detection
+        :param proxy_width: `ImageProcessing.locate_grid` proxy width
+        :param board_size: `ImageProcessing.locate_grid` board size
+        :param parameters: thresholding parameters
+        """
+        self._recognizer = recognizer
+        self._keyframe_interval = keyframe_interval
+        self._change_threshold = change_threshold
+        self._max_area_change = max_area_change
+        self._proxy_width = proxy_width
+        self._board_size = board_size
+        self._parameters = parameters
+        self._buffers = WorkBuffers()
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget tracked board, next frame is a keyframe."""
+        self._index = 0
+        self._since_keyframe = 0
+        self._previous: Optional[ndarray] = None
+        self._zone: Optional[ndarray] = None
+        self._reference: Optional[ndarray] = None
+        self._grid: Optional[ndarray] = None
+        self._confidences: Optional[ndarray] = None
+
+    def process(self, frame: ndarray) -> FrameResult:
+        """Locate board in next frame and recognize it if it has changed.
+
+        :param frame: BGR or grayscale frame
+        """
+        grayscale = cvtColor(frame, COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        result = FrameResult(self._index)
+        zone = None
+        if self._zone is not None and self._since_keyframe < self._keyframe_interval:
+            zone = self._track(grayscale)
+        if zone is None:
+            zone = self._detect(grayscale)
+            result.keyframe = True
+            self._since_keyframe = 0
+        self._since_keyframe += 1
+        self._index += 1
+        self._previous, self._zone = grayscale, zone
+        if zone is None:
+            return result
+        result.zone = zone
+        board = ImageProcessing(self._buffers)
+        size = (self._board_size, self._board_size)
+        board.data = warp_to_size(
+            grayscale, zone, size, dst=self._buffers.get("warped", size)
+        )
+        board.thresholding(self._parameters)
+        small = resize(board.data, CHANGE_SHAPE, interpolation=INTER_AREA)
+        if self._recognizer is not None and self._has_changed(small):
+            self._grid, self._confidences = self._recognizer.recognize(board)
+            self._reference = small
+            result.recognized = True
+        result.grid, result.confidences = self._grid, self._confidences
+        return result
+
+    def stream(self, frames: Iterable[ndarray]) -> Iterator[FrameResult]:
+        """Process frames one by one.
+
+        :param frames: BGR or grayscale frames, e.g. `read_video`
+        """
+        for frame in frames:
+            yield self.process(frame)
+
+    def _detect(self, grayscale: ndarray) -> Optional[ndarray]:
+        """Find board corners with full grid detection."""
+        image = ImageProcessing(self._buffers)
+        image.data = grayscale
+        proxy_width = min(self._proxy_width, grayscale.shape[1])
+        image.resize(proxy_width)
+        image.thresholding(self._parameters)
+        try:
+            zone = image.find_grid()
+        except GridNotFoundError:
+            logging.debug(f"Board has not been found in frame {self._index}.")
+            return None
+        return order_points(zone.reshape(4, 2) * grayscale.shape[1] / proxy_width)
+
+    def _track(self, grayscale: ndarray) -> Optional[ndarray]:
+        """Track board corners from previous frame with optical flow."""
+        previous = self._zone.astype(float32).reshape(-1, 1, 2)  # type: ignore
+        corners, status, _ = calcOpticalFlowPyrLK(
+            self._previous, grayscale, previous, None, criteria=FLOW_CRITERIA
+        )
+        if corners is None or not status.all():
+            return None
+        zone = corners.reshape(4, 2)
+        area = contourArea(zone)
+        previous_area = contourArea(self._zone.astype(float32))  # type: ignore
+        if (
+            not isContourConvex(zone)
+            or abs(area - previous_area) > self._max_area_change * previous_area
+        ):
+            logging.debug(f"Tracking lost in frame {self._index}.")
+            return None
+        return zone
+
+    def _has_changed(self, small: ndarray) -> bool:
+        """Check if downscaled board differs from the last recognized one."""
+        if self._reference is None:
+            return True
+        changed = count_nonzero(absdiff(small, self._reference) > 127)
+        return changed > self._change_threshold * small.size
+
+
+def read_video(source: Union[Path, int]) -> Iterator[ndarray]:
+    """Read frames of video file or camera.
+
+    :param source: path of video file or index of camera
+    """
+    capture = VideoCapture(source if isinstance(source, int) else str(source))
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        capture.release()
@@ -0,0 +1,330 @@
+"""Synthetic sudoku photos with ground truth.
+
+`BoardGenerator` builds random puzzles with a unique solution: diagonal
+boxes are filled randomly, the board is completed with `solver.solve`, and
+givens are removed in random order as long as the puzzle stays uniquely
+solvable. Checking uniqueness is the expensive part, so every generated
+puzzle is reused in `GeneratorOptions.variants` random equivalent forms
+(relabeled digits, permuted bands, stacks, rows within bands and columns
+within stacks, transposed), which are unique as well.
+
+Boards are rendered from a cached atlas of digit glyphs in OpenCV Hershey
+fonts, all 81 cells at once, and placed into the image with random
+perspective. Lighting gradient, glare, blur and noise are applied to the
+whole image. Every `Sample` holds the image, givens, solution and board
+corners, so the pipeline can be exercised and evaluated end to end.
+`generate_samples` produces samples in a pool of worker processes.
+"""
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from os import cpu_count
+from typing import Iterator, List, Optional, Tuple, Union
+
+from cv2 import (
+    BORDER_TRANSPARENT,
+    COLOR_GRAY2BGR,
+    INTER_LINEAR,
+    GaussianBlur,
+    cvtColor,
+    getPerspectiveTransform,
+    getTextSize,
+    putText,
+    warpPerspective,
+)
+from numpy import (
+    arange,
+    array,
+    clip,
+    concatenate,
+    exp,
+    float32,
+    full,
+    ndarray,
+    outer,
+    stack,
+    uint8,
+    zeros,
+)
+from numpy.random import SeedSequence, default_rng
+
+from sudoku_ocr.batch import map_chunks
+from sudoku_ocr.recognition import FONTS
+from sudoku_ocr.solver import GRID_SIZE, SOLVED, solve
+
+BOX_SIZE = 3
+THICKNESSES = (1, 2, 3)
+DIGIT_HEIGHT = 0.6
+BLUR_MIN_SIGMA = 0.3
+
+logging = logging.getLogger(__name__)  # type: ignore
+
+
+@dataclass
+class GeneratorOptions:
+    """Options of puzzles and their rendering.
+
+    Ranges are sampled uniformly for every sample.
+    """
+
+    image_size: Tuple[int, int] = (640, 480)
+    cell_size: int = 40
+    givens: Tuple[int, int] = (24, 36)
+    variants: int = 8
+    board_scale: Tuple[float, float] = (0.6, 0.9)
+    max_tilt: float = 0.1
+    contrast: Tuple[float, float] = (0.4, 1.0)
+    max_gradient: float = 0.4
+    glare_probability: float = 0.2
+    max_blur: float = 1.5
+    max_noise: float = 8.0
+    grayscale: bool = False
+
+
+@dataclass
+class Sample:
+    """Synthetic image with ground truth.
+
+    `zone` holds 4x2 board corners in the image ordered as top-left,
+    top-right, bottom-right, bottom-left, see `perspective.order_points`.
+    """
+
+    image: ndarray
+    board: ndarray
+    solution: ndarray
+    zone: ndarray
+
+
+class BoardGenerator:
+    """Generate random puzzles and render them as photos."""
+
+    def __init__(
+        self,
+        options: Optional[GeneratorOptions] = None,
+        seed: Union[int, SeedSequence, None] = None,
+    ) -> None:
+        """Initialize BoardGenerator class.
+
+        :param options: options of puzzles and rendering
+        :param seed: seed of random generator
+        """
+        self._options = options or GeneratorOptions()
+        self._rng = default_rng(seed)
+        self._puzzle: Optional[Tuple[ndarray, ndarray]] = None
+        self._variants = 0
+
+    def generate_puzzle(self) -> Tuple[ndarray, ndarray]:
+        """Generate puzzle with unique solution.
+
+        :return: 9x9 givens, 0 for empty cells, and 9x9 solution
+        """
+        rng = self._rng
+        solution = zeros((GRID_SIZE, GRID_SIZE), dtype=int)
+        for box in range(0, GRID_SIZE, BOX_SIZE):
+            cells = slice(box, box + BOX_SIZE)
+            solution[cells, cells] = (
+                rng.permutation(GRID_SIZE).reshape(BOX_SIZE, BOX_SIZE) + 1
+            )
+        solution = solve(solution).grid
+        board = solution.copy()
+        low, high = self._options.givens
+        givens, target = GRID_SIZE * GRID_SIZE, rng.integers(low, high + 1)
+        for cell in rng.permutation(GRID_SIZE * GRID_SIZE).tolist():
+            if givens <= target:
+                break
+            row, col = divmod(cell, GRID_SIZE)
+            board[row, col] = 0
+            if solve(board).status == SOLVED:
+                givens -= 1
+            else:
+                board[row, col] = solution[row, col]
+        return board, solution
+
+    def shuffle(self, board: ndarray, solution: ndarray) -> Tuple[ndarray, ndarray]:
+        """Get random equivalent puzzle and its solution.
+
+        :param board: 9x9 givens, 0 for empty cells
+        :param solution: 9x9 solution of the board
+        """
+        rng = self._rng
+        digits = concatenate([[0], rng.permutation(GRID_SIZE) + 1])
+        rows, cols = (
+            (
+                rng.permutation(BOX_SIZE)[:, None] * BOX_SIZE
+                + stack([rng.permutation(BOX_SIZE) for _ in range(BOX_SIZE)])
+            ).ravel()
+            for _ in range(2)
+        )
+        if rng.random() < 0.5:
+            board, solution = board.T, solution.T
+        return digits[board[rows][:, cols]], digits[solution[rows][:, cols]]
+
+    def next_puzzle(self) -> Tuple[ndarray, ndarray]:
+        """Get next puzzle, generating new one after `variants` variants."""
+        if self._puzzle is None or self._variants >= self._options.variants:
+            self._puzzle, self._variants = self.generate_puzzle(), 0
+        self._variants += 1
+        return self.shuffle(*self._puzzle)
+
+    def render(self, board: ndarray) -> Tuple[ndarray, ndarray]:
+        """Render givens as photo of the board.
+
+        :param board: 9x9 givens, 0 for empty cells
+        :return: uint8 image and 4x2 board corners
+        """
+        options, rng = self._options, self._rng
+        width, height = options.image_size
+        cell_size = options.cell_size
+        glyphs = _get_glyphs(cell_size)
+        ink = glyphs[rng.integers(len(glyphs)), board]
+        size = GRID_SIZE * cell_size
+        ink = ink.transpose(0, 2, 1, 3).reshape(size, size)
+        ink |= _get_grid_lines(cell_size)
+        paper = rng.uniform(200, 255)
+        contrast = rng.uniform(*options.contrast)
+        board_image = (paper - ink * (contrast * paper / 255)).astype(uint8)
+
+        # tilted corners have to stay in the image
+        margin = 1 + 2 * options.max_tilt
+        side = rng.uniform(*options.board_scale) * min(width, height) / margin
+        extent = array([width, height]) - margin * side
+        center = margin * side / 2 + rng.uniform(0, 1, 2) * extent
+        corners = center + array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) * side / 2
+        zone = corners + rng.uniform(-1, 1, (4, 2)) * options.max_tilt * side
+        zone = zone.astype(float32)
+        source = array([[0, 0], [size, 0], [size, size], [0, size]], dtype=float32)
+        image = full((height, width), rng.integers(40, 220), dtype=uint8)
+        warpPerspective(
+            board_image,
+            getPerspectiveTransform(source, zone),
+            (width, height),
+            dst=image,
+            flags=INTER_LINEAR,
+            borderMode=BORDER_TRANSPARENT,
+        )
+
+        # lighting and glare are separable, so only 1D profiles are computed
+        cols = arange(width, dtype=float32) / width - 0.5
+        rows = arange(height, dtype=float32) / height - 0.5
+        gradient = (rng.uniform(-1, 1, 2) * options.max_gradient).astype(float32)
+        light = (1 + gradient[1] * rows)[:, None] + (gradient[0] * cols)[None, :]
+        if rng.random() < options.glare_probability:
+            x, y = rng.uniform(-0.5, 0.5, 2)
+            radius = rng.uniform(0.1, 0.3)
+            light += float32(rng.uniform(0.2, 0.6)) * outer(
+                exp(-((rows - float32(y)) ** 2) / float32(2 * radius**2)),
+                exp(-((cols - float32(x)) ** 2) / float32(2 * radius**2)),
+            )
+        image = image * light
+        sigma = rng.uniform(0, options.max_blur)
+        if sigma > BLUR_MIN_SIGMA:
+            image = GaussianBlur(image, (0, 0), sigma)
+        top, left = rng.integers(height), rng.integers(width)
+        noise = _get_noise(height, width)[
+            slice(top, top + height), slice(left, left + width)
+        ]
+        image += noise * float32(rng.uniform(0, options.max_noise))
+        image = clip(image, 0, 255).astype(uint8)
+        if not options.grayscale:
+            image = cvtColor(image, COLOR_GRAY2BGR)
+        return image, zone
+
+    def sample(self) -> Sample:
+        """Generate next puzzle and render it."""
+        board, solution = self.next_puzzle()
+        image, zone = self.render(board)
+        return Sample(image, board, solution, zone)
+
+    def samples(self, count: int) -> Iterator[Sample]:
+        """Generate samples one by one.
+
+        :param count: number of samples
+        """
+        for _ in range(count):
+            yield self.sample()
+
+
+@lru_cache(maxsize=None)
+def _get_glyphs(cell_size: int) -> ndarray:
+    """Render digits 1-9 in every font and thickness, centered in cells.
+
+    :return: (styles, 10, cell_size, cell_size) uint8 ink, blank cell for 0
+    """
+    glyphs = zeros((len(FONTS) * len(THICKNESSES), 10, cell_size, cell_size), uint8)
+    styles = ((font, thickness) for font in FONTS for thickness in THICKNESSES)
+    for style, (font, thickness) in enumerate(styles):
+        (_, digit_height), _ = getTextSize("8", font, 1, thickness)
+        scale = DIGIT_HEIGHT * cell_size / digit_height
+        for digit in range(1, 10):
+            (text_width, text_height), _ = getTextSize(
+                str(digit), font, scale, thickness
+            )
+            origin = ((cell_size - text_width) // 2, (cell_size + text_height) // 2)
+            putText(
+                glyphs[style, digit], str(digit), origin, font, scale, 255, thickness
+            )
+    return glyphs
+
+
+@lru_cache(maxsize=4)
+def _get_noise(height: int, width: int) -> ndarray:
+    """Get standard normal noise of twice the image size.
+
+    Crops at random offsets are cheap to take and independent enough for
+    sensor noise.
+    """
+    return default_rng(0).standard_normal((2 * height, 2 * width), dtype=float32)
+
+
+@lru_cache(maxsize=None)
+def _get_grid_lines(cell_size: int) -> ndarray:
+    """Draw grid lines, every third line thicker."""
+    size = GRID_SIZE * cell_size
+    lines = zeros((size, size), dtype=uint8)
+    for line in range(GRID_SIZE + 1):
+        width = max(1, cell_size // (20 if line % BOX_SIZE else 8))
+        position = min(line * cell_size, size - width)
+        lines[:, arange(position, position + width)] = 255
+        lines[arange(position, position + width), :] = 255
+    return lines
+
+
+def generate_samples(
+    count: int,
+    options: Optional[GeneratorOptions] = None,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    cv_threads: int = 1,
+) -> Iterator[Sample]:
+    """Generate samples in a pool of worker processes.
+
+    Every chunk is generated from its own seed spawned from `seed`, so
+    samples do not depend on the number of workers. At most two chunks per
+    worker are in flight at once and samples are yielded in order.
+
+    :param count: number of samples
+    :param options: options of puzzles and rendering
+    :param seed: seed of random generators
+    :param workers: number of worker processes, defaults to number of CPUs
+    :param chunk_size: number of samples generated by worker at once
+    :param cv_threads: number of OpenCV threads in each worker
+    """
+    options = options or GeneratorOptions()
+    sizes = [min(chunk_size, count - start) for start in range(0, count, chunk_size)]
+    seeds = zip(SeedSequence(seed).spawn(len(sizes)), sizes)
+    yield from map_chunks(
+        _generate_chunk,
+        ((size, options, chunk_seed) for chunk_seed, size in seeds),
+        workers or cpu_count() or 1,
+        cv_threads,
+        ordered=True,
+    )
+
+
+def _generate_chunk(
+    count: int, options: GeneratorOptions, seed: SeedSequence
+) -> List[Sample]:
+    """Generate chunk of samples in worker."""
+    return list(BoardGenerator(options, seed).samples(count))
@@ -0,0 +1,87 @@
+import tracemalloc
+from math import ceil
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+
+THROUGHPUT = pytest.StashKey[List[Tuple[str, Dict[str, float]]]]()
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[THROUGHPUT] = []
+
+
+def pytest_sessionstart(session: pytest.Session) -> None:
+    """Fail regression gate before benchmarking when there is no baseline."""
+    benchmarks = session.config.pluginmanager.get_plugin("pytest-benchmark")
+    if session.config.getoption("benchmark_compare_fail") and not getattr(
+        benchmarks, "compared_mapping", None
+    ):
+        raise pytest.UsageError(
+            "No saved benchmark baseline to compare with, "
+            "run `tox -e benchmark-baseline` first."
+        )
+
+
+def percentile(data: List[float], fraction: float) -> float:
+    """Get nearest rank percentile of data."""
+    ordered = sorted(data)
+    return ordered[max(0, ceil(fraction * len(ordered)) - 1)]
+
+
+def get_peak_memory(function: Callable[..., Any], *args: Any) -> int:
+    """Call function once and get peak of its traced allocations in bytes."""
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    retained = tracemalloc.get_traced_memory()[0]
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1] - retained
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+@pytest.fixture
+def throughput(request: pytest.FixtureRequest, benchmark) -> Callable[..., Any]:  # type: ignore
+    """Benchmark processing of single image and report its throughput.
+
+    Images per second, p95 latency in seconds and peak traced memory in
+    bytes are stored in ``extra_info`` of saved benchmarks and summarized
+    at the end of the run. Peak memory is measured in an extra untimed call.
+    """
+
+    def run(function: Callable[..., Any], *args: Any, rounds: int = 10) -> Any:
+        result = benchmark.pedantic(function, args, rounds=rounds, warmup_rounds=1)
+        metrics: Dict[str, float] = {"peak_memory": get_peak_memory(function, *args)}
+        if benchmark.stats is not None:
+            data = benchmark.stats.stats.data
+            metrics["images_per_second"] = len(data) / sum(data)
+            metrics["p95_latency"] = percentile(data, 0.95)
+        benchmark.extra_info.update(metrics)
+        request.config.stash[THROUGHPUT].append((request.node.name, metrics))
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config) -> None:  # type: ignore
+    rows = [
+        (name, metrics)
+        for name, metrics in config.stash.get(THROUGHPUT, [])
+        if "p95_latency" in metrics
+    ]
+    if not rows:
+        return
+    terminalreporter.section("throughput")
+    width = max(len(name) for name, _ in rows)
+    terminalreporter.write_line(
+        f"{'name':<{width}}  {'images/s':>10}  {'p95 [ms]':>10}  {'peak [MiB]':>10}"
+    )
+    for name, metrics in rows:
+        terminalreporter.write_line(
+            f"{name:<{width}}  {metrics['images_per_second']:>10.1f}  "
+            f"{1000 * metrics['p95_latency']:>10.2f}  {metrics['peak_memory'] / 2**20:>10.1f}"
+        )
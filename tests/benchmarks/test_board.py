@@ -0,0 +1,28 @@
+from pathlib import Path
+from typing import Optional
+
+from sudoku_ocr.board import Board
+from sudoku_ocr.cache import ResultCache
+
+IMAGE = Path("tests/img/sudoku1.png")
+
+
+def run_pipeline(cache: Optional[ResultCache] = None) -> Board:
+    """Read, recognize and solve sudoku1."""
+    board = Board(cache=cache)
+    board.prepare_img(IMAGE)
+    board.ocr_sudoku()
+    board.solve()
+    return board
+
+
+class TestBoardBenchmark:
+    def test_pipeline(self, benchmark) -> None:  # type: ignore
+        benchmark.group = "board"
+        benchmark(run_pipeline)
+
+    def test_pipeline_cached(self, benchmark) -> None:  # type: ignore
+        benchmark.group = "board"
+        cache = ResultCache()
+        run_pipeline(cache)
+        benchmark(run_pipeline, cache)
@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from sudoku_ocr.dataset import CellDataset
+from sudoku_ocr.image_processing import ImageProcessing, get_occupancy
+from sudoku_ocr.recognition import DigitRecognizer
+
+IMAGES = [Path("tests/img/sudoku1.png"), Path("tests/img/sudoku3.jpg")]
+
+
+@pytest.fixture
+def dataset(tmp_path: Path) -> CellDataset:
+    dataset = CellDataset(tmp_path)
+    for path in IMAGES:
+        dataset.add_image(path)
+    return dataset
+
+
+def recognize_images(paths: List[Path], recognizer: DigitRecognizer) -> None:
+    """Decode, warp and recognize every image."""
+    for path in paths:
+        image = ImageProcessing()
+        image.load_image(path)
+        image.locate_grid(board_size=252)
+        recognizer.recognize(image)
+
+
+def recognize_dataset(dataset: CellDataset, recognizer: DigitRecognizer) -> None:
+    """Recognize every board of dataset."""
+    for board in dataset.boards():
+        recognizer.recognize(board)
+
+
+class TestDatasetBenchmark:
+    def test_recognize_images(self, benchmark) -> None:  # type: ignore
+        benchmark.group = "dataset"
+        benchmark(recognize_images, IMAGES, DigitRecognizer())
+
+    def test_recognize_dataset(self, benchmark, dataset: CellDataset) -> None:  # type: ignore
+        benchmark.group = "dataset"
+        benchmark(recognize_dataset, dataset, DigitRecognizer())
+
+    def test_get_occupancy(self, benchmark, dataset: CellDataset) -> None:  # type: ignore
+        benchmark.group = "dataset"
+        benchmark(get_occupancy, dataset.cells)
@@ -0,0 +1,40 @@
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import pytest
+
+from sudoku_ocr.image import Image
+
+IMAGE = Path("tests/img/sudoku3.jpg")
+
+
+def load_through_file(content: bytes) -> Image:
+    """Write upload to temporary file and load it back."""
+    with NamedTemporaryFile(suffix=IMAGE.suffix) as file:
+        file.write(content)
+        file.flush()
+        image = Image()
+        image.load_image(Path(file.name))
+    return image
+
+
+def load_buffer(content: bytes, reduction: int = 1, grayscale: bool = False) -> Image:
+    """Decode upload in memory."""
+    image = Image()
+    image.load_buffer(content, reduction, grayscale)
+    return image
+
+
+class TestImageBenchmark:
+    def test_load_through_file(self, benchmark) -> None:  # type: ignore
+        benchmark.group = "decode"
+        benchmark(load_through_file, IMAGE.read_bytes())
+
+    @pytest.mark.parametrize(
+        "reduction, grayscale", [(1, False), (1, True), (4, True), (8, True)]
+    )
+    def test_load_buffer(  # type: ignore
+        self, benchmark, reduction: int, grayscale: bool
+    ) -> None:
+        benchmark.group = "decode"
+        benchmark(load_buffer, IMAGE.read_bytes(), reduction, grayscale)
@@ -0,0 +1,280 @@
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+from cv2 import COLOR_BGR2GRAY, IMREAD_GRAYSCALE, cvtColor, imread
+from numpy import clip, exp, mgrid, uint8
+from numpy.random import default_rng
+
+from sudoku_ocr.border import ENGINES
+from sudoku_ocr.exceptions import GridNotFoundError
+from sudoku_ocr.image_processing import (
+    ImageProcessing,
+    ThresholdCascade,
+    WorkBuffers,
+    has_grid_lines,
+)
+from sudoku_ocr.instrumentation import recording
+
+
+@pytest.fixture
+def board() -> ImageProcessing:
+    image = ImageProcessing()
+    image.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+    image.data = cvtColor(image.data, COLOR_BGR2GRAY)
+    return image
+
+
+def copy_board(board: ImageProcessing) -> ImageProcessing:
+    image = ImageProcessing()
+    image.data = board.data.copy()
+    return image
+
+
+def is_empty_per_cell(board: ImageProcessing) -> list:
+    cell_height, cell_width = board.data.shape[0] // 9, board.data.shape[1] // 9
+    result = []
+    for row in range(9):
+        for col in range(9):
+            cell = ImageProcessing()
+            cell.data = board.get_cropped(
+                col * cell_width,
+                (col + 1) * cell_width,
+                row * cell_height,
+                (row + 1) * cell_height,
+            )
+            result.append(cell.is_empty())
+    return result
+
+
+class TestOccupancyBenchmark:
+    def test_is_empty_per_cell(self, benchmark, board: ImageProcessing) -> None:  # type: ignore
+        benchmark.group = "occupancy"
+        benchmark(is_empty_per_cell, board)
+
+    def test_is_empty_per_cell_recording(self, benchmark, board: ImageProcessing) -> None:  # type: ignore
+        benchmark.group = "occupancy"
+        with recording():
+            benchmark(is_empty_per_cell, board)
+
+    def test_get_occupancy_mask(self, benchmark, board: ImageProcessing) -> None:  # type: ignore
+        benchmark.group = "occupancy"
+        benchmark(board.get_occupancy_mask)
+
+
+def improve_data_quality_per_cell(board: ImageProcessing, engine: str) -> None:
+    for row in range(9):
+        for col in range(9):
+            board.get_cell(row, col).improve_data_quality(engine)
+
+
+class TestImproveQualityBenchmark:
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_improve_data_quality_per_cell(  # type: ignore
+        self, benchmark, board: ImageProcessing, engine: str
+    ) -> None:
+        benchmark.group = "improve_quality"
+        benchmark.pedantic(
+            improve_data_quality_per_cell,
+            setup=lambda: ((copy_board(board), engine), {}),
+            rounds=20,
+        )
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_improve_cells_quality(self, benchmark, board: ImageProcessing, engine: str) -> None:  # type: ignore
+        benchmark.group = "improve_quality"
+        benchmark.pedantic(
+            ImageProcessing.improve_cells_quality,
+            setup=lambda: ((copy_board(board), engine), {}),
+            rounds=20,
+        )
+
+
+@pytest.fixture
+def large_image() -> ImageProcessing:
+    image = ImageProcessing()
+    image.load_image(Path("tests/img/sudoku3.jpg"))
+    return image
+
+
+def adjust_perspective(image: ImageProcessing, width: Optional[int] = None) -> None:
+    if width:
+        image.resize(width)
+    image.thresholding()
+    zone = image.get_largest_rectangle_contours(image.get_contours())
+    image.adjust_perspective_to_specific_zone(zone)
+
+
+class TestLocateGridBenchmark:
+    @pytest.mark.parametrize("width", [None, 600])
+    def test_adjust_perspective(self, benchmark, large_image: ImageProcessing, width: int) -> None:  # type: ignore
+        benchmark.group = "locate_grid"
+        benchmark.pedantic(
+            adjust_perspective,
+            setup=lambda: ((copy_board(large_image), width), {}),
+            rounds=5,
+        )
+
+    def test_locate_grid(self, benchmark, large_image: ImageProcessing) -> None:  # type: ignore
+        benchmark.group = "locate_grid"
+        benchmark.pedantic(
+            ImageProcessing.locate_grid,
+            setup=lambda: ((copy_board(large_image),), {}),
+            rounds=5,
+        )
+
+
+@pytest.fixture
+def noisy_image() -> ImageProcessing:
+    image = ImageProcessing()
+    image.data = (default_rng(0).random((1200, 1600)) < 0.05).astype(uint8) * 255
+    return image
+
+
+def find_largest_rectangle(image: ImageProcessing) -> None:
+    try:
+        image.get_largest_rectangle_contours(image.get_contours())
+    except GridNotFoundError:
+        pass
+
+
+def find_grid(image: ImageProcessing) -> None:
+    try:
+        image.find_grid()
+    except GridNotFoundError:
+        pass
+
+
+class TestFindGridBenchmark:
+    def test_get_largest_rectangle_contours(self, benchmark, noisy_image: ImageProcessing) -> None:  # type: ignore
+        benchmark.group = "find_grid"
+        benchmark(find_largest_rectangle, noisy_image)
+
+    def test_find_grid(self, benchmark, noisy_image: ImageProcessing) -> None:  # type: ignore
+        benchmark.group = "find_grid"
+        benchmark(find_grid, noisy_image)
+
+
+@pytest.fixture(scope="module")
+def degraded_images() -> List[ImageProcessing]:
+    """Grayscale sudoku1 with low contrast, with and without glare."""
+    data = imread("tests/img/sudoku1.png", IMREAD_GRAYSCALE).astype(float)
+    height, width = data.shape
+    rows, cols = mgrid[0:height, 0:width]
+    glare = 120 * exp(
+        -((cols - 0.4 * width) ** 2 + (rows - 0.5 * height) ** 2) / (0.08 * width**2)
+    )
+    images = []
+    for contrast in (0.3, 0.15):
+        for light in (0, glare):
+            image = ImageProcessing()
+            image.data = clip(128 + (data - 128) * contrast + light, 0, 255).astype(
+                uint8
+            )
+            images.append(image)
+    return images
+
+
+def locate_degraded(
+    images: List[ImageProcessing], cascade: Optional[ThresholdCascade] = None
+) -> int:
+    """Locate grid in every image and get number of plausible grids."""
+    plausible = 0
+    for source in images:
+        image = copy_board(source)
+        try:
+            image.locate_grid(cascade=cascade)
+        except GridNotFoundError:
+            continue
+        plausible += has_grid_lines(image.data)
+    return plausible
+
+
+class TestThresholdCascadeBenchmark:
+    def test_default(self, benchmark, degraded_images: List[ImageProcessing]) -> None:  # type: ignore
+        benchmark.group = "threshold_cascade"
+        plausible = benchmark(locate_degraded, degraded_images)
+        benchmark.extra_info["plausible"] = plausible
+
+    @pytest.mark.parametrize("warm", [False, True])
+    def test_cascade(self, benchmark, degraded_images: List[ImageProcessing], warm: bool) -> None:  # type: ignore
+        benchmark.group = "threshold_cascade"
+        cascade = ThresholdCascade()
+        if warm:
+            locate_degraded(degraded_images, cascade)
+        plausible = benchmark.pedantic(
+            locate_degraded,
+            setup=lambda: (
+                (degraded_images, cascade if warm else ThresholdCascade()),
+                {},
+            ),
+            rounds=5,
+        )
+        benchmark.extra_info["plausible"] = plausible
+        assert plausible > locate_degraded(degraded_images)
+
+
+IMAGES = sorted(
+    path for path in Path("tests/img").iterdir() if path.suffix in (".png", ".jpg")
+)
+
+
+def locate_images(
+    buffers: Optional[WorkBuffers] = None, grayscale: bool = False
+) -> List[int]:
+    """Locate grid in every test image.
+
+    :return: peak of traced allocations of every image above memory
+        retained before it, when tracing
+    """
+    peaks = []
+    for path in IMAGES:
+        tracemalloc.reset_peak()
+        retained = tracemalloc.get_traced_memory()[0]
+        image = ImageProcessing(buffers)
+        image.load_image(path, grayscale=grayscale)
+        try:
+            image.locate_grid()
+        except GridNotFoundError:
+            pass
+        peaks.append(tracemalloc.get_traced_memory()[1] - retained)
+    return peaks
+
+
+def get_peak_rss(lean: bool) -> Optional[int]:
+    """Locate grid in every test image twice and get peak RSS in bytes.
+
+    Unlike ``ru_maxrss``, which survives exec of spawned process, VmHWM of
+    Linux starts with the process, None is returned on other systems.
+    """
+    buffers = WorkBuffers() if lean else None
+    for _ in range(2):
+        locate_images(buffers, lean)
+    status = Path("/proc/self/status")
+    if not status.exists():
+        return None
+    for line in status.read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) * 1024
+    return None
+
+
+class TestMemoryBenchmark:
+    @pytest.mark.parametrize("lean", [False, True], ids=["default", "lean"])
+    def test_locate_images(self, benchmark, lean: bool) -> None:  # type: ignore
+        benchmark.group = "memory"
+        buffers = WorkBuffers() if lean else None
+        benchmark(locate_images, buffers, lean)
+        tracemalloc.start()
+        try:
+            peaks = locate_images(buffers, lean)
+        finally:
+            tracemalloc.stop()
+        # fresh process, so peak RSS is not inherited from other benchmarks
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            peak_rss = executor.submit(get_peak_rss, lean).result()
+        benchmark.extra_info["traced_peak_bytes_per_image"] = sum(peaks) / len(peaks)
+        benchmark.extra_info["peak_rss_bytes"] = peak_rss
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+# cumulative cold import time budget in seconds
+IMPORT_TIME_BUDGET = {
+    "sudoku_ocr": 0.1,
+    "sudoku_ocr.cli": 0.2,
+    "sudoku_ocr.image_processing": 1.0,
+}
+
+
+def cold_import(module: str) -> tuple:
+    """Import module in fresh interpreter, return import time and loaded modules."""
+    code = f"import sys, {module}; print(' '.join(sys.modules))"
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in process.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1_000_000, set(process.stdout.split())
+    raise AssertionError(f"import time of {module} not reported")
+
+
+class TestImportTime:
+    @pytest.mark.parametrize("module", list(IMPORT_TIME_BUDGET))
+    def test_import_time_budget(self, module: str) -> None:
+        import_time, _ = cold_import(module)
+        assert import_time < IMPORT_TIME_BUDGET[module]
+
+    @pytest.mark.parametrize("module", list(IMPORT_TIME_BUDGET))
+    def test_heavy_modules_not_imported(self, module: str) -> None:
+        _, modules = cold_import(module)
+        assert not {"skimage", "scipy", "tensorflow"} & modules
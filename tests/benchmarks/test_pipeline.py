@@ -0,0 +1,157 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+from cv2 import INTER_CUBIC, imencode, imread, resize
+from numpy import ndarray, uint8
+from numpy.random import default_rng
+
+from sudoku_ocr.board import Board
+from sudoku_ocr.exceptions import GridNotFoundError
+from sudoku_ocr.image_processing import ImageProcessing
+from sudoku_ocr.recognition import DigitRecognizer
+from sudoku_ocr.solver import solve
+
+IMAGES = [
+    "sudoku1.png",
+    "sudoku2.jpg",
+    "sudoku3.jpg",
+    "no_sudoku.jpg",
+    "no_sudoku2.jpg",
+]
+REJECTS = {"no_sudoku.jpg", "no_sudoku2.jpg"}
+SYNTHETIC_LARGE = "synthetic_large"
+LARGE_SHAPE = (6000, 4500)
+LARGE_SCALE = 5.5
+
+
+def make_large_image() -> bytes:
+    """Encode upscaled sudoku1 on 4500x6000 noisy background as JPEG."""
+    board = resize(
+        imread("tests/img/sudoku1.png"),
+        None,
+        fx=LARGE_SCALE,
+        fy=LARGE_SCALE,
+        interpolation=INTER_CUBIC,
+    )
+    image = default_rng(0).integers(96, 160, LARGE_SHAPE + (3,), dtype=uint8)
+    top, left = (
+        (size - board_size) // 2 for size, board_size in zip(LARGE_SHAPE, board.shape)
+    )
+    height, width = board.shape[:2]
+    image[slice(top, top + height), slice(left, left + width)] = board
+    return imencode(".jpg", image)[1].tobytes()
+
+
+@pytest.fixture(scope="module")
+def encoded() -> Dict[str, bytes]:
+    """Encoded test images by name."""
+    images = {name: Path(f"tests/img/{name}").read_bytes() for name in IMAGES}
+    images[SYNTHETIC_LARGE] = make_large_image()
+    return images
+
+
+@pytest.fixture(scope="module")
+def recognizer() -> DigitRecognizer:
+    return DigitRecognizer()
+
+
+def decode(content: bytes) -> ndarray:
+    image = ImageProcessing()
+    image.load_buffer(content, grayscale=True)
+    return image.data
+
+
+def locate(data: ndarray) -> Optional[ImageProcessing]:
+    image = ImageProcessing()
+    image.data = data
+    try:
+        image.locate_grid()
+    except GridNotFoundError:
+        return None
+    return image
+
+
+def run_pipeline(content: bytes, recognizer: DigitRecognizer) -> Optional[Board]:
+    """Decode, locate, recognize and solve single image."""
+    board = Board(recognizer=recognizer)
+    try:
+        board.prepare_img(content, grayscale=True)
+    except GridNotFoundError:
+        return None
+    board.ocr_sudoku()
+    board.solve(max_nodes=100000)
+    return board
+
+
+@pytest.fixture(params=IMAGES + [SYNTHETIC_LARGE])
+def name(request: pytest.FixtureRequest) -> str:
+    return request.param
+
+
+@pytest.fixture(
+    params=[name for name in IMAGES if name not in REJECTS] + [SYNTHETIC_LARGE]
+)
+def board_name(request: pytest.FixtureRequest) -> str:
+    return request.param
+
+
+class TestPipelineBenchmark:
+    def test_decode(  # type: ignore
+        self,
+        benchmark,
+        throughput: Callable[..., Any],
+        encoded: Dict[str, bytes],
+        name: str,
+    ) -> None:
+        benchmark.group = "pipeline_decode"
+        assert throughput(decode, encoded[name]).ndim == 2
+
+    def test_locate_grid(  # type: ignore
+        self,
+        benchmark,
+        throughput: Callable[..., Any],
+        encoded: Dict[str, bytes],
+        name: str,
+    ) -> None:
+        benchmark.group = "pipeline_locate_grid"
+        image = throughput(locate, decode(encoded[name]))
+        assert (image is None) == (name in REJECTS)
+
+    def test_recognize(  # type: ignore
+        self,
+        benchmark,
+        throughput: Callable[..., Any],
+        encoded: Dict[str, bytes],
+        recognizer: DigitRecognizer,
+        board_name: str,
+    ) -> None:
+        benchmark.group = "pipeline_recognize"
+        board = locate(decode(encoded[board_name]))
+        grid, _ = throughput(recognizer.recognize, board)
+        assert grid.any()
+
+    def test_solve(  # type: ignore
+        self,
+        benchmark,
+        throughput: Callable[..., Any],
+        encoded: Dict[str, bytes],
+        recognizer: DigitRecognizer,
+        board_name: str,
+    ) -> None:
+        benchmark.group = "pipeline_solve"
+        grid, _ = recognizer.recognize(locate(decode(encoded[board_name])))  # type: ignore
+        solution = throughput(solve, grid, 100000)
+        benchmark.extra_info["status"] = solution.status
+
+    def test_end_to_end(  # type: ignore
+        self,
+        benchmark,
+        throughput: Callable[..., Any],
+        encoded: Dict[str, bytes],
+        recognizer: DigitRecognizer,
+        name: str,
+    ) -> None:
+        benchmark.group = "pipeline"
+        board = throughput(run_pipeline, encoded[name], recognizer)
+        assert (board is None) == (name in REJECTS)
@@ -0,0 +1,39 @@
+from numpy import exp, float32, ndarray
+from numpy.random import default_rng
+
+from sudoku_ocr.image_processing import ImageProcessing
+from sudoku_ocr.recognition import DigitRecognizer
+
+
+class LinearClassifier:
+    """Random single layer model standing in for a trained one."""
+
+    def __init__(self) -> None:
+        self.weights = default_rng(0).standard_normal((28 * 28, 10)).astype(float32)
+
+    def predict(self, batch: ndarray) -> ndarray:
+        logits = batch.reshape(len(batch), -1) @ self.weights
+        return exp(logits - logits.max(axis=1, keepdims=True))
+
+
+class TestRecognitionBenchmark:
+    def test_recognize(self, benchmark, sudoku1_cells: ImageProcessing) -> None:  # type: ignore
+        benchmark.group = "recognition"
+        recognizer = DigitRecognizer(LinearClassifier())
+        cells = int(sudoku1_cells.get_occupancy_mask().sum())
+        benchmark(recognizer.recognize, sudoku1_cells)
+        if benchmark.stats:
+            benchmark.extra_info["cells_per_second"] = (
+                cells / benchmark.stats.stats.mean
+            )
+
+    def test_recognize_knn(  # type: ignore
+        self, benchmark, sudoku1_cells: ImageProcessing, sudoku1_board: ndarray
+    ) -> None:
+        benchmark.group = "recognition"
+        recognizer = DigitRecognizer("knn")
+        grid, _ = benchmark(recognizer.recognize, sudoku1_cells)
+        recognized = (grid > 0) & (sudoku1_board > 0)
+        benchmark.extra_info["accuracy"] = float(
+            (grid[recognized] == sudoku1_board[recognized]).mean()
+        )
@@ -0,0 +1,34 @@
+import asyncio
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from sudoku_ocr.service import OcrService, ServiceResult
+
+IMAGE = Path("tests/img/sudoku1.png")
+REQUESTS = 8
+
+
+async def burst(service: OcrService, content: bytes) -> List[ServiceResult]:
+    """Send `REQUESTS` concurrent requests."""
+    return await asyncio.gather(*(service.process(content) for _ in range(REQUESTS)))
+
+
+class TestServiceBenchmark:
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_burst(self, benchmark, workers: int) -> None:  # type: ignore
+        benchmark.group = "service"
+        service = OcrService(workers=workers, max_pending=REQUESTS)
+        loop = asyncio.new_event_loop()
+        try:
+            benchmark(
+                lambda: loop.run_until_complete(burst(service, IMAGE.read_bytes()))
+            )
+        finally:
+            service.close()
+            loop.close()
+        if benchmark.stats:
+            benchmark.extra_info["requests_per_second"] = (
+                REQUESTS / benchmark.stats.stats.mean
+            )
@@ -0,0 +1,89 @@
+from typing import Callable, List
+
+import pytest
+from numpy import concatenate, ndarray, nonzero, ones, stack
+from numpy.random import default_rng
+
+from sudoku_ocr.canonical import SolutionCache, canonicalize
+from sudoku_ocr.solver import repair, solve, solve_many
+
+
+@pytest.fixture
+def many_boards(puzzles: dict) -> ndarray:
+    """1000 boards with digits of easy and 17 clues puzzles relabeled."""
+    rng = default_rng(0)
+    boards = [
+        concatenate(([0], rng.permutation(9) + 1))[puzzles[name]]
+        for name in ("easy", "17_clues")
+        for _ in range(500)
+    ]
+    return stack(boards)
+
+
+@pytest.fixture
+def corpus(puzzles: dict, random_transform: Callable) -> List[ndarray]:
+    """1000 boards of 60 distinct puzzles, most frequent first, transformed.
+
+    Distinct puzzles are hard, 17 clues and easy puzzles with 0 to 19 givens
+    of the solution added. Puzzle ``i`` is drawn with weight ``1 / (i + 1)``.
+    """
+    rng = default_rng(0)
+    distinct = []
+    for name in ("hard", "17_clues", "easy"):
+        board = puzzles[name]
+        solution = solve(board).grid
+        empty = nonzero(board.ravel() == 0)[0]
+        for extra in range(20):
+            puzzle = board.copy().ravel()
+            cells = rng.choice(empty, extra, replace=False)
+            puzzle[cells] = solution.ravel()[cells]
+            distinct.append(puzzle.reshape(9, 9))
+    order = rng.permutation(len(distinct))
+    weights = 1 / (order + 1)
+    picks = rng.choice(len(distinct), 1000, p=weights / weights.sum())
+    return [random_transform(distinct[pick]) for pick in picks]
+
+
+class TestSolverBenchmark:
+    def test_solve(self, benchmark, puzzle: tuple) -> None:  # type: ignore
+        name, board = puzzle
+        benchmark.group = "solve"
+        solution = benchmark(solve, board)
+        benchmark.extra_info["status"] = solution.status
+        benchmark.extra_info["nodes"] = solution.nodes
+
+    def test_solve_per_board(self, benchmark, many_boards: ndarray) -> None:  # type: ignore
+        benchmark.group = "solve_many"
+        benchmark(lambda: [solve(board) for board in many_boards])
+
+    def test_solve_many(self, benchmark, many_boards: ndarray) -> None:  # type: ignore
+        benchmark.group = "solve_many"
+        benchmark(solve_many, many_boards)
+
+    def test_repair(self, benchmark, sudoku1_board: ndarray) -> None:  # type: ignore
+        benchmark.group = "repair"
+        sudoku1_board[2, 4] = 3
+        confidences = ones((9, 9))
+        confidences[2, 4] = 0.4
+        result = benchmark(repair, sudoku1_board, confidences)
+        benchmark.extra_info["attempts"] = result.attempts
+
+    def test_solve_corpus(self, benchmark, corpus: List[ndarray]) -> None:  # type: ignore
+        benchmark.group = "solution_cache"
+        benchmark.pedantic(lambda: [solve(board) for board in corpus], rounds=1)
+
+    def test_solve_corpus_cached(self, benchmark, corpus: List[ndarray]) -> None:  # type: ignore
+        benchmark.group = "solution_cache"
+        caches = []
+
+        def solve_corpus() -> None:
+            caches.append(SolutionCache())
+            for board in corpus:
+                caches[-1].solve(board)
+
+        benchmark.pedantic(solve_corpus, rounds=3)
+        benchmark.extra_info.update(caches[-1].counters)
+
+    def test_canonicalize(self, benchmark, corpus: List[ndarray]) -> None:  # type: ignore
+        benchmark.group = "canonicalize"
+        benchmark(canonicalize, corpus[0])
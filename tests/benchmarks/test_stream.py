@@ -0,0 +1,47 @@
+from typing import Iterator, List, Tuple
+
+import pytest
+from cv2 import getNumThreads, setNumThreads
+from numpy import ndarray
+
+from sudoku_ocr.image_processing import ImageProcessing
+from sudoku_ocr.recognition import DigitRecognizer
+from sudoku_ocr.stream import GridTracker
+
+Clip = Tuple[List[ndarray], List[ndarray]]
+
+
+@pytest.fixture
+def single_core() -> Iterator[None]:
+    """Limit OpenCV to single thread."""
+    threads = getNumThreads()
+    setNumThreads(1)
+    yield
+    setNumThreads(threads)
+
+
+def detect_every_frame(frames: List[ndarray], recognizer: DigitRecognizer) -> None:
+    """Locate and recognize board in every frame."""
+    for frame in frames:
+        image = ImageProcessing()
+        image.data = frame
+        image.locate_grid()
+        recognizer.recognize(image)
+
+
+def track(frames: List[ndarray], recognizer: DigitRecognizer) -> None:
+    """Locate and recognize board with `GridTracker`."""
+    for _ in GridTracker(recognizer).stream(frames):
+        pass
+
+
+@pytest.mark.usefixtures("single_core")
+class TestStreamBenchmark:
+    @pytest.mark.parametrize("process", [detect_every_frame, track])
+    def test_stream(self, benchmark, process, sudoku1_clip: Clip) -> None:  # type: ignore
+        benchmark.group = "stream"
+        frames, _ = sudoku1_clip
+        recognizer = DigitRecognizer()
+        benchmark(process, frames, recognizer)
+        if benchmark.stats:
+            benchmark.extra_info["fps"] = len(frames) / benchmark.stats.stats.mean
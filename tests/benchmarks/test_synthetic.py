@@ -0,0 +1,38 @@
+import pytest
+
+from sudoku_ocr.synthetic import BoardGenerator, GeneratorOptions, generate_samples
+
+
+@pytest.fixture
+def generator() -> BoardGenerator:
+    return BoardGenerator(seed=0)
+
+
+class TestSyntheticBenchmark:
+    def test_generate_puzzle(self, benchmark, generator: BoardGenerator) -> None:  # type: ignore
+        benchmark.group = "synthetic"
+        benchmark(generator.generate_puzzle)
+
+    def test_render(self, benchmark, generator: BoardGenerator) -> None:  # type: ignore
+        benchmark.group = "synthetic"
+        board, _ = generator.next_puzzle()
+        benchmark(generator.render, board)
+
+    @pytest.mark.parametrize("variants", [1, 8])
+    def test_sample(self, benchmark, variants: int) -> None:  # type: ignore
+        benchmark.group = "synthetic"
+        generator = BoardGenerator(GeneratorOptions(variants=variants), seed=0)
+        benchmark(generator.sample)
+        if benchmark.stats is not None:
+            benchmark.extra_info["samples_per_minute"] = 60 / benchmark.stats.stats.mean
+
+    def test_generate_samples(self, benchmark) -> None:  # type: ignore
+        benchmark.group = "synthetic_pool"
+        count = 256
+        benchmark.pedantic(
+            lambda: sum(1 for _ in generate_samples(count, seed=0)), rounds=3
+        )
+        if benchmark.stats is not None:
+            benchmark.extra_info["samples_per_minute"] = (
+                60 * count / benchmark.stats.stats.mean
+            )
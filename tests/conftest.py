@@ -0,0 +1,160 @@
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+from cv2 import IMREAD_GRAYSCALE, imread, perspectiveTransform, warpPerspective
+from numpy import array, clip, concatenate, float32, hstack, ndarray, uint8, vstack
+from numpy.random import default_rng
+
+from sudoku_ocr.image_processing import ImageProcessing
+from sudoku_ocr.perspective import order_points
+
+SUDOKU1_BOARD = [
+    [0, 0, 7, 0, 0, 4, 0, 0, 9],
+    [0, 0, 0, 0, 0, 0, 0, 1, 5],
+    [4, 0, 0, 3, 5, 8, 0, 0, 7],
+    [1, 0, 0, 2, 0, 0, 3, 0, 6],
+    [0, 5, 0, 0, 3, 0, 0, 7, 2],
+    [0, 0, 3, 0, 0, 1, 0, 0, 8],
+    [0, 0, 0, 8, 9, 3, 0, 0, 4],
+    [0, 7, 0, 0, 0, 0, 0, 0, 3],
+    [3, 0, 0, 7, 0, 0, 5, 0, 1],
+]
+
+SUDOKU1_SOLUTION = [
+    [5, 6, 7, 1, 2, 4, 8, 3, 9],
+    [8, 3, 2, 9, 7, 6, 4, 1, 5],
+    [4, 9, 1, 3, 5, 8, 6, 2, 7],
+    [1, 4, 9, 2, 8, 7, 3, 5, 6],
+    [6, 5, 8, 4, 3, 9, 1, 7, 2],
+    [7, 2, 3, 5, 6, 1, 9, 4, 8],
+    [2, 1, 5, 8, 9, 3, 7, 6, 4],
+    [9, 7, 4, 6, 1, 5, 2, 8, 3],
+    [3, 8, 6, 7, 4, 2, 5, 9, 1],
+]
+
+# digits of test images, row by row
+IMAGE_BOARDS = {
+    "sudoku1.png": "".join(str(value) for row in SUDOKU1_BOARD for value in row),
+    "sudoku2.jpg": "850000002104070003600300000230050801080030020401090036000002005300060209500000047",
+    "sudoku3.jpg": "000230000067000920090007030004070008600402001700010600070600010018000370000051000",
+}
+
+# boards as strings of 81 digits, row by row
+PUZZLES = {
+    "easy": "".join(str(value) for row in SUDOKU1_BOARD for value in row),
+    "17_clues": "000000010400000000020000000000050407008000300001090000300400200050100000000806000",
+    "hard": "800000000003600000070090200050007000000045700000100030001000068008500010090000400",
+    "unsolvable": "800000000003650000070090200050007000000045700000100030001000068008500010090000400",
+}
+
+CLIP_LENGTH = 60
+LOW_CONTRAST = 0.3
+
+
+def to_board(puzzle: str) -> ndarray:
+    """Convert string of 81 digits to 9x9 board."""
+    return array([int(value) for value in puzzle]).reshape(9, 9)
+
+
+@pytest.fixture
+def sudoku1_board() -> ndarray:
+    """Digits of tests/img/sudoku1.png."""
+    return array(SUDOKU1_BOARD)
+
+
+@pytest.fixture
+def sudoku1_solution() -> ndarray:
+    """Solution of tests/img/sudoku1.png."""
+    return array(SUDOKU1_SOLUTION)
+
+
+@pytest.fixture
+def image_boards() -> Dict[str, ndarray]:
+    """Digits of test images by file name."""
+    return {name: to_board(puzzle) for name, puzzle in IMAGE_BOARDS.items()}
+
+
+@pytest.fixture
+def puzzles() -> Dict[str, ndarray]:
+    """Boards of `PUZZLES` by name."""
+    return {name: to_board(puzzle) for name, puzzle in PUZZLES.items()}
+
+
+@pytest.fixture(params=list(PUZZLES))
+def puzzle(request: pytest.FixtureRequest) -> Tuple[str, ndarray]:
+    """Name and board of every puzzle in `PUZZLES`."""
+    return request.param, to_board(PUZZLES[request.param])
+
+
+@pytest.fixture
+def random_transform() -> Callable[[ndarray], ndarray]:
+    """Get function returning random equivalent board, seeded per test."""
+    rng = default_rng(0)
+
+    def transform(board: ndarray) -> ndarray:
+        rows = concatenate(
+            [rng.permutation(3) + 3 * band for band in rng.permutation(3)]
+        )
+        cols = concatenate(
+            [rng.permutation(3) + 3 * stack for stack in rng.permutation(3)]
+        )
+        digits = concatenate(([0], rng.permutation(9) + 1))
+        board = digits[board[rows][:, cols]]
+        return board.T if rng.random() < 0.5 else board
+
+    return transform
+
+
+@pytest.fixture
+def sudoku1_cells() -> ImageProcessing:
+    """Board assembled from tests/img/cells fixtures."""
+    board = ImageProcessing()
+    board.data = vstack(
+        [
+            hstack(
+                [
+                    imread(
+                        str(Path(f"tests/img/cells/sudoku1_cell{row * 9 + col}.png")),
+                        IMREAD_GRAYSCALE,
+                    )
+                    for col in range(9)
+                ]
+            )
+            for row in range(9)
+        ]
+    )
+    return board
+
+
+@pytest.fixture(scope="session")
+def sudoku1_clip() -> Tuple[List[ndarray], List[ndarray]]:
+    """Frames of tests/img/sudoku1.png slowly moving in 640x480 view.
+
+    :return: frames and 4x2 board corners in every frame
+    """
+    image = imread("tests/img/sudoku1.png")
+    located = ImageProcessing()
+    located.data = image
+    zone = order_points(located.locate_grid()).reshape(-1, 1, 2)
+    frames, zones = [], []
+    for index in range(CLIP_LENGTH):
+        scale = 0.6 + 0.001 * index
+        homography = array(
+            [
+                [scale, 0.0005 * index, 90 + 0.5 * index],
+                [0, scale, -130 + 0.3 * index],
+                [0, 0, 1],
+            ],
+            dtype=float32,
+        )
+        frames.append(warpPerspective(image, homography, (640, 480)))
+        zones.append(perspectiveTransform(zone, homography).reshape(4, 2))
+    return frames, zones
+
+
+@pytest.fixture(scope="session")
+def sudoku1_low_contrast() -> ndarray:
+    """Grayscale tests/img/sudoku1.png with contrast reduced around mid gray."""
+    image = imread("tests/img/sudoku1.png", IMREAD_GRAYSCALE).astype(float)
+    return clip(128 + (image - 128) * LOW_CONTRAST, 0, 255).astype(uint8)
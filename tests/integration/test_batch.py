@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from sudoku_ocr.batch import find_images, process_image, process_images
+
+
+class TestBatch:
+    def test_find_images(self) -> None:
+        paths = list(find_images(Path("tests/img")))
+        assert Path("tests/img/sudoku1.png") in paths
+        assert Path("tests/img/cells") not in paths
+
+    def test_process_image(self) -> None:
+        result = process_image(Path("tests/img/sudoku1.png"))
+        assert result.ok
+        assert result.zone is not None and result.data is not None
+        assert result.zone.shape == (4, 2)
+        assert result.data.ndim == 2
+
+    def test_process_image_file_not_found(self) -> None:
+        result = process_image(Path("foo/path/file.png"))
+        assert not result.ok
+        assert result.data is None
+        assert result.error is not None
+        assert "not found" in result.error
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 10])
+    def test_process_images(self, chunk_size: int) -> None:
+        paths = [
+            Path("tests/img/sudoku1.png"),
+            Path("tests/img/sudoku2.jpg"),
+            Path("foo/path/file.png"),
+        ]
+        results = list(process_images(iter(paths), workers=2, chunk_size=chunk_size))
+        assert sorted(result.path for result in results) == sorted(paths)
+        by_path = {result.path: result for result in results}
+        assert by_path[Path("tests/img/sudoku1.png")].ok
+        assert not by_path[Path("foo/path/file.png")].ok
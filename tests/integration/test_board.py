@@ -0,0 +1,139 @@
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from numpy import eye, ndarray
+
+from sudoku_ocr import Board
+from sudoku_ocr.cache import ResultCache
+from sudoku_ocr.image_processing import (
+    ImageProcessing,
+    ThresholdCascade,
+    ThresholdParameters,
+)
+from sudoku_ocr.recognition import DigitRecognizer
+
+
+class TestBoard:
+    @pytest.mark.parametrize("name", ["sudoku1.png", "sudoku2.jpg", "sudoku3.jpg"])
+    def test_ocr_sudoku(self, image_boards: Dict[str, ndarray], name: str) -> None:
+        board = Board()
+        board.prepare_img(Path("tests/img") / name)
+        board.ocr_sudoku()
+        assert (board.board_value == image_boards[name]).all()
+        board.solve()
+        assert board.status == "solved"
+
+    def test_solve(self, sudoku1_solution: ndarray) -> None:
+        board = Board()
+        board.prepare_img(Path("tests/img/sudoku1.png"))
+        board.ocr_sudoku()
+        board.solve()
+        assert (board.solved_board == sudoku1_solution).all()
+
+    def test_prepare_img_buffer(self) -> None:
+        path = Path("tests/img/sudoku1.png")
+        boards = []
+        for source in (path, path.read_bytes()):
+            board = Board()
+            board.prepare_img(source)
+            board.ocr_sudoku()
+            boards.append(board)
+        assert (boards[0].zone == boards[1].zone).all()
+        assert (boards[0].board_value == boards[1].board_value).all()
+
+    def test_prepare_img_grayscale(self, sudoku1_board: ndarray) -> None:
+        board = Board()
+        board.prepare_img(Path("tests/img/sudoku1.png").read_bytes(), grayscale=True)
+        board.ocr_sudoku()
+        givens = sudoku1_board > 0
+        assert (board.board_value[givens] == sudoku1_board[givens]).mean() >= 0.8
+
+    def test_cache(self, mocker, tmp_path: Path) -> None:  # type: ignore
+        cache = ResultCache(path=tmp_path / "cache.sqlite")
+        locate_grid = mocker.spy(ImageProcessing, "locate_grid")
+        recognize = mocker.spy(DigitRecognizer, "recognize_probabilities")
+        boards = []
+        for _ in range(2):
+            board = Board(cache=cache)
+            board.prepare_img(Path("tests/img/sudoku1.png"))
+            board.ocr_sudoku()
+            board.solve(repair_givens=True)
+            boards.append(board)
+        assert locate_grid.call_count == 1
+        assert recognize.call_count == 1
+        assert cache.counters == {
+            "memory_hits": 1,
+            "disk_hits": 0,
+            "misses": 1,
+            "evictions": 0,
+            "disk_evictions": 0,
+        }
+        for attribute in ("zone", "board_value", "confidences", "solved_board"):
+            assert (
+                getattr(boards[0], attribute) == getattr(boards[1], attribute)
+            ).all()
+        assert boards[0].status == boards[1].status
+        assert boards[0].corrections == boards[1].corrections
+
+    def test_cache_repaired(  # type: ignore
+        self, mocker, sudoku1_board: ndarray, sudoku1_solution: ndarray
+    ) -> None:
+        misread = sudoku1_board.copy()
+        misread[0, 2] = 4
+        probabilities = eye(10)[misread][:, :, 1:]
+        probabilities[0, 2] = 0.0125
+        probabilities[0, 2, [3, 6]] = 0.6, 0.3
+        mocker.patch.object(
+            DigitRecognizer, "recognize_probabilities", return_value=probabilities
+        )
+        cache = ResultCache()
+        board = Board(cache=cache)
+        board.prepare_img(Path("tests/img/sudoku1.png"))
+        board.ocr_sudoku()
+        board.solve(repair_givens=True)
+        assert board.corrections == [(0, 2, 4, 7)]
+        board.solve()
+        assert board.status == "invalid"
+        assert board.corrections == []
+        assert (board.board_value == misread).all()
+        cached = Board(cache=cache)
+        cached.prepare_img(Path("tests/img/sudoku1.png"))
+        cached.ocr_sudoku()
+        cached.solve(repair_givens=True)
+        assert cached.status == "solved"
+        assert cached.corrections == [(0, 2, 4, 7)]
+        assert (cached.board_value == sudoku1_board).all()
+        assert (cached.solved_board == sudoku1_solution).all()
+        assert cache.counters["misses"] == 1
+
+    def test_cache_parameters(self, tmp_path: Path) -> None:
+        cache = ResultCache()
+        for threshold in (5, 6):
+            board = Board(cache=cache, threshold=threshold)
+            board.prepare_img(Path("tests/img/sudoku1.png"))
+            board.ocr_sudoku()
+        assert cache.counters["misses"] == 2
+
+    def test_cache_recognizer_parameters(self) -> None:
+        cache = ResultCache()
+        for threshold in (5, 6, 6):
+            board = Board(cache=cache, recognizer=DigitRecognizer(threshold=threshold))
+            board.prepare_img(Path("tests/img/sudoku1.png"))
+            board.ocr_sudoku()
+        assert cache.counters["misses"] == 2
+        assert cache.counters["memory_hits"] == 1
+        assert board.parameters["recognizer"]["threshold"] == 6
+
+    def test_threshold_cascade(
+        self, sudoku1_board: ndarray, sudoku1_low_contrast: ndarray
+    ) -> None:
+        cascade = ThresholdCascade()
+        board = Board(threshold_cascade=cascade)
+        board.prepare_img(sudoku1_low_contrast)
+        board.ocr_sudoku()
+        givens = sudoku1_board > 0
+        assert (board.board_value[givens] == sudoku1_board[givens]).mean() >= 0.8
+        assert sum(item["successes"] for item in cascade.statistics) == 1
+        assert board.parameters["cascade"][0] == asdict(ThresholdParameters())
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+from numpy import array, load
+
+from sudoku_ocr.cli import main
+from sudoku_ocr.dataset import CellDataset
+from sudoku_ocr.image_processing import ImageProcessing
+
+
+class TestCli:
+    def test_detect_jsonl(self, tmp_path: Path) -> None:
+        output = tmp_path / "result.jsonl"
+        exit_code = main(
+            [
+                "detect",
+                "tests/img/sudoku1.png",
+                "tests/img/no_sudoku2.jpg",
+                "-j",
+                "1",
+                "-o",
+                str(output),
+            ]
+        )
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert exit_code == 1
+        assert {record["path"]: record["ok"] for record in records} == {
+            "tests/img/sudoku1.png": True,
+            "tests/img/no_sudoku2.jpg": False,
+        }
+
+    def test_detect_npz_glob(self, tmp_path: Path) -> None:
+        output = tmp_path / "result.npz"
+        exit_code = main(
+            ["detect", "tests/img/sudoku*.png", "--format", "npz", "-o", str(output)]
+        )
+        archive = load(output)
+        records = json.loads(str(archive["index"]))
+        assert exit_code == 0
+        assert len(records) == 2
+        assert archive["board_0"].shape == tuple(records[0]["shape"])
+
+    def test_detect_cells(self, tmp_path: Path) -> None:
+        output = tmp_path / "dataset"
+        for _ in range(2):
+            exit_code = main(
+                [
+                    "detect",
+                    "tests/img/sudoku*.png",
+                    "tests/img/no_sudoku2.jpg",
+                    "--format",
+                    "cells",
+                    "-o",
+                    str(output),
+                ]
+            )
+            assert exit_code == 1
+        dataset = CellDataset(output)
+        assert dataset.shape == (4, 81, 28, 28)
+        assert {record.path for record in dataset.records} == {
+            "tests/img/sudoku1.png",
+            "tests/img/sudoku1_test_adjust_perspective.png",
+        }
+
+    def test_detect_cells_zone(self, tmp_path: Path) -> None:
+        output = tmp_path / "dataset"
+        main(
+            ["detect", "tests/img/sudoku1.png", "--format", "cells", "-o", str(output)]
+        )
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        assert image.data.shape[1] != 600
+        zone = CellDataset(output).records[0].zone
+        assert abs(array(zone) - image.locate_grid()).max() < 1
+
+    def test_generate(self, tmp_path: Path) -> None:
+        output = tmp_path / "generated"
+        exit_code = main(["generate", "3", "-o", str(output), "--seed", "0", "-j", "1"])
+        records = [
+            json.loads(line)
+            for line in (output / "index.jsonl").read_text().splitlines()
+        ]
+        assert exit_code == 0
+        assert [record["path"] for record in records] == [
+            "000000.jpg",
+            "000001.jpg",
+            "000002.jpg",
+        ]
+        assert all((output / record["path"]).exists() for record in records)
+        assert len(records[0]["zone"]) == 4
+        assert len(records[0]["solution"]) == 9
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from numpy import array, ndarray, unique
+
+from sudoku_ocr.dataset import CellDataset
+from sudoku_ocr.image_processing import ImageProcessing, get_occupancy
+from sudoku_ocr.recognition import DigitRecognizer
+
+
+class TestCellDataset:
+    def test_add_image(self, tmp_path: Path, sudoku1_board: ndarray) -> None:
+        dataset = CellDataset(tmp_path)
+        dataset.add_image(Path("tests/img/sudoku1.png"), labels=sudoku1_board)
+        record = dataset.records[0]
+        assert dataset.shape == (1, 81, 28, 28)
+        assert record.path == "tests/img/sudoku1.png"
+        assert array(record.zone).shape == (4, 2)
+        assert (array(record.labels) == sudoku1_board).all()
+
+    def test_add_board(self, tmp_path: Path) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        zone = image.locate_grid(board_size=252)
+        dataset = CellDataset(tmp_path)
+        dataset.add_board(image, "sudoku1.png", zone)
+        assert (dataset.cells[0] == image.get_cells().reshape(81, 28, 28)).all()
+        assert (array(dataset.records[0].occupancy) == image.get_occupancy_mask()).all()
+        assert (
+            get_occupancy(dataset.cells[0]) == image.get_occupancy_mask().ravel()
+        ).all()
+
+    def test_add_board_resampled(self, tmp_path: Path) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        image.locate_grid()
+        dataset = CellDataset(tmp_path)
+        dataset.add_board(image)
+        assert image.data.shape == (450, 450)
+        assert set(unique(dataset.cells)) <= {0, 255}
+        occupancy = array(dataset.records[0].occupancy)
+        assert (get_occupancy(dataset.cells[0]) == occupancy.ravel()).all()
+        assert (occupancy == image.get_occupancy_mask()).all()
+
+    def test_recognize(self, tmp_path: Path, sudoku1_board: ndarray) -> None:
+        dataset = CellDataset(tmp_path)
+        dataset.add_image(Path("tests/img/sudoku1.png"), labels=sudoku1_board)
+        grid, _ = DigitRecognizer().recognize(CellDataset(tmp_path).get_board(0))
+        givens = sudoku1_board > 0
+        assert (grid[givens] == sudoku1_board[givens]).mean() >= 0.8
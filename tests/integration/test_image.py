@@ -2,6 +2,7 @@ from pathlib import Path
 
 import pytest
 
+from sudoku_ocr.exceptions import ImageDecodeError
 from sudoku_ocr.image import Image
 
 
@@ -17,9 +18,14 @@ class TestImage:
         assert image.data is not None
         assert image.path is not None
 
-    # TODO
-    def test_save_image(self) -> None:
-        pass
+    def test_save_image(self, tmp_path: Path) -> None:
+        image = Image()
+        image.load_image(Path("tests/img/no_sudoku2.jpg"))
+        path = tmp_path / "image.png"
+        image.save(path)
+        saved = Image()
+        saved.load_image(path)
+        assert (saved.data == image.data).all()
 
     def test_resize_image_default_value(self) -> None:
         image = Image()
@@ -33,14 +39,76 @@ class TestImage:
         image.resize(width=500)
         assert image.data.shape[1] == 500
 
-    # TODO
     def test_resize_image_custom_heigh_value(self) -> None:
-        pass
+        image = Image()
+        image.load_image(Path("tests/img/no_sudoku2.jpg"))
+        image.resize(width=None, height=300)  # type: ignore
+        assert image.data.shape[:2] == (300, 149)
 
-    # TODO
     def test_crop(self) -> None:
-        pass
+        image = Image()
+        image.load_image(Path("tests/img/no_sudoku2.jpg"))
+        expected = image.data[20:70, 10:40]
+        image.crop(10, 40, 20, 70)
+        assert image.data.shape == (50, 30, 3)
+        assert (image.data == expected).all()
 
-    # TODO
     def test_get_cropped(self) -> None:
-        pass
+        image = Image()
+        image.load_image(Path("tests/img/no_sudoku2.jpg"))
+        cropped = image.get_cropped(10, 40, 20, 70)
+        assert cropped.shape == (50, 30, 3)
+        assert image.data.shape == (318, 158, 3)
+        assert (cropped == image.data[20:70, 10:40]).all()
+
+
+class TestLoadBuffer:
+    def test_load_buffer_bytes(self) -> None:
+        path = Path("tests/img/sudoku2.jpg")
+        loaded = Image()
+        loaded.load_image(path)
+        image = Image()
+        image.load_buffer(path.read_bytes())
+        assert (image.data == loaded.data).all()
+        assert image.path == Path()
+
+    @pytest.mark.parametrize("wrap", [bytearray, memoryview])
+    def test_load_buffer_wrapped(self, wrap) -> None:  # type: ignore
+        content = Path("tests/img/sudoku2.jpg").read_bytes()
+        image = Image()
+        image.load_buffer(wrap(content))
+        assert image.data.shape == (320, 240, 3)
+
+    @pytest.mark.parametrize("reduction", [1, 2, 4, 8])
+    def test_load_buffer_reduced_grayscale(self, reduction: int) -> None:
+        content = Path("tests/img/sudoku3.jpg").read_bytes()
+        image = Image()
+        image.load_buffer(content, reduction=reduction, grayscale=True)
+        assert image.data.shape == (4032 // reduction, 3024 // reduction)
+
+    def test_load_buffer_decoded(self) -> None:
+        loaded = Image()
+        loaded.load_image(Path("tests/img/sudoku2.jpg"))
+        image = Image()
+        image.load_buffer(loaded.data, reduction=2, grayscale=True)
+        assert image.data.shape == (160, 120)
+
+    def test_load_image_reduced(self) -> None:
+        image = Image()
+        image.load_image(Path("tests/img/sudoku2.jpg"), reduction=2, grayscale=True)
+        assert image.data.shape == (160, 120)
+
+    def test_load_buffer_invalid(self) -> None:
+        image = Image()
+        with pytest.raises(ImageDecodeError):
+            image.load_buffer(b"not an image")
+
+    def test_load_buffer_empty(self) -> None:
+        image = Image()
+        with pytest.raises(ImageDecodeError):
+            image.load_buffer(b"")
+
+    def test_load_buffer_invalid_reduction(self) -> None:
+        image = Image()
+        with pytest.raises(ValueError):
+            image.load_buffer(b"", reduction=3)
@@ -1,13 +1,32 @@
 from pathlib import Path
 
 import pytest
-from cv2 import COLOR_BGR2GRAY, cvtColor
-from numpy import array
+from cv2 import COLOR_BGR2GRAY, contourArea, cvtColor
+from numpy import array, ndarray, shares_memory, unique
 
-from sudoku_ocr.image_processing import ImageProcessing
+from sudoku_ocr.border import ENGINES
+from sudoku_ocr.exceptions import GridNotFoundError
+from sudoku_ocr.image_processing import (
+    DEFAULT_CASCADE,
+    ImageProcessing,
+    ThresholdCascade,
+    ThresholdParameters,
+    WorkBuffers,
+    has_grid_lines,
+)
 
 
 class TestImageProcessing:
+    def test_thresholding_parameters(self) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        default = ImageProcessing()
+        default.data = image.data
+        default.thresholding(ThresholdParameters())
+        image.thresholding(ThresholdParameters(blur_kernel=3, block_size=21))
+        assert image.data.shape == default.data.shape
+        assert (image.data != default.data).any()
+
     def test_thresholding(self) -> None:
         image = ImageProcessing()
         image.load_image(Path("tests/img/sudoku1.png"))
@@ -30,13 +49,73 @@ class TestImageProcessing:
         ]
         assert (image.data == proper_data).all()
 
-    # TODO
     def test_get_contours(self) -> None:
-        pass
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        image.resize(600)
+        image.thresholding()
+        contours = image.get_contours()
+        areas = [contourArea(contour) for contour in contours]
+        assert len(contours) > 81
+        assert areas == sorted(areas, reverse=True)
+        assert areas[0] > 0.3 * image.data.size
 
-    # TODO
     def test_get_largest_rectangle_contours(self) -> None:
-        pass
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        image.resize(600)
+        image.thresholding()
+        zone = image.get_largest_rectangle_contours(image.get_contours())
+        expected_zone = array([[460, 272], [92, 276], [45, 679], [512, 666]])
+        assert (zone.reshape(4, 2) == expected_zone).all()
+
+    def test_get_largest_rectangle_contours_not_found(self) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/no_sudoku2.jpg"))
+        image.resize()
+        image.thresholding()
+        with pytest.raises(GridNotFoundError):
+            image.get_largest_rectangle_contours(image.get_contours())
+
+    def test_get_grid_candidates(self) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        image.resize()
+        image.thresholding()
+        candidates = image.get_grid_candidates(top_k=2)
+        assert 0 < len(candidates) <= 2
+        assert contourArea(candidates[0]) == contourArea(image.get_contours()[0])
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            Path("tests/img/sudoku1.png"),
+            Path("tests/img/sudoku2.jpg"),
+            Path("tests/img/sudoku3.jpg"),
+        ],
+    )
+    def test_find_grid(self, path: Path) -> None:
+        image = ImageProcessing()
+        image.load_image(path)
+        image.resize()
+        image.thresholding()
+        zone = image.get_largest_rectangle_contours(image.get_contours())
+        assert (image.find_grid() == zone).all()
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            Path("tests/img/no_sudoku.jpg"),
+            Path("tests/img/no_sudoku2.jpg"),
+        ],
+    )
+    def test_find_grid_not_found(self, path: Path) -> None:
+        image = ImageProcessing()
+        image.load_image(path)
+        image.resize()
+        image.thresholding()
+        with pytest.raises(GridNotFoundError):
+            image.find_grid()
 
     def test_adjust_perspective_to_specific_zone(self) -> None:
         zone = array(
@@ -60,9 +139,130 @@ class TestImageProcessing:
 
         assert (image.data == image_to_compare_with.data).all()
 
-    # TODO
-    def test_improve_data_quality(self) -> None:
-        pass
+    def test_locate_grid(self) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        zone = image.locate_grid()
+        ratio = 751 / 600
+        expected_zone = array([[460, 272], [92, 276], [45, 679], [512, 666]]) * ratio
+        assert image.data.shape == (450, 450)
+        assert abs(zone - expected_zone).max() < 1
+        assert set(unique(image.data)) <= {0, 255}
+
+    def test_locate_grid_custom_board_size(self) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku3.jpg"))
+        image.locate_grid(board_size=252)
+        assert image.get_cells().shape == (9, 9, 28, 28)
+
+    def test_locate_grid_not_found(self) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/no_sudoku2.jpg"))
+        with pytest.raises(GridNotFoundError):
+            image.locate_grid()
+
+    def test_locate_grid_buffers(self) -> None:
+        buffers = WorkBuffers()
+        expected = ImageProcessing()
+        expected.load_image(Path("tests/img/sudoku1.png"))
+        expected_zone = expected.locate_grid()
+        data = []
+        for _ in range(2):
+            image = ImageProcessing(buffers)
+            image.load_image(Path("tests/img/sudoku1.png"))
+            assert (image.locate_grid() == expected_zone).all()
+            assert (image.data == expected.data).all()
+            data.append(image.data)
+        assert shares_memory(data[0], data[1])
+
+    def test_locate_grid_grayscale(self) -> None:
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"), grayscale=True)
+        zone = image.locate_grid()
+        expected = ImageProcessing()
+        expected.load_image(Path("tests/img/sudoku1.png"))
+        assert abs(zone - expected.locate_grid()).max() < 1
+        assert image.data.shape == (450, 450)
+
+    def test_locate_grid_cascade(self, sudoku1_low_contrast: ndarray) -> None:
+        default = ImageProcessing()
+        default.data = sudoku1_low_contrast
+        default.locate_grid()
+        assert not has_grid_lines(default.data)
+        cascade = ThresholdCascade()
+        image = ImageProcessing()
+        image.data = sudoku1_low_contrast
+        zone = image.locate_grid(cascade=cascade)
+        expected = ImageProcessing()
+        expected.load_image(Path("tests/img/sudoku1.png"))
+        assert abs(zone - expected.locate_grid()).max() < 3
+        assert has_grid_lines(image.data)
+        statistics = cascade.statistics
+        assert [item["attempts"] for item in statistics] == [1, 1, 0, 0, 0]
+        assert [item["successes"] for item in statistics] == [0, 1, 0, 0, 0]
+        assert cascade.order[0] == DEFAULT_CASCADE[1]
+
+    def test_locate_grid_cascade_stops_at_first_success(self) -> None:
+        cascade = ThresholdCascade()
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/sudoku1.png"))
+        zone = image.locate_grid(cascade=cascade)
+        expected = ImageProcessing()
+        expected.load_image(Path("tests/img/sudoku1.png"))
+        assert abs(zone - expected.locate_grid()).max() < 1
+        assert (image.data == expected.data).all()
+        assert [item["attempts"] for item in cascade.statistics] == [1, 0, 0, 0, 0]
+
+    def test_locate_grid_cascade_fallback(self, sudoku1_low_contrast: ndarray) -> None:
+        cascade = ThresholdCascade([ThresholdParameters()])
+        image = ImageProcessing()
+        image.data = sudoku1_low_contrast
+        zone = image.locate_grid(cascade=cascade)
+        default = ImageProcessing()
+        default.data = sudoku1_low_contrast
+        assert (zone == default.locate_grid()).all()
+        assert (image.data == default.data).all()
+        assert cascade.statistics[0]["successes"] == 0
+
+    def test_locate_grid_cascade_not_found(self) -> None:
+        cascade = ThresholdCascade()
+        image = ImageProcessing()
+        image.load_image(Path("tests/img/no_sudoku2.jpg"))
+        with pytest.raises(GridNotFoundError):
+            image.locate_grid(cascade=cascade)
+        assert [item["attempts"] for item in cascade.statistics] == [1] * 5
+
+    @pytest.mark.parametrize(
+        "path",
+        ["tests/img/sudoku1.png", "tests/img/sudoku2.jpg", "tests/img/sudoku3.jpg"],
+    )
+    def test_has_grid_lines(self, path: str) -> None:
+        image = ImageProcessing()
+        image.load_image(Path(path))
+        image.locate_grid()
+        assert has_grid_lines(image.data)
+
+    @pytest.mark.parametrize(
+        "path", ["tests/img/no_sudoku.jpg", "tests/img/no_sudoku2.jpg"]
+    )
+    def test_has_grid_lines_without_grid(self, path: str) -> None:
+        image = ImageProcessing()
+        image.load_image(Path(path))
+        image.thresholding()
+        assert not has_grid_lines(image.data)
+
+    @pytest.mark.parametrize("index", range(81))
+    def test_improve_data_quality_engines_parity(self, index: int) -> None:
+        pytest.importorskip("skimage")
+        image = ImageProcessing()
+        image.load_image(Path(f"tests/img/cells/sudoku1_cell{index}.png"))
+        image.data = cvtColor(image.data, COLOR_BGR2GRAY)
+        data = image.data
+        image.improve_data_quality(engine="skimage")
+        expected = image.data
+        image.data = data
+        image.improve_data_quality(engine="opencv")
+        assert (image.data == expected).all()
 
     @pytest.mark.parametrize(
         ["path", "expected"],
@@ -238,3 +438,123 @@ class TestImageProcessing:
         image.load_image(path)
         image.data = cvtColor(image.data, COLOR_BGR2GRAY)
         assert image.is_empty() == expected
+
+    @pytest.mark.parametrize("threshold", [1, 5, 10, 50])
+    def test_get_occupancy_mask(self, threshold: int) -> None:
+        board = ImageProcessing()
+        board.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+        board.data = cvtColor(board.data, COLOR_BGR2GRAY)
+        cell_height, cell_width = board.data.shape[0] // 9, board.data.shape[1] // 9
+        expected = []
+        for row in range(9):
+            for col in range(9):
+                cell = ImageProcessing()
+                cell.data = board.get_cropped(
+                    col * cell_width,
+                    (col + 1) * cell_width,
+                    row * cell_height,
+                    (row + 1) * cell_height,
+                )
+                expected.append(not cell.is_empty(threshold))
+        mask = board.get_occupancy_mask(threshold)
+        assert mask.shape == (9, 9)
+        assert mask.ravel().tolist() == expected
+
+    def test_get_cells(self) -> None:
+        board = ImageProcessing()
+        board.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+        board.data = cvtColor(board.data, COLOR_BGR2GRAY)
+        cells = board.get_cells()
+        assert cells.shape == (9, 9, 45, 51)
+        assert shares_memory(cells, board.data)
+        assert (cells[2, 3] == board.get_cropped(153, 204, 90, 135)).all()
+
+    def test_get_cells_write_through(self) -> None:
+        board = ImageProcessing()
+        board.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+        board.data = cvtColor(board.data, COLOR_BGR2GRAY)
+        board.get_cells()[8, 8] = 0
+        assert not board.get_cropped(408, 459, 360, 405).any()
+
+    def test_get_cells_resampled(self) -> None:
+        board = ImageProcessing()
+        board.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+        board.data = cvtColor(board.data, COLOR_BGR2GRAY)
+        cells = board.get_cells(cell_shape=(28, 28))
+        assert cells.shape == (9, 9, 28, 28)
+        assert board.data.shape == (405, 467)
+
+    def test_get_cell(self) -> None:
+        board = ImageProcessing()
+        board.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+        board.data = cvtColor(board.data, COLOR_BGR2GRAY)
+        cell = board.get_cell(0, 2)
+        assert shares_memory(cell.data, board.data)
+        assert cell.is_empty() == (not board.get_occupancy_mask()[0, 2])
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_improve_cells_quality(self, engine: str) -> None:
+        if engine == "skimage":
+            pytest.importorskip("skimage")
+        board = ImageProcessing()
+        board.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+        board.data = cvtColor(board.data, COLOR_BGR2GRAY)
+        expected = ImageProcessing()
+        expected.data = board.data.copy()
+        for row in range(9):
+            for col in range(9):
+                cell = board.get_cell(row, col)
+                cell.improve_data_quality(engine)
+                expected.get_cells()[row, col] = cell.data
+        board.improve_cells_quality(engine)
+        assert (board.data == expected.data).all()
+
+    @pytest.mark.parametrize("index", [0, 2, 16, 40, 80])
+    def test_improve_cells_quality_matches_fixtures(self, index: int) -> None:
+        board = ImageProcessing()
+        board.load_image(Path("tests/img/sudoku1_test_adjust_perspective.png"))
+        board.data = cvtColor(board.data, COLOR_BGR2GRAY)
+        board.improve_cells_quality()
+        cell = ImageProcessing()
+        cell.load_image(Path(f"tests/img/cells/sudoku1_cell{index}.png"))
+        cell.data = cvtColor(cell.data, COLOR_BGR2GRAY)
+        assert (board.get_cell(*divmod(index, 9)).data == cell.data).all()
+
+
+class TestWorkBuffers:
+    def test_get(self) -> None:
+        buffers = WorkBuffers()
+        array = buffers.get("blurred", (4, 5))
+        assert array.shape == (4, 5)
+        assert buffers.get("blurred", (4, 5)) is array
+        assert buffers.get("blurred", (5, 4)) is not array
+        assert buffers.nbytes == 40
+
+    def test_get_evicts_least_recently_used(self) -> None:
+        buffers = WorkBuffers(max_arrays=2)
+        first = buffers.get("first", (2, 2))
+        buffers.get("second", (2, 2))
+        buffers.get("first", (2, 2))
+        buffers.get("third", (2, 2))
+        assert buffers.get("first", (2, 2)) is first
+        assert buffers.nbytes == 8
+
+
+class TestThresholdCascade:
+    def test_order(self) -> None:
+        cascade = ThresholdCascade()
+        assert cascade.order == list(DEFAULT_CASCADE)
+        cascade.record(DEFAULT_CASCADE[0], False)
+        assert cascade.order == list(DEFAULT_CASCADE[1:]) + [DEFAULT_CASCADE[0]]
+        cascade.record(DEFAULT_CASCADE[3], True)
+        assert cascade.order[0] == DEFAULT_CASCADE[3]
+        assert cascade.order[-1] == DEFAULT_CASCADE[0]
+
+    def test_json(self) -> None:
+        cascade = ThresholdCascade()
+        cascade.record(DEFAULT_CASCADE[2], True)
+        cascade.record(DEFAULT_CASCADE[0], False)
+        restored = ThresholdCascade.from_json(cascade.to_json())
+        assert restored.candidates == cascade.candidates
+        assert restored.statistics == cascade.statistics
+        assert restored.order == cascade.order
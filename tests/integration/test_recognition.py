@@ -0,0 +1,138 @@
+from pathlib import Path
+
+import pytest
+from numpy import float32, full, ndarray, uint8, zeros
+
+from sudoku_ocr.image_processing import ImageProcessing
+from sudoku_ocr.recognition import (
+    DigitRecognizer,
+    KNearestClassifier,
+    OpenCVClassifier,
+    get_classifier,
+    isolate_digits,
+)
+
+
+class ConstantClassifier:
+    def __init__(self, digit: int, classes: int = 10) -> None:
+        self.digit = digit
+        self.classes = classes
+        self.batches: list = []
+
+    def predict(self, batch: ndarray) -> ndarray:
+        self.batches.append(batch)
+        probabilities = full((len(batch), self.classes), 0.1, dtype=float32)
+        probabilities[:, self.digit - 10 + self.classes] = 0.5
+        return probabilities
+
+
+class TestDigitRecognizer:
+    def test_get_batch(self, sudoku1_cells: ImageProcessing) -> None:
+        data = sudoku1_cells.data.copy()
+        batch, occupancy = DigitRecognizer(ConstantClassifier(1)).get_batch(
+            sudoku1_cells
+        )
+        assert batch.shape == (occupancy.sum(), 28, 28)
+        assert batch.dtype == float32
+        assert 0 <= batch.min() and batch.max() <= 1
+        assert (sudoku1_cells.data == data).all()
+
+    def test_recognize_single_classifier_call(
+        self, sudoku1_cells: ImageProcessing
+    ) -> None:
+        classifier = ConstantClassifier(4)
+        recognizer = DigitRecognizer(classifier)
+        grid, confidences = recognizer.recognize(sudoku1_cells)
+        _, occupancy = recognizer.get_batch(sudoku1_cells)
+        assert len(classifier.batches) == 1
+        assert (grid[occupancy] == 4).all()
+        assert (grid[~occupancy] == 0).all()
+        assert abs(confidences[occupancy] - 0.5 / 1.3).max() < 1e-6
+        assert (confidences[~occupancy] == 1).all()
+
+    def test_recognize_probabilities(self, sudoku1_cells: ImageProcessing) -> None:
+        recognizer = DigitRecognizer(ConstantClassifier(4))
+        probabilities = recognizer.recognize_probabilities(sudoku1_cells)
+        _, occupancy = recognizer.get_batch(sudoku1_cells)
+        assert probabilities.shape == (9, 9, 9)
+        assert abs(probabilities[occupancy].sum(axis=1) - 1).max() < 1e-6
+        assert abs(probabilities[occupancy, 3] - 0.5 / 1.3).max() < 1e-6
+        assert not probabilities[~occupancy].any()
+
+    def test_recognize_nine_classes(self, sudoku1_cells: ImageProcessing) -> None:
+        grid, _ = DigitRecognizer(ConstantClassifier(9, classes=9)).recognize(
+            sudoku1_cells
+        )
+        assert set(grid.ravel()) == {0, 9}
+
+    def test_recognize_empty_board(self) -> None:
+        board = ImageProcessing()
+        board.data = zeros((450, 450), dtype="uint8")
+        classifier = ConstantClassifier(1)
+        grid, _ = DigitRecognizer(classifier).recognize(board)
+        assert not grid.any()
+        assert not classifier.batches
+
+    def test_recognize_knn(
+        self, sudoku1_cells: ImageProcessing, sudoku1_board: ndarray
+    ) -> None:
+        grid, confidences = DigitRecognizer().recognize(sudoku1_cells)
+        givens = sudoku1_board > 0
+        assert (grid[givens] == sudoku1_board[givens]).mean() >= 0.9
+        assert not grid[~givens].any()
+        assert ((0 < confidences) & (confidences <= 1)).all()
+
+
+class TestIsolateDigits:
+    def test_isolate_digits(self) -> None:
+        cells = zeros((9, 9, 50, 50), dtype=uint8)
+        cells[:, :, :, slice(0, 3)] = 255
+        cells[0, 0, slice(12, 38), slice(20, 30)] = 255
+        cells[0, 1, slice(20, 50), slice(15, 35)] = 255
+        cells[0, 2, slice(20, 30), slice(3, 20)] = 255
+        cells[0, 3, slice(40, 48), slice(10, 40)] = 255
+        occupancy = isolate_digits(cells)
+        assert occupancy.sum() == 2 and occupancy[0, 0] and occupancy[0, 1]
+        assert cells[0, 0].sum() == 26 * 10 * 255
+        assert cells[0, 1].sum() == 30 * 20 * 255
+        assert not cells[0, 2:].any() and not cells[1:].any()
+
+    def test_isolate_digits_min_height(self) -> None:
+        cells = zeros((9, 9, 50, 50), dtype=uint8)
+        cells[4, 4, slice(15, 35), slice(20, 30)] = 255
+        assert isolate_digits(cells.copy()).sum() == 1
+        assert not isolate_digits(cells, min_height=0.5).any()
+
+
+class TestClassifiers:
+    def test_get_classifier(self) -> None:
+        assert isinstance(get_classifier("knn", k=1), KNearestClassifier)
+
+    def test_get_classifier_unknown(self) -> None:
+        with pytest.raises(ValueError):
+            get_classifier("unknown")
+
+    def test_opencv_classifier_loads_model_lazily(self) -> None:
+        OpenCVClassifier(Path("missing.onnx"))
+
+    def test_parameters(self) -> None:
+        opencv = DigitRecognizer(OpenCVClassifier(Path("digits.onnx")))
+        assert opencv.parameters["model_path"] == "digits.onnx"
+        knn = DigitRecognizer(KNearestClassifier(k=5))
+        assert knn.parameters["classifier"] == "KNearestClassifier"
+        assert knn.parameters["k"] == 5
+        constant = DigitRecognizer(ConstantClassifier(1)).parameters
+        assert constant["classifier"] == "ConstantClassifier"
+        assert "model_path" not in constant
+
+    def test_knn_fit_save_load(
+        self, sudoku1_cells: ImageProcessing, sudoku1_board: ndarray, tmp_path: Path
+    ) -> None:
+        batch, occupancy = DigitRecognizer().get_batch(sudoku1_cells)
+        digits = sudoku1_board[occupancy]
+        batch, digits = batch[digits > 0], digits[digits > 0]
+        classifier = KNearestClassifier(k=1)
+        classifier.fit(batch, digits)
+        classifier.save(tmp_path / "knn.npz")
+        loaded = KNearestClassifier(tmp_path / "knn.npz", k=1)
+        assert (loaded.predict(batch).argmax(axis=1) + 1 == digits).all()
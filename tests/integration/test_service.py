@@ -0,0 +1,190 @@
+import asyncio
+import json
+from pathlib import Path
+from time import sleep
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from cv2 import getNumThreads, setNumThreads
+from numpy import ndarray
+
+from sudoku_ocr.exceptions import ServiceOverloadedError
+from sudoku_ocr.service import (
+    OcrService,
+    PipelineOptions,
+    ServiceResult,
+    handle_connection,
+    serve,
+)
+
+IMAGE = Path("tests/img/sudoku1.png")
+
+Responses = Dict[str, Tuple[int, Dict[str, Any]]]
+
+
+def slow_process(content: bytes, options: PipelineOptions) -> ServiceResult:
+    sleep(0.3)
+    return ServiceResult(zone=[], board=[], solution=[], status=None)
+
+
+async def request(
+    port: int,
+    method: str,
+    path: str,
+    body: bytes = b"",
+    length: Optional[int] = None,
+) -> Tuple[int, Dict[str, Any]]:
+    """Send HTTP request and get status and json body of response."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    length = len(body) if length is None else length
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status_line, _, content = response.partition(b"\r\n\r\n")
+    status = int(status_line.split()[1])
+    if path == "/metrics":
+        return status, {"text": content.decode()}
+    return status, json.loads(content)
+
+
+class TestOcrService:
+    def test_process(self, sudoku1_board: ndarray) -> None:
+        async def run() -> ServiceResult:
+            async with OcrService(workers=1) as service:
+                return await service.process(IMAGE.read_bytes())
+
+        result = asyncio.run(run())
+        givens = sudoku1_board > 0
+        assert len(result.zone) == 4
+        assert (sudoku1_board == result.board)[givens].mean() >= 0.8
+        assert json.loads(json.dumps(result.to_dict()))["status"] == result.status
+
+    def test_process_limits_opencv_threads(self) -> None:
+        async def run() -> ServiceResult:
+            async with OcrService(workers=1) as service:
+                return await service.process(IMAGE.read_bytes())
+
+        threads = getNumThreads()
+        setNumThreads(4)
+        try:
+            asyncio.run(run())
+            assert getNumThreads() == 1
+        finally:
+            setNumThreads(threads)
+
+    def test_process_in_processes(self) -> None:
+        async def run() -> ServiceResult:
+            async with OcrService(workers=1, processes=True) as service:
+                return await service.process(IMAGE.read_bytes())
+
+        assert len(asyncio.run(run()).board) == 9
+
+    def test_overloaded(self, mocker) -> None:  # type: ignore
+        mocker.patch("sudoku_ocr.service.process_image_bytes", slow_process)
+
+        async def run() -> list:
+            async with OcrService(workers=1, max_pending=2) as service:
+                results = await asyncio.gather(
+                    *(service.process(b"") for _ in range(4)), return_exceptions=True
+                )
+                assert service.pending == 0
+                return results
+
+        results = asyncio.run(run())
+        assert [isinstance(result, ServiceResult) for result in results] == [
+            True,
+            True,
+            False,
+            False,
+        ]
+        assert all(isinstance(result, ServiceOverloadedError) for result in results[2:])
+
+    def test_timeout(self, mocker) -> None:  # type: ignore
+        mocker.patch("sudoku_ocr.service.process_image_bytes", slow_process)
+
+        async def run() -> Dict[str, int]:
+            async with OcrService(workers=1, max_pending=2, timeout=0.1) as service:
+                results = await asyncio.gather(
+                    service.process(b""), service.process(b""), return_exceptions=True
+                )
+                assert all(
+                    isinstance(result, asyncio.TimeoutError) for result in results
+                )
+                # waiting request is cancelled, running one keeps its slot
+                assert service.pending == 1
+                await asyncio.sleep(0.4)
+                assert service.pending == 0
+                return service.counters
+
+        counters = asyncio.run(run())
+        assert counters["timeouts"] == 2
+        assert counters["completed"] == 0
+
+    def test_to_prometheus(self) -> None:
+        text = OcrService(workers=1).to_prometheus()
+        assert "# TYPE sudoku_ocr_service_requests_total counter" in text
+        assert "sudoku_ocr_service_pending 0" in text
+
+
+@pytest.fixture(scope="module")
+def responses() -> Responses:
+    async def run() -> Responses:
+        async with OcrService(workers=1) as service:
+            server = await serve(service, port=0, max_body_bytes=1024 * 1024)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                return {
+                    "solve": await request(port, "POST", "/solve", IMAGE.read_bytes()),
+                    "invalid": await request(port, "POST", "/solve", b"not an image"),
+                    "empty": await request(port, "POST", "/solve", b""),
+                    "large": await request(port, "POST", "/solve", length=2**21),
+                    "negative": await request(port, "POST", "/solve", length=-1),
+                    "health": await request(port, "GET", "/health"),
+                    "metrics": await request(port, "GET", "/metrics"),
+                    "unknown": await request(port, "GET", "/unknown"),
+                }
+
+    return asyncio.run(run())
+
+
+class TestServe:
+    def test_solve(self, responses: Responses) -> None:
+        status, body = responses["solve"]
+        assert status == 200
+        assert len(body["board"]) == 9
+        assert len(body["zone"]) == 4
+
+    @pytest.mark.parametrize(
+        "name, expected",
+        [
+            ("invalid", 422),
+            ("empty", 422),
+            ("large", 413),
+            ("negative", 400),
+            ("health", 200),
+            ("metrics", 200),
+            ("unknown", 404),
+        ],
+    )
+    def test_status(self, responses: Responses, name: str, expected: int) -> None:
+        assert responses[name][0] == expected
+
+    def test_metrics(self, responses: Responses) -> None:
+        assert "sudoku_ocr_service_completed_total 1" in responses["metrics"][1]["text"]
+
+    def test_long_header(self, mocker) -> None:  # type: ignore
+        async def run() -> bytes:
+            reader = asyncio.StreamReader(limit=1024)
+            reader.feed_data(
+                b"POST /solve HTTP/1.1\r\nX-Long: " + b"a" * 2048 + b"\r\n\r\n"
+            )
+            reader.feed_eof()
+            writer = mocker.Mock(drain=mocker.AsyncMock())
+            async with OcrService(workers=1) as service:
+                await handle_connection(service, reader, writer)
+            writer.close.assert_called_once()
+            return writer.write.call_args[0][0]
+
+        assert asyncio.run(run()).startswith(b"HTTP/1.1 400 Bad Request")
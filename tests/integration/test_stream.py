@@ -0,0 +1,79 @@
+from pathlib import Path
+from typing import List, Tuple
+
+from cv2 import VideoWriter, rectangle
+from numpy import abs, ndarray, zeros_like
+
+from sudoku_ocr.recognition import DigitRecognizer
+from sudoku_ocr.stream import GridTracker, read_video
+
+Clip = Tuple[List[ndarray], List[ndarray]]
+
+
+class TestGridTracker:
+    def test_stream_keyframes(self, sudoku1_clip: Clip) -> None:
+        frames, _ = sudoku1_clip
+        tracker = GridTracker(keyframe_interval=20)
+        results = list(tracker.stream(frames))
+        keyframes = [result.index for result in results if result.keyframe]
+        assert keyframes == [0, 20, 40]
+
+    def test_stream_tracks_zone(self, sudoku1_clip: Clip) -> None:
+        frames, zones = sudoku1_clip
+        tracker = GridTracker()
+        for result, zone in zip(tracker.stream(frames), zones):
+            assert abs(result.zone - zone).max() < 4
+
+    def test_stream_skips_recognition(self, sudoku1_clip: Clip) -> None:
+        frames, _ = sudoku1_clip
+        tracker = GridTracker(DigitRecognizer())
+        results = list(tracker.stream(frames))
+        assert [result.recognized for result in results].count(True) == 1
+        grid = results[0].grid
+        assert grid is not None
+        assert all(
+            result.grid is not None and (result.grid == grid).all()
+            for result in results
+        )
+
+    def test_stream_recognizes_changed_board(self, sudoku1_clip: Clip) -> None:
+        frames, zones = sudoku1_clip
+        tracker = GridTracker(DigitRecognizer())
+        first = tracker.process(frames[0])
+        changed = frames[1].copy()
+        top_left, _, bottom_right, _ = zones[1].astype(int)
+        rectangle(changed, tuple(top_left), tuple(bottom_right), (255, 255, 255), -1)
+        result = tracker.process(changed)
+        assert result.recognized
+        assert result.grid is not None and first.grid is not None
+        assert result.grid.sum() < first.grid.sum()
+
+    def test_stream_without_board(self, sudoku1_clip: Clip) -> None:
+        frames, _ = sudoku1_clip
+        tracker = GridTracker()
+        tracker.process(frames[0])
+        result = tracker.process(zeros_like(frames[1]))
+        assert result.zone is None
+        assert result.keyframe
+        assert tracker.process(frames[2]).keyframe
+
+    def test_reset(self, sudoku1_clip: Clip) -> None:
+        frames, _ = sudoku1_clip
+        tracker = GridTracker()
+        tracker.process(frames[0])
+        tracker.reset()
+        result = tracker.process(frames[1])
+        assert result.index == 0
+        assert result.keyframe
+
+
+def test_read_video(sudoku1_clip: Clip, tmp_path: Path) -> None:
+    frames, _ = sudoku1_clip
+    path = tmp_path / "clip.avi"
+    writer = VideoWriter(str(path), VideoWriter.fourcc(*"MJPG"), 30, (640, 480))
+    for frame in frames[:10]:
+        writer.write(frame)
+    writer.release()
+    read = list(read_video(path))
+    assert len(read) == 10
+    assert read[0].shape == frames[0].shape
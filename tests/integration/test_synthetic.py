@@ -0,0 +1,100 @@
+from typing import List
+
+import pytest
+from numpy import ndarray, sort
+
+from sudoku_ocr.exceptions import GridNotFoundError
+from sudoku_ocr.image_processing import ImageProcessing
+from sudoku_ocr.perspective import order_points
+from sudoku_ocr.recognition import DigitRecognizer
+from sudoku_ocr.solver import SOLVED, solve
+from sudoku_ocr.synthetic import (
+    BoardGenerator,
+    GeneratorOptions,
+    Sample,
+    generate_samples,
+)
+
+
+@pytest.fixture(scope="module")
+def samples() -> List[Sample]:
+    return list(BoardGenerator(seed=0).samples(20))
+
+
+def is_valid_solution(grid: ndarray) -> bool:
+    digits = list(range(1, 10))
+    boxes = grid.reshape(3, 3, 3, 3).swapaxes(1, 2).reshape(9, 9)
+    return all((sort(units, axis=1) == digits).all() for units in (grid, grid.T, boxes))
+
+
+class TestBoardGenerator:
+    def test_generate_puzzle(self) -> None:
+        board, solution = BoardGenerator(seed=0).generate_puzzle()
+        assert 24 <= (board > 0).sum() <= 36
+        assert is_valid_solution(solution)
+        assert (board[board > 0] == solution[board > 0]).all()
+        result = solve(board)
+        assert result.status == SOLVED
+        assert (result.grid == solution).all()
+
+    def test_shuffle(self) -> None:
+        generator = BoardGenerator(seed=0)
+        board, solution = generator.generate_puzzle()
+        shuffled, shuffled_solution = generator.shuffle(board, solution)
+        assert (shuffled != board).any()
+        assert (shuffled > 0).sum() == (board > 0).sum()
+        assert is_valid_solution(shuffled_solution)
+        assert (solve(shuffled).grid == shuffled_solution).all()
+
+    def test_next_puzzle_variants(self, mocker) -> None:  # type: ignore
+        generator = BoardGenerator(GeneratorOptions(variants=3), seed=0)
+        generate_puzzle = mocker.spy(generator, "generate_puzzle")
+        for _ in range(7):
+            generator.next_puzzle()
+        assert generate_puzzle.call_count == 3
+
+    def test_sample(self, samples: List[Sample]) -> None:
+        for sample in samples:
+            assert sample.image.shape == (480, 640, 3)
+            assert sample.zone.shape == (4, 2)
+            assert (sample.zone >= 0).all()
+            assert (sample.zone <= [640, 480]).all()
+            assert (order_points(sample.zone) == sample.zone).all()
+            assert solve(sample.board).status == SOLVED
+
+    def test_sample_grayscale(self) -> None:
+        options = GeneratorOptions(image_size=(320, 240), grayscale=True)
+        sample = BoardGenerator(options, seed=0).sample()
+        assert sample.image.shape == (240, 320)
+
+    def test_seed(self, samples: List[Sample]) -> None:
+        sample = BoardGenerator(seed=0).sample()
+        assert (sample.image == samples[0].image).all()
+        assert (sample.board == samples[0].board).all()
+
+    def test_pipeline(self, samples: List[Sample]) -> None:
+        recognizer = DigitRecognizer()
+        located, correct = 0, []
+        for sample in samples:
+            image = ImageProcessing()
+            image.data = sample.image
+            try:
+                zone = order_points(image.locate_grid())
+            except GridNotFoundError:
+                continue
+            if abs(zone - sample.zone).max() < 10:
+                located += 1
+                grid, _ = recognizer.recognize(image)
+                correct.append((grid == sample.board).mean())
+        assert located >= 0.8 * len(samples)
+        assert sum(correct) / len(correct) >= 0.9
+
+
+class TestGenerateSamples:
+    def test_generate_samples(self) -> None:
+        samples = list(generate_samples(5, seed=0, workers=2, chunk_size=2))
+        expected = list(generate_samples(5, seed=0, workers=1, chunk_size=2))
+        assert len(samples) == 5
+        for sample, expected_sample in zip(samples, expected):
+            assert (sample.image == expected_sample.image).all()
+            assert (sample.solution == expected_sample.solution).all()
@@ -0,0 +1,55 @@
+import pytest
+from numpy import ndarray
+
+from sudoku_ocr.board import Board
+from sudoku_ocr.canonical import SolutionCache
+from sudoku_ocr.solver import BUDGET_EXCEEDED, INVALID, SOLVED
+
+
+class TestBoard:
+    def test_solve(self, sudoku1_board: ndarray, sudoku1_solution: ndarray) -> None:
+        board = Board()
+        board.board_value = sudoku1_board.tolist()
+        board.solve()
+        assert board.status == SOLVED
+        assert (board.solved_board == sudoku1_solution).all()
+
+    def test_solve_invalid(self, puzzles: dict) -> None:
+        board = Board()
+        board.board_value = puzzles["unsolvable"]
+        board.solve()
+        assert board.status == INVALID
+        assert board.solved_board.shape == (9, 9)
+        assert not board.solved_board.any()
+
+    def test_solve_budget(self, puzzles: dict) -> None:
+        board = Board()
+        board.board_value = puzzles["hard"]
+        board.solve(max_nodes=1)
+        assert board.status == BUDGET_EXCEEDED
+        assert not board.solved_board.any()
+
+    def test_solve_repair_givens(self, puzzles: dict) -> None:
+        board = Board()
+        board.board_value = puzzles["unsolvable"]
+        board.solve(repair_givens=True)
+        assert board.status == SOLVED
+        assert len(board.corrections) == 1
+        row, col, recognized, corrected = board.corrections[0]
+        assert board.board_value[row, col] == corrected
+        assert board.solved_board.all()
+
+    def test_ocr_sudoku_not_prepared(self) -> None:
+        with pytest.raises(ValueError):
+            Board().ocr_sudoku()
+
+    def test_solve_solution_cache(
+        self, sudoku1_board: ndarray, sudoku1_solution: ndarray
+    ) -> None:
+        cache = SolutionCache()
+        for board_value in (sudoku1_board, sudoku1_board.T):
+            board = Board(solution_cache=cache)
+            board.board_value = board_value
+            board.solve()
+        assert (board.solved_board == sudoku1_solution.T).all()
+        assert cache.counters["hits"] == 1
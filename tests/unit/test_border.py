@@ -0,0 +1,83 @@
+import pytest
+from numpy import array, uint8, zeros
+from numpy.random import default_rng
+
+from sudoku_ocr.border import ENGINES, clear_border, get_borders
+
+
+def random_images() -> list:
+    rng = default_rng(0)
+    images = []
+    for index in range(30):
+        height, width = rng.integers(3, 40, 2)
+        if index % 2:
+            image = (rng.random((height, width)) < 0.5).astype(uint8) * 255
+        else:
+            image = rng.integers(0, 4, (height, width)).astype(uint8) * 60
+            image[rng.integers(0, height, 2)] = 0
+        images.append(image)
+    return images
+
+
+class TestGetBorders:
+    def test_get_borders(self) -> None:
+        borders = get_borders((3, 4))
+        assert borders.tolist() == [
+            [True, True, True, True],
+            [True, False, False, True],
+            [True, True, True, True],
+        ]
+
+
+class TestClearBorder:
+    def test_unknown_engine(self) -> None:
+        with pytest.raises(ValueError):
+            clear_border(zeros((3, 3), dtype=uint8), engine="foo")
+
+    @pytest.mark.parametrize("engine", ["opencv"])
+    def test_clear_binary(self, engine: str) -> None:
+        image = array(
+            [
+                [255, 0, 0, 0, 0],
+                [255, 0, 0, 0, 0],
+                [0, 0, 255, 255, 0],
+                [0, 0, 255, 0, 0],
+                [0, 0, 0, 0, 0],
+            ],
+            dtype=uint8,
+        )
+        cleared = clear_border(image, engine=engine)
+        assert cleared[:2, 0].tolist() == [0, 0]
+        assert cleared[2:4, 2:4].tolist() == [[255, 255], [255, 0]]
+        assert image[0, 0] == 255
+
+    @pytest.mark.parametrize("engine", ["opencv"])
+    def test_clear_equal_value_components(self, engine: str) -> None:
+        image = array(
+            [
+                [0, 0, 0, 0, 0],
+                [0, 100, 200, 0, 0],
+                [0, 0, 200, 0, 0],
+                [0, 0, 200, 100, 0],
+                [0, 0, 0, 0, 100],
+            ],
+            dtype=uint8,
+        )
+        cleared = clear_border(image, engine=engine)
+        assert cleared[1:4, 1:4].tolist() == [[100, 200, 0], [0, 200, 0], [0, 200, 0]]
+        assert cleared[4, 4] == 0
+
+    def test_custom_borders(self) -> None:
+        image = zeros((5, 5), dtype=uint8)
+        image[2, 2] = 255
+        borders = zeros((5, 5), dtype=bool)
+        borders[2, 2] = True
+        assert not clear_border(image, borders).any()
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_parity_with_skimage(self, engine: str) -> None:
+        segmentation = pytest.importorskip("skimage.segmentation")
+        for image in random_images():
+            assert (
+                clear_border(image, engine=engine) == segmentation.clear_border(image)
+            ).all()
@@ -0,0 +1,89 @@
+import os
+from pathlib import Path
+
+from numpy import arange, uint8, zeros
+
+from sudoku_ocr.cache import CachedResult, ResultCache, cache_key, file_key, image_key
+
+
+class TestKeys:
+    def test_image_key(self) -> None:
+        data = arange(12, dtype=uint8).reshape(3, 4)
+        assert image_key(data) == image_key(data.copy())
+        assert image_key(data) != image_key(data.reshape(4, 3))
+        assert image_key(data.T) == image_key(data.T.copy())
+
+    def test_file_key(self, tmp_path: Path) -> None:
+        path = tmp_path / "image.png"
+        path.write_bytes(b"image")
+        key = file_key(path)
+        os.utime(path, ns=(0, 0))
+        assert file_key(path) != key
+
+    def test_cache_key(self) -> None:
+        assert cache_key("image", {"a": 1, "b": 2}) == cache_key(
+            "image", {"b": 2, "a": 1}
+        )
+        assert cache_key("image", {"a": 1}) != cache_key("image", {"a": 2})
+
+
+class TestResultCache:
+    def test_get_put(self) -> None:
+        cache = ResultCache()
+        assert cache.get("key") is None
+        cache.put("key", CachedResult(grid=[[1]]))
+        cached = cache.get("key")
+        assert cached is not None
+        assert cached.grid == [[1]]
+        assert cache.counters["memory_hits"] == 1
+        assert cache.counters["misses"] == 1
+
+    def test_lru_eviction(self) -> None:
+        cache = ResultCache(max_entries=2)
+        for key in "abc":
+            cache.put(key, CachedResult())
+            cache.get("a")
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.counters["evictions"] == 1
+
+    def test_disk_tier(self, tmp_path: Path) -> None:
+        cache = ResultCache(path=tmp_path / "cache.sqlite")
+        cache.put("key", CachedResult(zone=zeros((4, 2)).tolist(), status="solved"))
+        cache.close()
+        cache = ResultCache(path=tmp_path / "cache.sqlite")
+        cached = cache.get("key")
+        assert cached is not None
+        assert cached.status == "solved"
+        assert cache.get("key") == cached
+        assert cached.zone == zeros((4, 2)).tolist()
+        assert cache.counters["disk_hits"] == 1
+        assert cache.counters["memory_hits"] == 1
+
+    def test_disk_size_cap(self, tmp_path: Path) -> None:
+        result = CachedResult(grid=zeros((9, 9), dtype=int).tolist())
+        cache = ResultCache(
+            max_entries=1,
+            path=tmp_path / "cache.sqlite",
+            max_disk_bytes=3 * len(result.to_json()),
+        )
+        for key in "abcde":
+            cache.put(key, result)
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+        assert cache.counters["disk_evictions"] == 2
+
+    def test_clear(self, tmp_path: Path) -> None:
+        cache = ResultCache(path=tmp_path / "cache.sqlite")
+        cache.put("key", CachedResult())
+        cache.clear()
+        assert cache.get("key") is None
+
+    def test_to_prometheus(self) -> None:
+        cache = ResultCache()
+        cache.get("key")
+        assert (
+            "# TYPE sudoku_ocr_cache_misses_total counter\nsudoku_ocr_cache_misses_total 1\n"
+            in cache.to_prometheus()
+        )
@@ -0,0 +1,89 @@
+from typing import Callable
+
+import pytest
+from numpy import ndarray, zeros
+
+from sudoku_ocr.canonical import SolutionCache, canonicalize
+from sudoku_ocr.solver import BUDGET_EXCEEDED, INVALID, SOLVED, solve
+
+
+class TestCanonicalize:
+    def test_equivalent_boards(self, puzzle: tuple, random_transform: Callable) -> None:
+        _, board = puzzle
+        canonical, _ = canonicalize(board)
+        shared = sum(
+            (canonicalize(random_transform(board))[0] == canonical).all()
+            for _ in range(100)
+        )
+        assert shared >= 75
+
+    def test_tied_patterns(self, puzzles: dict, random_transform: Callable) -> None:
+        board = solve(puzzles["easy"]).grid.copy()
+        board[0, 0] = 0
+        for _ in range(20):
+            transformed = random_transform(board)
+            canonical, transform = canonicalize(transformed)
+            assert (transform.invert(canonical) == transformed).all()
+
+    def test_transform(self, puzzle: tuple, random_transform: Callable) -> None:
+        board = random_transform(puzzle[1])
+        canonical, transform = canonicalize(board)
+        assert (transform.apply(board) == canonical).all()
+        assert (transform.invert(canonical) == board).all()
+
+    @pytest.mark.parametrize(
+        "board", [zeros((9, 8)), zeros((9, 9)) + 10, zeros((9, 9)) - 1]
+    )
+    def test_wrong_board(self, board: ndarray) -> None:
+        with pytest.raises(ValueError):
+            canonicalize(board)
+
+    def test_different_boards(self, puzzles: dict) -> None:
+        forms = {canonicalize(board)[0].tobytes() for board in puzzles.values()}
+        assert len(forms) == len(puzzles)
+
+
+class TestSolutionCache:
+    def test_solve(self, puzzles: dict, random_transform: Callable) -> None:
+        cache = SolutionCache()
+        for name in ("easy", "hard"):
+            cache.solve(puzzles[name])
+            board = random_transform(puzzles[name])
+            solution = cache.solve(board)
+            assert solution.status == SOLVED
+            assert (solution.grid == solve(board).grid).all()
+        assert cache.counters == {"hits": 2, "misses": 2, "evictions": 0}
+
+    def test_solve_tied_patterns(
+        self, puzzles: dict, random_transform: Callable
+    ) -> None:
+        cache = SolutionCache()
+        board = solve(puzzles["easy"]).grid.copy()
+        board[slice(0, 9, 4), slice(0, 9, 4)] = 0
+        for _ in range(20):
+            transformed = random_transform(board)
+            solution = cache.solve(transformed)
+            assert solution.status == SOLVED
+            assert (solution.grid == solve(transformed).grid).all()
+        counters = cache.counters
+        assert counters["hits"] + counters["misses"] == 20
+
+    def test_solve_invalid(self, puzzles: dict, random_transform: Callable) -> None:
+        cache = SolutionCache()
+        cache.solve(puzzles["unsolvable"])
+        solution = cache.solve(random_transform(puzzles["unsolvable"]))
+        assert solution.status == INVALID
+        assert not solution.grid.any()
+        assert cache.counters["hits"] == 1
+
+    def test_budget_exceeded_not_cached(self, puzzles: dict) -> None:
+        cache = SolutionCache()
+        assert cache.solve(puzzles["hard"], max_nodes=1).status == BUDGET_EXCEEDED
+        assert len(cache) == 0
+
+    def test_eviction(self, puzzles: dict) -> None:
+        cache = SolutionCache(max_entries=2)
+        for board in puzzles.values():
+            cache.solve(board)
+        assert len(cache) == 2
+        assert cache.counters["evictions"] == 2
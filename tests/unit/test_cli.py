@@ -0,0 +1,43 @@
+import logging
+import subprocess
+import sys
+
+import pytest
+
+from sudoku_ocr.cli import setup_cli_parser
+
+
+class TestSetupCliParser:
+    def test_detect_defaults(self) -> None:
+        args = setup_cli_parser().parse_args(["detect", "foo.png"])
+        assert args.inputs == ["foo.png"]
+        assert args.jobs is None
+        assert args.output_format == "jsonl"
+        assert args.logging_level == logging.INFO
+
+    def test_detect_jobs_and_debug(self) -> None:
+        args = setup_cli_parser().parse_args(["detect", "-j", "4", "--debug", "foo"])
+        assert args.jobs == 4
+        assert args.logging_level == logging.DEBUG
+
+    def test_serve_defaults(self) -> None:
+        args = setup_cli_parser().parse_args(["serve"])
+        assert (args.host, args.port) == ("127.0.0.1", 8080)
+        assert args.jobs is None
+        assert args.max_pending is None
+        assert args.timeout == 10.0
+        assert not args.processes
+
+    def test_command_required(self) -> None:
+        with pytest.raises(SystemExit):
+            setup_cli_parser().parse_args([])
+
+
+class TestImport:
+    def test_cli_does_not_import_heavy_modules(self) -> None:
+        code = (
+            "import sys, sudoku_ocr.cli; "
+            "print(any(m in sys.modules for m in ('cv2', 'skimage', 'tensorflow')))"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code], text=True)
+        assert output.strip() == "False"
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+from numpy import arange, load, ndarray, uint8
+
+from sudoku_ocr.dataset import CELLS_FILE, INDEX_FILE, CellDataset, Record
+from sudoku_ocr.image_processing import get_occupancy
+
+
+def get_cells(boards: int) -> ndarray:
+    size = boards * 81 * 4 * 4
+    return (arange(size) % 256).astype(uint8).reshape(boards, 81, 4, 4)
+
+
+def get_record(index: int) -> Record:
+    return Record(path=f"board{index}.png", zone=[], occupancy=[[False] * 9] * 9)
+
+
+class TestCellDataset:
+    def test_empty(self, tmp_path: Path) -> None:
+        dataset = CellDataset(tmp_path / "dataset", cell_shape=(4, 4))
+        assert len(dataset) == 0
+        assert dataset.cells.shape == (0, 81, 4, 4)
+        assert dataset.records == []
+        assert load(tmp_path / "dataset" / CELLS_FILE).shape == (0, 81, 4, 4)
+
+    def test_append(self, tmp_path: Path) -> None:
+        cells = get_cells(3)
+        dataset = CellDataset(tmp_path, cell_shape=(4, 4))
+        dataset.append(cells[:1], [get_record(0)])
+        dataset.append(cells[1:], [get_record(1), get_record(2)])
+        assert len(dataset) == 3
+        assert (dataset.cells == cells).all()
+        assert [record.path for record in dataset.records] == [
+            "board0.png",
+            "board1.png",
+            "board2.png",
+        ]
+        assert (load(tmp_path / CELLS_FILE, mmap_mode="r") == cells).all()
+
+    def test_reopen(self, tmp_path: Path) -> None:
+        cells = get_cells(2)
+        CellDataset(tmp_path, cell_shape=(4, 4)).append(
+            cells, [get_record(0), get_record(1)]
+        )
+        dataset = CellDataset(tmp_path, cell_shape=(8, 8))
+        assert dataset.shape == (2, 81, 4, 4)
+        assert (dataset.cells == cells).all()
+        assert dataset.records[1] == get_record(1)
+        dataset.append(cells[:1], [get_record(2)])
+        assert len(CellDataset(tmp_path)) == 3
+
+    def test_interrupted_append(self, tmp_path: Path) -> None:
+        cells = get_cells(2)
+        CellDataset(tmp_path, cell_shape=(4, 4)).append(cells[:1], [get_record(0)])
+        with open(tmp_path / CELLS_FILE, "ab") as file:
+            file.write(cells[1].tobytes()[:100])
+        with open(tmp_path / INDEX_FILE, "a") as file:
+            file.write('{"path": "incomplete"')
+        dataset = CellDataset(tmp_path)
+        assert len(dataset) == 1
+        assert len(dataset.records) == 1
+        dataset.append(cells[1:], [get_record(1)])
+        assert (dataset.cells == cells).all()
+        assert dataset.records[1] == get_record(1)
+
+    def test_append_wrong_shape(self, tmp_path: Path) -> None:
+        dataset = CellDataset(tmp_path, cell_shape=(4, 4))
+        with pytest.raises(ValueError):
+            dataset.append(get_cells(2), [get_record(0)])
+
+    def test_get_board(self, tmp_path: Path) -> None:
+        cells = get_cells(1)
+        dataset = CellDataset(tmp_path, cell_shape=(4, 4))
+        dataset.append(cells, [get_record(0)])
+        board = dataset.get_board(0)
+        assert board.data.shape == (36, 36)
+        assert (board.get_cells() == cells.reshape(9, 9, 4, 4)).all()
+
+    def test_get_occupancy(self, tmp_path: Path) -> None:
+        cells = get_cells(2)
+        cells[:, ::2] = 255
+        cells[:, 1::2] = 0
+        dataset = CellDataset(tmp_path, cell_shape=(4, 4))
+        dataset.append(cells, [get_record(0), get_record(1)])
+        occupancy = get_occupancy(dataset.cells)
+        assert occupancy.shape == (2, 81)
+        assert occupancy[:, ::2].all()
+        assert not occupancy[:, 1::2].any()
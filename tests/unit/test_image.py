@@ -9,3 +9,10 @@ class TestImage:
         image.show()
         assert mocker_imshow.called
         assert mocker_waitKey.called
+
+    def test_show_wait_time(self, mocker) -> None:  # type: ignore
+        mocker.patch("sudoku_ocr.image.imshow")
+        mocker_waitKey = mocker.patch("sudoku_ocr.image.waitKey")
+        image = Image()
+        image.show(wait_time=1)
+        mocker_waitKey.assert_called_once_with(1)
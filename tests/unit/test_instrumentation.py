@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+from typing import List
+
+from numpy import zeros
+
+from sudoku_ocr.instrumentation import (
+    StageRecord,
+    StageStatistics,
+    add_recorder,
+    instrumented,
+    recording,
+    remove_recorder,
+)
+
+
+class Stages:
+    def __init__(self) -> None:
+        self.data = zeros((4, 5))
+
+    @instrumented("modify")
+    def modify(self) -> None:
+        self.data = zeros((2, 2))
+
+    @instrumented("compute")
+    def compute(self, value: int) -> list:
+        return [zeros(3), zeros(2)]
+
+
+class TestInstrumented:
+    def test_disabled(self) -> None:
+        assert Stages().compute(1)[0].shape == (3,)
+
+    def test_recorder(self) -> None:
+        records: List[StageRecord] = []
+        add_recorder(records.append)
+        try:
+            stages = Stages()
+            stages.modify()
+            stages.compute(1)
+        finally:
+            remove_recorder(records.append)
+        assert [record.stage for record in records] == ["modify", "compute"]
+        assert records[0].input_shape == (4, 5)
+        assert records[0].output_nbytes == 32
+        assert records[1].output_nbytes == 40
+        assert records[1].wall_time >= 0
+
+    def test_recording_removes_recorder(self) -> None:
+        with recording() as statistics:
+            Stages().modify()
+        Stages().modify()
+        assert statistics.summary()["modify"]["count"] == 1
+
+
+class TestStageStatistics:
+    def test_summary(self) -> None:
+        statistics = StageStatistics(reservoir_size=100)
+        for value in range(200):
+            statistics.record(StageRecord("stage", value, 0.0, None, 10))
+        summary = statistics.summary()["stage"]
+        assert summary["count"] == 200
+        assert summary["wall_seconds"]["sum"] == sum(range(200))
+        assert summary["wall_seconds"]["p50"] == 150
+        assert summary["wall_seconds"]["p99"] == 199
+        assert summary["output_bytes"]["p95"] == 10
+
+    def test_to_prometheus(self) -> None:
+        statistics = StageStatistics()
+        statistics.record(StageRecord("stage", 1.5, 1.0, None, 10))
+        lines = statistics.to_prometheus().splitlines()
+        assert "# TYPE sudoku_ocr_stage_wall_seconds summary" in lines
+        assert (
+            'sudoku_ocr_stage_wall_seconds{stage="stage",quantile="0.95"} 1.5' in lines
+        )
+        assert 'sudoku_ocr_stage_wall_seconds_count{stage="stage"} 1' in lines
+
+    def test_write(self, tmp_path: Path) -> None:
+        statistics = StageStatistics()
+        statistics.record(StageRecord("stage", 1.5, 1.0, None, 10))
+        statistics.write(tmp_path / "metrics.json")
+        statistics.write(tmp_path / "metrics.prom")
+        assert (
+            json.loads((tmp_path / "metrics.json").read_text())["stage"]["count"] == 1
+        )
+        assert (tmp_path / "metrics.prom").read_text() == statistics.to_prometheus()
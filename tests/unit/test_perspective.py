@@ -0,0 +1,21 @@
+from numpy import array, uint8, zeros
+
+from sudoku_ocr.perspective import four_point_transform, order_points
+
+
+class TestOrderPoints:
+    def test_order_points(self) -> None:
+        points = array([[460, 272], [92, 276], [45, 679], [512, 666]])
+        assert order_points(points).tolist() == [
+            [92, 276],
+            [460, 272],
+            [512, 666],
+            [45, 679],
+        ]
+
+
+class TestFourPointTransform:
+    def test_four_point_transform_size(self) -> None:
+        image = zeros((100, 100), dtype=uint8)
+        points = array([[10, 10], [60, 10], [60, 40], [10, 40]])
+        assert four_point_transform(image, points).shape == (30, 50)
@@ -0,0 +1,171 @@
+import pytest
+from numpy import arange, eye, ndarray, ones, sort, stack, vstack, zeros
+
+from sudoku_ocr.solver import (
+    BUDGET_EXCEEDED,
+    INVALID,
+    MULTIPLE,
+    SOLVED,
+    propagate,
+    repair,
+    solve,
+    solve_many,
+)
+
+
+def is_valid_solution(grid: ndarray, board: ndarray) -> bool:
+    """Check that grid is complete sudoku agreeing with givens of board."""
+    boxes = grid.reshape(3, 3, 3, 3).swapaxes(1, 2).reshape(9, 9)
+    units = vstack([grid, grid.T, boxes])
+    givens = board > 0
+    return (sort(units, axis=1) == arange(1, 10)).all() and (
+        grid[givens] == board[givens]
+    ).all()
+
+
+class TestSolve:
+    def test_solve(self, sudoku1_board: ndarray, sudoku1_solution: ndarray) -> None:
+        solution = solve(sudoku1_board)
+        assert solution.status == SOLVED
+        assert solution.solved
+        assert (solution.grid == sudoku1_solution).all()
+
+    @pytest.mark.parametrize("name", ["17_clues", "hard"])
+    def test_solve_hard(self, name: str, puzzles: dict) -> None:
+        board = puzzles[name]
+        solution = solve(board)
+        assert solution.status == SOLVED
+        assert is_valid_solution(solution.grid, board)
+
+    def test_solve_unsolvable(self, puzzles: dict) -> None:
+        solution = solve(puzzles["unsolvable"])
+        assert solution.status == INVALID
+        assert not solution.grid.any()
+
+    def test_solve_conflicting_givens(self, sudoku1_board: ndarray) -> None:
+        sudoku1_board[0, 0] = 7
+        solution = solve(sudoku1_board)
+        assert solution.status == INVALID
+        assert solution.nodes == 1
+
+    def test_solve_multiple(self) -> None:
+        board = zeros((9, 9), dtype=int)
+        solution = solve(board)
+        assert solution.status == MULTIPLE
+        assert is_valid_solution(solution.grid, board)
+
+    def test_solve_max_nodes(self, puzzles: dict) -> None:
+        solution = solve(puzzles["hard"], max_nodes=5)
+        assert solution.status == BUDGET_EXCEEDED
+        assert not solution.grid.any()
+
+    def test_solve_timeout(self, puzzles: dict) -> None:
+        assert solve(puzzles["hard"], timeout=0).status == BUDGET_EXCEEDED
+
+    @pytest.mark.parametrize("board", [zeros((9, 8)), zeros((9, 9)) + 10])
+    def test_solve_wrong_board(self, board: ndarray) -> None:
+        with pytest.raises(ValueError):
+            solve(board)
+
+
+class TestPropagate:
+    def test_propagate_naked_single(self) -> None:
+        candidates = [1 << (digit % 9) for digit in range(9)] + [0b111111111] * 72
+        candidates[8] = 0b111111111
+        assert propagate(candidates)
+        assert candidates[8] == 1 << 8
+
+    def test_propagate_contradiction(self) -> None:
+        candidates = [1] * 2 + [0b111111111] * 79
+        assert not propagate(candidates)
+
+
+class TestSolveMany:
+    def test_solve_many(self, puzzles: dict, sudoku1_board: ndarray) -> None:
+        sudoku1_board[0, 0] = 7
+        boards = stack(
+            list(puzzles.values()) + [zeros((9, 9), dtype=int), sudoku1_board]
+        )
+        grids, statuses = solve_many(boards)
+        assert statuses.tolist() == [SOLVED, SOLVED, SOLVED, INVALID, MULTIPLE, INVALID]
+        for board, grid, status in zip(boards, grids, statuses):
+            solution = solve(board)
+            assert solution.status == status
+            if status == MULTIPLE:
+                assert is_valid_solution(grid, board)
+            else:
+                assert (solution.grid == grid).all()
+
+    def test_solve_many_budget(self, puzzles: dict) -> None:
+        grids, statuses = solve_many(
+            stack([puzzles["easy"], puzzles["hard"]]), max_nodes=1
+        )
+        assert statuses.tolist() == [SOLVED, BUDGET_EXCEEDED]
+        assert not grids[1].any()
+
+    def test_solve_many_workers(self, puzzles: dict) -> None:
+        boards = stack([puzzles["hard"], puzzles["unsolvable"]])
+        grids, statuses = solve_many(boards, workers=2)
+        assert statuses.tolist() == [SOLVED, INVALID]
+        assert (grids[0] == solve(puzzles["hard"]).grid).all()
+
+    def test_solve_many_empty(self) -> None:
+        grids, statuses = solve_many(zeros((0, 9, 9), dtype=int))
+        assert grids.shape == (0, 9, 9)
+        assert statuses.shape == (0,)
+
+    def test_solve_many_wrong_boards(self) -> None:
+        with pytest.raises(ValueError):
+            solve_many(zeros((9, 9), dtype=int))
+
+
+class TestRepair:
+    def test_repair_conflicting_given(
+        self, sudoku1_board: ndarray, sudoku1_solution: ndarray
+    ) -> None:
+        sudoku1_board[2, 4] = 3
+        confidences = ones((9, 9))
+        confidences[2, 4] = 0.4
+        result = repair(sudoku1_board, confidences)
+        assert result.status == SOLVED
+        assert result.corrections == [(2, 4, 3, 5)]
+        assert (result.grid == sudoku1_solution).all()
+        assert result.board[2, 4] == 5
+
+    def test_repair_spurious_given(self, puzzles: dict) -> None:
+        confidences = ones((9, 9))
+        confidences[1, 4] = 0.3
+        result = repair(puzzles["unsolvable"], confidences)
+        assert result.status == SOLVED
+        assert result.corrections == [(1, 4, 5, 0)]
+        assert (result.grid == solve(puzzles["hard"]).grid).all()
+
+    def test_repair_probabilities(
+        self, sudoku1_board: ndarray, sudoku1_solution: ndarray
+    ) -> None:
+        probabilities = eye(10)[sudoku1_board][:, :, 1:]
+        sudoku1_board[0, 2] = 4
+        confidences = ones((9, 9))
+        confidences[0, 2] = 0.6
+        assert repair(sudoku1_board, confidences).corrections == [(0, 2, 4, 2)]
+        probabilities[0, 2] = 0.0125
+        probabilities[0, 2, [3, 6]] = 0.6, 0.3
+        result = repair(sudoku1_board, confidences, probabilities=probabilities)
+        assert result.status == SOLVED
+        assert result.corrections == [(0, 2, 4, 7)]
+        assert (result.grid == sudoku1_solution).all()
+
+    def test_repair_valid(self, sudoku1_board: ndarray) -> None:
+        result = repair(sudoku1_board, ones((9, 9)))
+        assert result.status == SOLVED
+        assert result.corrections == []
+        assert result.attempts == 0
+
+    def test_repair_max_attempts(self, sudoku1_board: ndarray) -> None:
+        sudoku1_board[2, 4] = 3
+        confidences = ones((9, 9))
+        confidences[2, 3] = 0.1
+        result = repair(sudoku1_board, confidences, max_suspects=1, max_attempts=5)
+        assert result.status == INVALID
+        assert result.attempts == 5
+        assert not result.grid.any()